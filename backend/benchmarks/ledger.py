@@ -0,0 +1,141 @@
+# Payment throughput under parallel load and balance drift afterwards. Every
+# payment goes through POST /api/transactions/ against a throwaway SQLite
+# database; drift compares each balance with what the transactions table says
+# it should be.
+#
+#   python -m benchmarks.ledger --users 20 --payments 1000 --concurrency 16
+#   python -m benchmarks.ledger --legacy    # read-modify-write path, for comparison
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+INITIAL_BALANCE = Decimal('100.00')
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--payments', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--amount', type=float, default=10)
+    parser.add_argument('--legacy', action='store_true')
+    return parser.parse_args()
+
+def legacy_route(app):
+    # The handler as it was before the ledger: read both users, then write
+    # each balance and the transaction in separate commits.
+    from fastapi import Depends
+    from dependencies import get_user_service, get_transaction_service, get_order_service, get_current_user
+    from schemas.transactions import CreateTransaction
+    from schemas.users import UserUpdate
+
+    async def create_transaction(new_trans: CreateTransaction,
+                                 transaction_service=Depends(get_transaction_service),
+                                 user_service=Depends(get_user_service),
+                                 order_service=Depends(get_order_service),
+                                 current_user=Depends(get_current_user)):
+        entity = new_trans.model_dump()
+        entity['id_user_sender'] = current_user.id
+        sender = await user_service.get_user_filter_by(id=current_user.id)
+        recipient = await user_service.get_user_filter_by(id=entity['id_user_recipient'])
+        amount = Decimal(str(entity['amount']))
+        commission = amount * Decimal('0.01')
+        entity['commission'] = float(commission)
+        if sender.balance < amount + commission:
+            return 'FAILED'
+        order = await order_service.get_one_order_filter_by(id=entity['id_order'])
+        if amount < order.price:
+            return 'FAILED'
+        await user_service.update(user_id=sender.id, data=UserUpdate(balance=sender.balance - amount - commission))
+        await user_service.update(user_id=recipient.id, data=UserUpdate(balance=recipient.balance + amount))
+        await transaction_service.create_transaction(entity)
+        return 'SUCCESS'
+
+    app.router.routes = [route for route in app.router.routes
+                         if not (getattr(route, 'path', None) == '/api/transactions/' and 'POST' in route.methods)]
+    app.add_api_route('/api/transactions/', create_transaction, methods=['POST'], status_code=201)
+
+async def pay(args, client, tokens):
+    semaphore = asyncio.Semaphore(args.concurrency)
+    statuses = {}
+    rng = random.Random(1)
+    pairs = [rng.sample(sorted(tokens), 2) for _ in range(args.payments)]
+
+    async def payment(sender, recipient):
+        async with semaphore:
+            response = await client.post('/api/transactions/', headers={'Authorization': f'Bearer {tokens[sender]}'},
+                                         json={'id_order': 1, 'id_user_recipient': recipient,
+                                               'amount': args.amount, 'type': 'PAYMENT'})
+            key = response.status_code if response.status_code != 201 else response.json()
+            statuses[key] = statuses.get(key, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(payment(sender, recipient) for sender, recipient in pairs))
+    return time.perf_counter() - start, statuses
+
+def drift(session):
+    from sqlalchemy import text
+    expected = {row.id: INITIAL_BALANCE for row in session.execute(text("SELECT id FROM users"))}
+    for row in session.execute(text("SELECT id_user_sender, id_user_recipient, amount, commission FROM transactions")):
+        expected[row.id_user_sender] -= Decimal(str(row.amount)) + Decimal(str(row.commission))
+        expected[row.id_user_recipient] += Decimal(str(row.amount))
+    balances = {row.id: Decimal(str(row.balance)) for row in session.execute(text("SELECT id, balance FROM users"))}
+    # Balances are DECIMAL(10, 2): compare at that precision.
+    deltas = [abs(balances[id] - expected[id]).quantize(Decimal('0.01')) for id in balances]
+    negative = sum(1 for balance in balances.values() if balance < 0)
+    return max(deltas), sum(deltas), negative
+
+def main() -> int:
+    args = parse_args()
+    database = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    database.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{database.name}'
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+    import httpx
+    from sqlalchemy import func, select
+    from config.database import Base, engine, SessionLocal, async_engine
+    from models import User, Order, Transaction
+    from service.auth import AuthService
+    from main import app
+
+    if args.legacy:
+        legacy_route(app)
+
+    try:
+        Base.metadata.create_all(engine)
+        with SessionLocal() as session:
+            users = [User(name=f'User {i}', role='CUSTOMER', email=f'user{i}@example.com', password='-',
+                          balance=INITIAL_BALANCE) for i in range(args.users)]
+            session.add_all(users)
+            session.flush()
+            session.add(Order(id_user_customer=users[0].id, name='Benchmark', description='', price=1))
+            session.commit()
+            auth = AuthService(user_repository=None)
+            tokens = {user.id: auth.gen_token(user) for user in users}
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+                result = await pay(args, client, tokens)
+            await async_engine.dispose()
+            return result
+
+        elapsed, statuses = asyncio.run(run())
+        with SessionLocal() as session:
+            max_drift, total_drift, negative = drift(session)
+            stored = session.scalar(select(func.count()).select_from(Transaction))
+    finally:
+        os.unlink(database.name)
+
+    print(f'mode: {"legacy" if args.legacy else "ledger"}, users: {args.users}, concurrency: {args.concurrency}')
+    print(f'payments: {args.payments} in {elapsed:.2f}s ({args.payments / elapsed:.1f}/s), outcomes: {statuses}')
+    print(f'transactions stored: {stored}, balance drift: max {max_drift} total {total_drift}, negative balances: {negative}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# Login throughput and latency of an unrelated endpoint while a storm of
+# logins is hashing passwords. Runs against a throwaway SQLite database.
+#
+#   python -m benchmarks.login_storm --logins 200 --concurrency 8
+#   python -m benchmarks.login_storm --inline    # hash on the event loop, for comparison
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--probe-interval', type=float, default=0.005)
+    parser.add_argument('--inline', action='store_true')
+    return parser.parse_args()
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+async def storm(args, client):
+    semaphore = asyncio.Semaphore(args.concurrency)
+    probes = []
+    done = asyncio.Event()
+
+    async def login():
+        async with semaphore:
+            response = await client.post('/api/auth/login', data={'email': 'bench@example.com', 'password': 'benchpass1'})
+            assert response.status_code == 200, response.text
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            response = await client.get('/api/specializations/')
+            probes.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+            await asyncio.sleep(args.probe_interval)
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(args.logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+    return elapsed, probes
+
+def main() -> int:
+    args = parse_args()
+    database = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    database.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{database.name}'
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    if args.workers:
+        os.environ['PASSWORD_HASH_WORKERS'] = str(args.workers)
+
+    import httpx
+    import utils.passwords as passwords
+    from config.database import Base, engine, SessionLocal, async_engine
+    from models import User, Specialization
+    from main import app
+
+    if args.inline:
+        async def hash_password(password):
+            return passwords.hasher.hash(password)
+        async def verify_password(password, password_hash):
+            return passwords.hasher.verify(password, password_hash)
+        import service.auth
+        service.auth.hash_password = hash_password
+        service.auth.verify_password = verify_password
+
+    try:
+        Base.metadata.create_all(engine)
+        with SessionLocal() as session:
+            session.add(Specialization(name='Benchmark'))
+            session.add(User(name='Bench', role='CUSTOMER', email='bench@example.com',
+                             password=passwords.hasher.hash('benchpass1')))
+            session.commit()
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+                result = await storm(args, client)
+            await async_engine.dispose()
+            return result
+
+        elapsed, probes = asyncio.run(run())
+    finally:
+        os.unlink(database.name)
+
+    mode = 'inline' if args.inline else f'pool({passwords.executor._max_workers})'
+    print(f'mode: {mode}, rounds: {passwords.hasher.default_rounds}')
+    print(f'logins: {args.logins} in {elapsed:.2f}s ({args.logins / elapsed:.1f}/s)')
+    print(f'probe GET /api/specializations/: n={len(probes)} '
+          f'p50={statistics.median(probes) * 1000:.1f}ms p99={percentile(probes, 0.99) * 1000:.1f}ms')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
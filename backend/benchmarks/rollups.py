@@ -0,0 +1,116 @@
+# Rebuild time of transaction_rollups and report latency from the rollups
+# versus the same report computed from transactions. The database is a
+# throwaway SQLite file filled with --days of transactions.
+#
+#   python -m benchmarks.rollups --days 365 --per-day 2000
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--per-day', type=int, default=2000)
+    parser.add_argument('--specializations', type=int, default=20)
+    parser.add_argument('--orders', type=int, default=5000)
+    return parser.parse_args()
+
+def fill(session, args):
+    from sqlalchemy import text
+    from models import User
+    session.add_all([User(name='Customer', role='CUSTOMER', email='c@example.com', password='-', balance=0),
+                     User(name='Executor', role='EXECUTOR', email='e@example.com', password='-', balance=0)])
+    session.flush()
+    session.execute(text("""
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < :n)
+        INSERT INTO specializations (name) SELECT 'Specialization ' || i FROM seq
+    """), {'n': args.specializations})
+    session.execute(text("""
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < :n)
+        INSERT INTO services (name, description, id_specialization, id_user_executor, price)
+        SELECT 'Service ' || i, '', i, 2, 100 FROM seq
+    """), {'n': args.specializations})
+    session.execute(text("""
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < :n)
+        INSERT INTO orders (id_user_customer, id_user_executor, id_service, status, price, name, description, created_at)
+        SELECT 1, 2, CASE WHEN i % 10 = 0 THEN NULL ELSE i % :specializations + 1 END,
+               'PENDING', 100, 'Order ' || i, '', '2025-01-01'
+        FROM seq
+    """), {'n': args.orders, 'specializations': args.specializations})
+    session.execute(text("""
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < :n)
+        INSERT INTO transactions (id_order, id_user_sender, id_user_recipient, amount, commission, type, created_at)
+        SELECT CASE WHEN i % 4 = 0 THEN NULL ELSE i % :orders + 1 END, 1, 2,
+               (i % 997) + 0.25, round(((i % 997) + 0.25) * 0.01, 2),
+               CASE WHEN i % 4 = 0 THEN 'DEPOSIT' WHEN i % 29 = 0 THEN 'REFUND' ELSE 'PAYMENT' END,
+               datetime('2025-01-01', '+' || (i * 86400 / :per_day) || ' seconds')
+        FROM seq
+    """), {'n': args.days * args.per_day, 'orders': args.orders, 'per_day': args.per_day})
+    session.commit()
+
+# The weekly summary as it had to be computed before rollups existed.
+SCAN_SUMMARY = """
+    SELECT date(transactions.created_at, 'weekday 0', '-6 days') AS bucket,
+           SUM(CASE WHEN transactions.type = 'PAYMENT' THEN transactions.amount END),
+           SUM(CASE WHEN transactions.type = 'PAYMENT' THEN transactions.commission END),
+           SUM(CASE WHEN transactions.type = 'DEPOSIT' THEN transactions.amount END)
+    FROM transactions
+    LEFT OUTER JOIN orders ON orders.id = transactions.id_order
+    LEFT OUTER JOIN services ON services.id = orders.id_service
+    GROUP BY bucket, services.id_specialization
+"""
+
+def main() -> int:
+    args = parse_args()
+    database = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    database.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{database.name}'
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+    from sqlalchemy import text
+    from config.database import Base, engine, SessionLocal, async_engine, AsyncSessionLocal
+    from models import TransactionRollup, Service, Specialization
+    from crud import AsyncTransactionRollupRepository, AsyncServiceRepository
+    from service.services import ServiceService
+    from service.reports import ReportService
+
+    def report_service(db):
+        return ReportService(
+            rollup_repository=AsyncTransactionRollupRepository(model=TransactionRollup, session=db),
+            service_service=ServiceService(service_repository=AsyncServiceRepository(model=Service, session=db),
+                                           specialization_repository=AsyncServiceRepository(model=Specialization, session=db))
+        )
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            service = report_service(db)
+            result = await service.rebuild()
+            start = time.perf_counter()
+            summary = await service.get_summary('week', by_specialization=True)
+            rollup_elapsed = time.perf_counter() - start
+        await async_engine.dispose()
+        return result, len(summary), rollup_elapsed
+
+    try:
+        Base.metadata.create_all(engine)
+        with SessionLocal() as session:
+            fill(session, args)
+        result, rows, rollup_elapsed = asyncio.run(run())
+        with SessionLocal() as session:
+            start = time.perf_counter()
+            scanned = len(session.execute(text(SCAN_SUMMARY)).all())
+            scan_elapsed = time.perf_counter() - start
+    finally:
+        os.unlink(database.name)
+
+    print(f'transactions: {result["transactions"]} over {args.days} days, rollup rows: {result["rows"]}')
+    print(f'rebuild: {result["seconds"]:.2f}s ({result["transactions"] / result["seconds"]:.0f} transactions/s)')
+    print(f'weekly summary by specialization ({rows} rows): rollups {rollup_elapsed * 1000:.1f}ms, '
+          f'scanning transactions {scan_elapsed * 1000:.1f}ms ({scanned} rows)')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+# Cross-process chat throughput through UnixSocketBroker. Each worker process
+# holds its own users and sends messages to users held by the next worker,
+# the way a chat partner connected to another uvicorn worker would.
+#
+#   python -m benchmarks.ws_broker --workers 2 4 8 --messages 20000
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+import time
+from utils.broker import UnixSocketBroker
+
+USERS_PER_WORKER = 100
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--messages', type=int, default=20000)
+    return parser.parse_args()
+
+async def work(index, workers, messages, path, ready, go, results):
+    received = 0
+    done = asyncio.Event()
+
+    def deliver(user_ids, message):
+        nonlocal received
+        received += 1
+        if received == messages:
+            done.set()
+
+    broker = UnixSocketBroker(path)
+    for user in range(USERS_PER_WORKER):
+        broker.subscribe(index * USERS_PER_WORKER + user)
+    await broker.start(deliver)
+    ready.wait()
+    await asyncio.sleep(0.5)
+    go.wait()
+
+    start = time.perf_counter()
+    target = (index + 1) % workers * USERS_PER_WORKER
+    for n in range(messages):
+        await broker.publish([target + n % USERS_PER_WORKER], {'n': n, 'message': 'hello'})
+    await asyncio.wait_for(done.wait(), 120)
+    results.put(time.perf_counter() - start)
+    await asyncio.sleep(0.5)
+    await broker.stop()
+
+def worker(*args):
+    asyncio.run(work(*args))
+
+def measure(workers: int, messages: int) -> float:
+    path = tempfile.mkdtemp(prefix='ws-broker-')
+    ready = multiprocessing.Barrier(workers)
+    go = multiprocessing.Barrier(workers)
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker, args=(i, workers, messages, path, ready, go, results))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    elapsed = max(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    return workers * messages / elapsed
+
+def main() -> int:
+    args = parse_args()
+    per_worker = None
+    for workers in args.workers:
+        throughput = measure(workers, args.messages)
+        per_worker = per_worker or throughput / workers
+        print(f'workers={workers}: {throughput:,.0f} msg/s '
+              f'({throughput / per_worker / workers:.0%} of linear, cpus={multiprocessing.cpu_count()})')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# Serialization cost per delivered chat frame and bytes on the wire for each
+# wire encoding. "per-socket json" is what send_json did before: one stdlib
+# json.dumps for every socket the frame goes to.
+#
+#   python -m benchmarks.ws_encoding --sockets 4 --messages 20000
+import argparse
+import json
+import random
+import sys
+import time
+import zlib
+from datetime import datetime
+from utils.ws_manager import Frame
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sockets', type=int, default=4)
+    parser.add_argument('--messages', type=int, default=20000)
+    return parser.parse_args()
+
+WORDS = ('order', 'design', 'deadline', 'logo', 'invoice', 'draft', 'review', 'price', 'tomorrow',
+         'files', 'changes', 'thanks', 'please', 'colors', 'layout', 'meeting', 'budget', 'final')
+
+def chat_message(n: int) -> dict:
+    text = ' '.join(random.choice(WORDS) for _ in range(random.randint(3, 20)))
+    return {
+        'id': 100000 + n,
+        'type': 'message',
+        'sender_id': random.randint(1, 5000),
+        'recipient_id': random.randint(1, 5000),
+        'message': f'{text} #{random.randint(1, 10000)}',
+        'order_id': n % 50,
+        'created_at': datetime(2025, 1, 1, 12, n // 60 % 60, n % 60, random.randint(0, 999999)).isoformat(),
+    }
+
+def deflated(frames: list) -> int:
+    # permessage-deflate with context takeover: one compressor per connection.
+    compressor = zlib.compressobj(wbits=-15)
+    size = 0
+    for frame in frames:
+        data = frame.encode() if isinstance(frame, str) else frame
+        size += len(compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+    return size
+
+def main() -> int:
+    args = parse_args()
+    random.seed(0)
+    messages = [chat_message(n) for n in range(args.messages)]
+    deliveries = args.messages * args.sockets
+
+    start = time.perf_counter()
+    for message in messages:
+        for _ in range(args.sockets):
+            json.dumps(message, separators=(',', ':'), ensure_ascii=False)
+    baseline = time.perf_counter() - start
+    print(f'per-socket json: {baseline / deliveries * 1e6:.2f}us per delivery')
+
+    for encoding in ('json', 'msgpack'):
+        start = time.perf_counter()
+        frames = []
+        for message in messages:
+            frame = Frame(message)
+            for _ in range(args.sockets):
+                data = frame.encode(encoding)
+            frames.append(data)
+        elapsed = time.perf_counter() - start
+        raw = sum(len(data) for data in frames)
+        print(f'encode-once {encoding}: {elapsed / deliveries * 1e6:.2f}us per delivery '
+              f'({baseline / elapsed:.1f}x), {raw / len(frames):.0f} B/frame, '
+              f'{deflated(frames) / len(frames):.0f} B/frame with permessage-deflate')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
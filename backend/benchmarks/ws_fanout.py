@@ -0,0 +1,82 @@
+# Fan-out latency of ConnectionManager.broadcast_to_chat with many sockets,
+# some of which are slow. Sockets are in-memory stand-ins that decode the
+# encoded frame they are handed and record when it arrived and its size.
+#
+#   python -m benchmarks.ws_fanout --sockets 500 --slow 50 --messages 200 --encoding msgpack
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import msgpack
+import orjson
+from utils.ws_manager import ConnectionManager, ENCODERS
+
+class FakeWebSocket:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.latencies = []
+        self.frame_bytes = 0
+
+    async def receive_frame(self, message: dict, size: int):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.latencies.append(time.perf_counter() - message['sent_at'])
+        self.frame_bytes += size
+
+    async def send_text(self, data: str):
+        await self.receive_frame(orjson.loads(data), len(data.encode()))
+
+    async def send_bytes(self, data: bytes):
+        await self.receive_frame(msgpack.unpackb(data), len(data))
+
+    async def close(self, code: int = 1000):
+        pass
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sockets', type=int, default=500)
+    parser.add_argument('--slow', type=int, default=50)
+    parser.add_argument('--slow-delay', type=float, default=0.5)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--queue-size', type=int, default=64)
+    parser.add_argument('--policy', default='drop')
+    parser.add_argument('--encoding', default='json', choices=sorted(ENCODERS))
+    return parser.parse_args()
+
+async def run(args):
+    manager = ConnectionManager(queue_size=args.queue_size, overflow_policy=args.policy)
+    sockets = []
+    # Pairs of users chatting; every other recipient has a slow socket.
+    for i in range(args.sockets):
+        websocket = FakeWebSocket(args.slow_delay if i < args.slow else 0)
+        sockets.append(websocket)
+        await manager.connect(i, websocket, args.encoding)
+
+    start = time.perf_counter()
+    for n in range(args.messages):
+        for sender in range(0, args.sockets, 2):
+            await manager.broadcast_to_chat({'sent_at': time.perf_counter(), 'n': n},
+                                            recipient_id=sender + 1, sender_id=sender)
+        await asyncio.sleep(0)
+    broadcast_time = time.perf_counter() - start
+    await asyncio.sleep(0.1)
+
+    fast = [latency for websocket in sockets if not websocket.delay for latency in websocket.latencies]
+    stats = manager.stats()
+    frames = sum(len(websocket.latencies) for websocket in sockets)
+    if not fast:
+        print('no frames were delivered to fast sockets')
+        return 1
+    print(f'broadcast {args.messages * args.sockets // 2} messages in {broadcast_time:.2f}s')
+    print(f'fast sockets: {len(fast)} frames, p50={statistics.median(fast) * 1000:.2f}ms '
+          f'p99={sorted(fast)[int(len(fast) * 0.99)] * 1000:.2f}ms')
+    print(f'{args.encoding} frames: {frames}, avg size {sum(w.frame_bytes for w in sockets) / frames:.1f} bytes')
+    print(f'dropped: {sum(s["dropped"] for s in stats)}, lagging connections: {sum(s["lagging"] for s in stats)}')
+    return 0
+
+def main() -> int:
+    return asyncio.run(run(parse_args()))
+
+if __name__ == '__main__':
+    sys.exit(main())
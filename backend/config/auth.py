@@ -9,3 +9,7 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 EXPIRATION_TIME = timedelta(hours=2)
 UPDATE_EXPIRATION_TIME = timedelta(days=60)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 1024))
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 60))
+PASSWORD_HASH_ROUNDS = int(os.getenv('PASSWORD_HASH_ROUNDS', 29000))
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 4))
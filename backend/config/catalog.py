@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+SPECIALIZATION_CACHE_TTL = int(os.getenv('SPECIALIZATION_CACHE_TTL', 300))
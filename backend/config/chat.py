@@ -0,0 +1,21 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+MESSAGE_FLUSH_SIZE = int(os.getenv('MESSAGE_FLUSH_SIZE', 100))
+MESSAGE_FLUSH_INTERVAL = float(os.getenv('MESSAGE_FLUSH_INTERVAL', 0.01))
+WS_QUEUE_SIZE = int(os.getenv('WS_QUEUE_SIZE', 256))
+# What to do with a connection whose outbound queue is full:
+# 'drop' discards the new frame and flags the connection, 'disconnect' closes it.
+WS_OVERFLOW_POLICY = os.getenv('WS_OVERFLOW_POLICY', 'disconnect')
+# 'memory' for a single process, 'unix' for several workers on one host,
+# 'redis' for several hosts (needs the redis package and WS_BROKER_URL).
+WS_BROKER = os.getenv('WS_BROKER', 'memory')
+WS_BROKER_PATH = os.getenv('WS_BROKER_PATH', '/tmp/freelance-ws')
+WS_BROKER_URL = os.getenv('WS_BROKER_URL', 'redis://localhost:6379/0')
+# Seconds between server pings, and of silence after which a socket is closed.
+WS_HEARTBEAT_INTERVAL = float(os.getenv('WS_HEARTBEAT_INTERVAL', 20))
+WS_HEARTBEAT_TIMEOUT = float(os.getenv('WS_HEARTBEAT_TIMEOUT', 60))
+WS_RESUME_LIMIT = int(os.getenv('WS_RESUME_LIMIT', 200))
+# Seconds a socket gets to send {"type": "auth", "token": ...} when the token
+# is not in the query string.
+WS_AUTH_TIMEOUT = float(os.getenv('WS_AUTH_TIMEOUT', 10))
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.engine import create_engine
+from sqlalchemy.engine import create_engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from dotenv import load_dotenv
 import os 
 
@@ -8,14 +9,30 @@ load_dotenv()
 Base = declarative_base()
 
 NAME_DB = os.getenv('NAME_DB')
+DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///./app.db')
 
-engine = create_engine(f'sqlite:///./app.db', connect_args={"check_same_thread": False})
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'mysql': 'mysql+aiomysql',
+}
+
+def to_async_url(url: str):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+# Seconds a SQLite writer waits for the lock before "database is locked".
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', 30))
+
+CONNECT_ARGS = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT} if DATABASE_URL.startswith('sqlite') else {}
+
+engine = create_engine(DATABASE_URL, connect_args=CONNECT_ARGS)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_session():
-    db = SessionLocal()
-    try:
+async_engine = create_async_engine(to_async_url(DATABASE_URL), connect_args=CONNECT_ARGS)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_session():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -0,0 +1,7 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+# Rows fetched from the database cursor per batch; each batch becomes one chunk
+# of the streamed response, so memory stays bounded by this size.
+EXPORT_YIELD_PER = int(os.getenv('EXPORT_YIELD_PER', 1000))
+EXPORT_FORMATS = ('csv', 'ndjson')
@@ -0,0 +1,5 @@
+# Lower bounds of the range facets; the last bucket is open-ended.
+PRICE_BUCKETS = [0, 5000, 10000, 25000, 50000, 100000]
+HOURLY_RATE_BUCKETS = [0, 500, 1000, 2000, 5000]
+DELIVERY_TIME_BUCKETS = [0, 1, 3, 7, 14, 30]
+EXPERIENCE_BANDS = [0, 1, 3, 5, 10]
@@ -0,0 +1,12 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+# Cache-Control for successful GET responses, by path prefix (longest wins).
+# Everything else is private and revalidated with its ETag on every use.
+CACHE_CONTROL = {
+    '/api/specializations': os.getenv('CACHE_CONTROL_SPECIALIZATIONS', 'public, max-age=300'),
+    '/api/services': os.getenv('CACHE_CONTROL_SERVICES', 'public, max-age=30'),
+    '/api/reviews': os.getenv('CACHE_CONTROL_REVIEWS', 'public, max-age=60'),
+    '/api/users': os.getenv('CACHE_CONTROL_USERS', 'private, no-cache'),
+}
+DEFAULT_CACHE_CONTROL = os.getenv('CACHE_CONTROL_DEFAULT', 'private, no-cache')
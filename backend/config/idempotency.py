@@ -0,0 +1,16 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# Set on responses served from the store instead of running the handler.
+IDEMPOTENT_REPLAY_HEADER = 'Idempotent-Replayed'
+# Stored responses are replayed for IDEMPOTENCY_KEY_TTL seconds; expired rows
+# are deleted every IDEMPOTENCY_CLEANUP_INTERVAL seconds.
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', 86400))
+IDEMPOTENCY_CLEANUP_INTERVAL = float(os.getenv('IDEMPOTENCY_CLEANUP_INTERVAL', 3600))
+# A key still in progress after this many seconds may be claimed by a retry;
+# the original request can then no longer commit its write.
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv('IDEMPOTENCY_LOCK_TIMEOUT', 60))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', 4096))
+IDEMPOTENCY_CACHE_TTL = int(os.getenv('IDEMPOTENCY_CACHE_TTL', 300))
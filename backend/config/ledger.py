@@ -0,0 +1,7 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+# Seconds between reconciliation runs; each run checkpoints users with at least
+# LEDGER_SNAPSHOT_MIN_ENTRIES new entries since their last snapshot.
+LEDGER_SNAPSHOT_INTERVAL = float(os.getenv('LEDGER_SNAPSHOT_INTERVAL', 300))
+LEDGER_SNAPSHOT_MIN_ENTRIES = int(os.getenv('LEDGER_SNAPSHOT_MIN_ENTRIES', 20))
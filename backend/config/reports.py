@@ -0,0 +1,6 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+# Transactions read per batch when rollups are rebuilt from scratch.
+ROLLUP_BATCH_SIZE = int(os.getenv('ROLLUP_BATCH_SIZE', 100000))
+REPORT_PERIODS = ('day', 'week', 'month')
@@ -1,6 +1,8 @@
-from .users import UserRepository
-from .messages import MessageRepository
-from .reviews import ReviewRepository
-from .services import ServiceRepository
-from .orders import OrderRepository
-from .transactions import TransactionRepository
+from .users import AsyncUserRepository
+from .messages import AsyncMessageRepository, AsyncConversationRepository
+from .reviews import AsyncReviewRepository
+from .services import AsyncServiceRepository, AsyncServiceCardRepository
+from .orders import AsyncOrderRepository
+from .transactions import AsyncTransactionRepository, AsyncLedgerRepository
+from .idempotency import AsyncIdempotencyRepository
+from .reports import AsyncTransactionRollupRepository
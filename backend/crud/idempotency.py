@@ -0,0 +1,66 @@
+from datetime import datetime
+from sqlalchemy import update, delete, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from utils.abstract_repository import AsyncIREpository
+from models.idempotency import IdempotencyKey
+
+COMPLETION = 'idempotency_completion'
+
+class IdempotencyKeyLost(Exception):
+    ...
+
+# A reservation is identified by its created_at: claim() renews it, so a
+# request that lost its key to a claim no longer matches.
+def reservation(id: int, reserved_at: datetime):
+    return (IdempotencyKey.id == id, IdempotencyKey.created_at == reserved_at,
+            IdempotencyKey.status_code.is_(None))
+
+# Marks the key completed inside the first commit after complete_on_commit(),
+# i.e. in the same transaction as the handler's write. If the key was claimed
+# by another request meanwhile, the commit fails and the write is rolled back.
+@event.listens_for(Session, 'before_commit')
+def complete_key(session: Session):
+    completion = session.info.pop(COMPLETION, None)
+    if completion is None:
+        return
+    id, reserved_at, status_code = completion
+    result = session.execute(update(IdempotencyKey).where(*reservation(id, reserved_at)).values(status_code=status_code))
+    if result.rowcount == 0:
+        raise IdempotencyKeyLost(id)
+
+class AsyncIdempotencyRepository(AsyncIREpository):
+    # Returns None when another request reserved the same key first.
+    async def reserve(self, entity: dict):
+        try:
+            return await self.add(entity)
+        except IntegrityError:
+            await self.session.rollback()
+            return None
+
+    # Takes over a reservation whose request never committed its write.
+    async def claim(self, id: int, locked_before: datetime, entity: dict):
+        result = await self.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == id, IdempotencyKey.status_code.is_(None),
+                   IdempotencyKey.created_at < locked_before)
+            .values(entity)
+        )
+        await self.session.commit()
+        return result.rowcount > 0
+
+    def complete_on_commit(self, id: int, reserved_at: datetime, status_code: int):
+        self.session.info[COMPLETION] = (id, reserved_at, status_code)
+
+    def cancel_completion(self):
+        self.session.info.pop(COMPLETION, None)
+
+    # Releases a reservation whose write was not committed.
+    async def release(self, id: int, reserved_at: datetime):
+        await self.session.execute(delete(IdempotencyKey).where(*reservation(id, reserved_at)))
+        await self.session.commit()
+
+    async def delete_expired(self, now: datetime):
+        result = await self.session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+        await self.session.commit()
+        return result.rowcount
@@ -1,4 +1,47 @@
-from utils.abstract_repository import IREpository
+from collections import defaultdict
+from sqlalchemy import insert, case
+from utils.abstract_repository import AsyncIREpository
+from utils.upsert import upsert
+from models.messages import Message, Conversation, CONVERSATION_KEY
 
-class MessageRepository(IREpository):
-    ...
\ No newline at end of file
+class AsyncMessageRepository(AsyncIREpository):
+    KEYSET = ('created_at', 'id')
+
+    async def add_all(self, entities: list):
+        result = await self.session.execute(insert(Message).returning(Message), entities)
+        messages = result.scalars().all()
+        await self.record_conversations(messages)
+        await self.session.commit()
+        return messages
+
+    async def record_conversations(self, messages):
+        latest = {}
+        unread = defaultdict(lambda: {'unread_low': 0, 'unread_high': 0})
+        for message in messages:
+            low, high = sorted((message.id_user_sender, message.id_user_recipient))
+            key = (low, high, message.id_order)
+            if key not in latest or (message.created_at, message.id) > (latest[key].created_at, latest[key].id):
+                latest[key] = message
+            unread[key]['unread_low' if message.id_user_recipient == low else 'unread_high'] += 1
+
+        rows = [{
+            'id_user_low': low, 'id_user_high': high, 'id_order': id_order,
+            'id_last_message': message.id, 'last_activity_at': message.created_at, **unread[(low, high, id_order)],
+        } for (low, high, id_order), message in latest.items()]
+
+        # One upsert per batch: writers in other workers touching the same
+        # pair add to its counters instead of inserting a second row, and a
+        # concurrent mark-as-read is not overwritten.
+        def updates(inserted):
+            newer = inserted.last_activity_at >= Conversation.last_activity_at
+            return {
+                'id_last_message': case((newer, inserted.id_last_message), else_=Conversation.id_last_message),
+                'unread_low': Conversation.unread_low + inserted.unread_low,
+                'unread_high': Conversation.unread_high + inserted.unread_high,
+                'last_activity_at': case((newer, inserted.last_activity_at), else_=Conversation.last_activity_at),
+            }
+        await self.session.execute(upsert(self.session.get_bind().dialect.name, Conversation, rows,
+                                          CONVERSATION_KEY, updates))
+
+class AsyncConversationRepository(AsyncIREpository):
+    KEYSET = ('last_activity_at', 'id')
@@ -1,4 +1,25 @@
-from utils.abstract_repository import IREpository
+from sqlalchemy.orm import aliased
+from utils.abstract_repository import AsyncIREpository
+from models.orders import Order
+from models.users import User
+from models.services import Service
 
-class OrderRepository(IREpository):
-    ...
+class AsyncOrderRepository(AsyncIREpository):
+    KEYSET = ('created_at', 'id')
+    EXPORT_COLUMNS = ('id', 'created_at', 'updated_at', 'deadline', 'status', 'price', 'name',
+                      'id_service', 'service_name', 'id_user_customer', 'customer_name',
+                      'id_user_executor', 'executor_name')
+
+    # Flat rows for export with the service and user names joined in, in EXPORT_COLUMNS order.
+    def select_export(self, query):
+        customer, executor = aliased(User), aliased(User)
+        return query.with_only_columns(
+            Order.id, Order.created_at, Order.updated_at, Order.deadline, Order.status, Order.price, Order.name,
+            Order.id_service, Service.name,
+            Order.id_user_customer, customer.name,
+            Order.id_user_executor, executor.name,
+        ).select_from(Order).outerjoin(Service, Service.id == Order.id_service).outerjoin(
+            customer, customer.id == Order.id_user_customer
+        ).outerjoin(
+            executor, executor.id == Order.id_user_executor
+        ).order_by(Order.created_at, Order.id)
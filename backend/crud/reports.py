@@ -0,0 +1,99 @@
+from sqlalchemy import select, insert, delete, func, cast, case, Integer
+from utils.abstract_repository import AsyncIREpository
+from utils.upsert import upsert
+from utils.rollups import NO_SPECIALIZATION, aggregate, merge, to_rows
+from utils.enums import TransactionType
+from models.orders import Transaction, Order
+from models.services import Service
+from models.reports import TransactionRollup
+
+def specialization_of(id_order):
+    return func.coalesce(
+        select(Service.id_specialization).join(Order, Order.id_service == Service.id)
+        .where(Order.id == id_order).scalar_subquery(),
+        NO_SPECIALIZATION
+    )
+
+# Adds rows to the totals already stored under the same key.
+def upsert_rollups(rows: list, dialect: str):
+    return upsert(dialect, TransactionRollup, rows,
+                  [TransactionRollup.bucket, TransactionRollup.type, TransactionRollup.id_specialization],
+                  lambda inserted: {
+                      'count': TransactionRollup.count + inserted.count,
+                      'amount': TransactionRollup.amount + inserted.amount,
+                      'commission': TransactionRollup.commission + inserted.commission,
+                  })
+
+def rollup_transaction(transaction: Transaction, dialect: str):
+    return upsert_rollups([{
+        'bucket': transaction.created_at.date(),
+        'type': transaction.type,
+        'id_specialization': specialization_of(transaction.id_order),
+        'count': 1,
+        'amount': transaction.amount,
+        'commission': transaction.commission,
+    }], dialect)
+
+class AsyncTransactionRollupRepository(AsyncIREpository):
+    # Transactions as (day, type, id_specialization, amount_cents, commission_cents), the input of utils.rollups.aggregate.
+    def select_source(self, *conditions):
+        return select(
+            func.date(Transaction.created_at),
+            Transaction.type,
+            func.coalesce(Service.id_specialization, NO_SPECIALIZATION),
+            cast(func.round(Transaction.amount * 100), Integer),
+            cast(func.round(Transaction.commission * 100), Integer),
+        ).select_from(Transaction).outerjoin(Order, Order.id == Transaction.id_order).outerjoin(
+            Service, Service.id == Order.id_service
+        ).where(*conditions)
+
+    async def get_last_transaction_id(self):
+        return await self.session.scalar(select(func.coalesce(func.max(Transaction.id), 0)))
+
+    # Swaps in totals computed from transactions up to id_last_transaction.
+    # Transactions committed since then are merged in from inside the same
+    # write, so none is lost or counted twice. Returns how many that was.
+    async def replace(self, totals: dict, id_last_transaction: int):
+        try:
+            await self.session.execute(delete(TransactionRollup))
+            tail = (await self.session.execute(self.select_source(Transaction.id > id_last_transaction))).all()
+            rows = to_rows(merge(totals, aggregate(tail)))
+            if rows:
+                await self.session.execute(insert(TransactionRollup), rows)
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        return len(tail)
+
+    # Reports are grouped by day here; utils.rollups.by_period folds the days
+    # into weeks and months.
+    def select_report(self, *conditions, by_type: bool = True, by_specialization: bool = True):
+        keys = [TransactionRollup.bucket]
+        if by_type:
+            keys.append(TransactionRollup.type)
+        if by_specialization:
+            keys.append(TransactionRollup.id_specialization)
+        return select(
+            *keys,
+            func.sum(TransactionRollup.count).label('count'),
+            func.sum(TransactionRollup.amount).label('amount'),
+            func.sum(TransactionRollup.commission).label('commission'),
+        ).where(*conditions).group_by(*keys).order_by(*keys)
+
+    # One row per day (and specialization) with the amounts of each type side by side.
+    def select_summary(self, *conditions, by_specialization: bool = False):
+        keys = [TransactionRollup.bucket, TransactionRollup.id_specialization] if by_specialization else [TransactionRollup.bucket]
+
+        def total(column, type):
+            return func.coalesce(func.sum(case((TransactionRollup.type == type, column))), 0)
+
+        return select(
+            *keys,
+            total(TransactionRollup.amount, TransactionType.PAYMENT.value).label('gmv'),
+            total(TransactionRollup.count, TransactionType.PAYMENT.value).label('payments'),
+            total(TransactionRollup.commission, TransactionType.PAYMENT.value).label('commission'),
+            total(TransactionRollup.amount, TransactionType.DEPOSIT.value).label('deposits'),
+            total(TransactionRollup.amount, TransactionType.WITHDRAWAL.value).label('withdrawals'),
+            total(TransactionRollup.amount, TransactionType.REFUND.value).label('refunds'),
+        ).where(*conditions).group_by(*keys).order_by(*keys)
@@ -1,4 +1,4 @@
-from utils.abstract_repository import IREpository
+from utils.abstract_repository import AsyncIREpository
 
-class ReviewRepository(IREpository):
-    ...
\ No newline at end of file
+class AsyncReviewRepository(AsyncIREpository):
+    KEYSET = ('created_at', 'id')
@@ -1,4 +1,53 @@
-from utils.abstract_repository import IREpository
+from sqlalchemy import select, insert, update, delete, exists, literal, bindparam
+from sqlalchemy.exc import IntegrityError
+from utils.abstract_repository import AsyncIREpository
+from models.services import Service, ServiceCard
+from models.users import User
 
-class ServiceRepository(IREpository):
-    ...
\ No newline at end of file
+cards = ServiceCard.__table__
+
+# Empties the matching cards and bumps their version, so a rebuild that read
+# its sources before this write cannot store its result over it. Writers
+# execute it in their own transaction, before the write it belongs to.
+def invalidate_cards(*conditions):
+    return update(ServiceCard).where(*conditions).values(document=None, version=ServiceCard.version + 1)
+
+class AsyncServiceRepository(AsyncIREpository):
+    ...
+
+class AsyncServiceCardRepository(AsyncIREpository):
+    # Neither method commits: the caller's write does.
+    async def invalidate(self, *conditions):
+        await self.session.execute(invalidate_cards(*conditions))
+
+    async def invalidate_by_executor_profile(self, id_executor_profile: int):
+        executors = select(User.id).where(User.id_executor_profile == id_executor_profile)
+        await self.invalidate(ServiceCard.id_user_executor.in_(executors))
+
+    async def remove(self, id: int):
+        await self.session.execute(delete(ServiceCard).where(ServiceCard.id == id))
+
+    # Creates empty cards for services that have none yet and returns every
+    # card of ids, committed before the caller reads the services. A service
+    # deleted meanwhile gets no card, so nothing is left behind.
+    async def reserve(self, ids) -> dict:
+        missing = select(Service.id, Service.id_user_executor, literal(0)).where(
+            Service.id.in_(ids), ~exists().where(ServiceCard.id == Service.id)
+        )
+        try:
+            await self.session.execute(insert(ServiceCard).from_select(['id', 'id_user_executor', 'version'], missing))
+            await self.session.commit()
+        except IntegrityError:
+            # Another reader created them first.
+            await self.session.rollback()
+        query = select(ServiceCard.id, ServiceCard.version, ServiceCard.document).where(ServiceCard.id.in_(ids))
+        return {row.id: row for row in await self.get_rows(query)}
+
+    # Stores documents only into cards still at the version they were built for.
+    async def store(self, documents: list):
+        await self.session.execute(
+            update(cards).where(cards.c.id == bindparam('card_id'), cards.c.version == bindparam('card_version'))
+            .values(document=bindparam('card_document')),
+            documents
+        )
+        await self.session.commit()
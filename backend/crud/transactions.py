@@ -1,4 +1,97 @@
-from utils.abstract_repository import IREpository
+from sqlalchemy import select, insert, update, func, and_
+from sqlalchemy.orm import aliased
+from utils.abstract_repository import AsyncIREpository
+from models.orders import Transaction, Order
+from models.users import User
+from models.services import ServiceCard
+from models.ledger import LedgerEntry, BalanceSnapshot
+from crud.reports import rollup_transaction
+from crud.services import invalidate_cards
 
-class TransactionRepository(IREpository):
-    ...
\ No newline at end of file
+class InsufficientFunds(Exception):
+    ...
+
+class AccountNotFound(Exception):
+    ...
+
+class AsyncTransactionRepository(AsyncIREpository):
+    KEYSET = ('created_at', 'id')
+    EXPORT_COLUMNS = ('id', 'created_at', 'type', 'amount', 'commission', 'id_order', 'order_name',
+                      'id_user_sender', 'sender_name', 'id_user_recipient', 'recipient_name')
+
+    # Flat rows for export with the order and user names joined in, in EXPORT_COLUMNS order.
+    def select_export(self, query):
+        sender, recipient = aliased(User), aliased(User)
+        return query.with_only_columns(
+            Transaction.id, Transaction.created_at, Transaction.type, Transaction.amount, Transaction.commission,
+            Transaction.id_order, Order.name,
+            Transaction.id_user_sender, sender.name,
+            Transaction.id_user_recipient, recipient.name,
+        ).select_from(Transaction).outerjoin(Order, Order.id == Transaction.id_order).outerjoin(
+            sender, sender.id == Transaction.id_user_sender
+        ).outerjoin(
+            recipient, recipient.id == Transaction.id_user_recipient
+        ).order_by(Transaction.created_at, Transaction.id)
+
+    # Balance changes and the transaction row commit together or not at all.
+    # A debit only applies while the balance covers it, so concurrent payments
+    # never read-modify-write a stale balance.
+    async def transfer(self, entity: dict, debits: dict = None, credits: dict = None):
+        try:
+            for id_user, amount in (debits or {}).items():
+                result = await self.session.execute(
+                    update(User).where(User.id == id_user, User.balance >= amount)
+                    .values(balance=User.balance - amount)
+                )
+                if result.rowcount == 0:
+                    raise InsufficientFunds(id_user)
+            for id_user, amount in (credits or {}).items():
+                result = await self.session.execute(
+                    update(User).where(User.id == id_user).values(balance=User.balance + amount)
+                )
+                if result.rowcount == 0:
+                    raise AccountNotFound(id_user)
+            transaction = Transaction(**entity)
+            self.session.add(transaction)
+            await self.session.flush()
+            entries = [{'id_user': id_user, 'id_transaction': transaction.id, 'amount': -amount}
+                       for id_user, amount in (debits or {}).items()]
+            entries += [{'id_user': id_user, 'id_transaction': transaction.id, 'amount': amount}
+                        for id_user, amount in (credits or {}).items()]
+            if entries:
+                await self.session.execute(insert(LedgerEntry), entries)
+            await self.session.execute(rollup_transaction(transaction, self.session.get_bind().dialect.name))
+            # Service cards embed the executor's balance.
+            touched = {*(debits or {}), *(credits or {})}
+            if touched:
+                await self.session.execute(invalidate_cards(ServiceCard.id_user_executor.in_(touched)))
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        return transaction
+
+class AsyncLedgerRepository(AsyncIREpository):
+    # Per user: the stored balance next to the one derived from the latest
+    # snapshot plus the entries after it, and how many entries that tail has.
+    def select_balances(self, *conditions):
+        recent = aliased(BalanceSnapshot)
+        latest = select(recent.id).where(recent.id_user == User.id).order_by(
+            recent.id_last_entry.desc()
+        ).limit(1).correlate(User).scalar_subquery()
+        since = func.coalesce(BalanceSnapshot.id_last_entry, 0)
+        return select(
+            User.id,
+            User.balance.label('stored'),
+            (func.coalesce(BalanceSnapshot.balance, 0) + func.coalesce(func.sum(LedgerEntry.amount), 0)).label('derived'),
+            func.coalesce(func.max(LedgerEntry.id), since).label('id_last_entry'),
+            func.count(LedgerEntry.id).label('entries'),
+        ).select_from(User).outerjoin(BalanceSnapshot, BalanceSnapshot.id == latest).outerjoin(
+            LedgerEntry, and_(LedgerEntry.id_user == User.id, LedgerEntry.id > since)
+        ).where(*conditions).group_by(
+            User.id, User.balance, BalanceSnapshot.id, BalanceSnapshot.balance, BalanceSnapshot.id_last_entry
+        )
+
+    async def add_snapshots(self, snapshots: list):
+        await self.session.execute(insert(BalanceSnapshot), snapshots)
+        await self.session.commit()
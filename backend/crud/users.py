@@ -1,4 +1,16 @@
-from utils.abstract_repository import IREpository
+from datetime import datetime
+from sqlalchemy import select, insert, update, literal
+from utils.abstract_repository import AsyncIREpository
+from models.users import User
+from models.ledger import LedgerEntry
 
-class UserRepository(IREpository):
-    ...
\ No newline at end of file
+class AsyncUserRepository(AsyncIREpository):
+    # An overwritten balance is recorded as a correction entry for the
+    # difference, in the same commit.
+    async def set_balance(self, id_user: int, balance):
+        await self.session.execute(insert(LedgerEntry).from_select(
+            ['id_user', 'amount', 'created_at'],
+            select(User.id, literal(balance) - User.balance, literal(datetime.now())).where(User.id == id_user)
+        ))
+        await self.session.execute(update(User).where(User.id == id_user).values(balance=balance))
+        await self.session.commit()
@@ -1,8 +1,8 @@
 from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import *
 from crud import *
-from config.database import get_session
+from config.database import get_async_session
 from config.auth import oauth2_scheme
 from utils.enums import Roles, AuthStatus
 from service.auth import AuthService
@@ -11,79 +11,148 @@ from service.services import ServiceService
 from service.orders import OrderService
 from service.reviews import ReviewService
 from service.transactions import TransactionService
+from service.ledger import LedgerService
 from service.message import MessageService
+from service.hydration import HydrationService
+from service.service_cards import ServiceCardService
+from service.idempotency import IdempotencyService
+from service.reports import ReportService
 
 # User and Auth
-def get_user_repository(db: Session = Depends(get_session)):
-    return UserRepository(model=User, session=db)
+def get_user_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncUserRepository(model=User, session=db)
 
-def get_executor_repository(db: Session = Depends(get_session)):
-    return UserRepository(model=ExecutorProfile, session=db)
+def get_executor_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncUserRepository(model=ExecutorProfile, session=db)
 
-def get_customer_repository(db: Session = Depends(get_session)):
-    return UserRepository(model=CustomerProfile, session=db)
+def get_customer_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncUserRepository(model=CustomerProfile, session=db)
 
-def get_auth_service(user_repository: UserRepository = Depends(get_user_repository)) -> AuthService:
+def get_auth_service(user_repository: AsyncUserRepository = Depends(get_user_repository)) -> AuthService:
     return AuthService(user_repository=user_repository)
 
-def get_current_user(token: str=Depends(oauth2_scheme), user_repository: UserRepository = Depends(get_user_repository)) -> User:
+async def get_current_user(token: str=Depends(oauth2_scheme), user_repository: AsyncUserRepository = Depends(get_user_repository)) -> User:
     service = AuthService(user_repository=user_repository)
-    return service.get_user_by_token(token)
+    return await service.get_user_by_token(token)
 
-def get_current_admin(token: str=Depends(oauth2_scheme), user_repository: UserRepository = Depends(get_user_repository)) -> User:
+async def get_current_admin(token: str=Depends(oauth2_scheme), user_repository: AsyncUserRepository = Depends(get_user_repository)) -> User:
     service = AuthService(user_repository=user_repository)
-    user = service.get_user_by_token(token)
+    user = await service.get_user_by_token(token)
     if user.role != Roles.ADMIN.value:
         raise HTTPException(status_code=403, detail={'status': AuthStatus.FORBIDDEN.value})
     return user
 
-def get_user_service(user_repository: UserRepository = Depends(get_user_repository),
-                     executor_repository: UserRepository = Depends(get_executor_repository),
-                     customer_repository: UserRepository = Depends(get_customer_repository)) -> UserService:
+# Chat routes keep the user id in the path; it has to be the caller's own.
+async def get_chat_user(id_user: int, current_user: User = Depends(get_current_user)) -> User:
+    if current_user.id != id_user:
+        raise HTTPException(status_code=403, detail={'status': AuthStatus.FORBIDDEN.value})
+    return current_user
+
+def get_service_card_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncServiceCardRepository(model=ServiceCard, session=db)
+
+def get_user_service(user_repository: AsyncUserRepository = Depends(get_user_repository),
+                     executor_repository: AsyncUserRepository = Depends(get_executor_repository),
+                     customer_repository: AsyncUserRepository = Depends(get_customer_repository),
+                     card_repository: AsyncServiceCardRepository = Depends(get_service_card_repository)) -> UserService:
     return UserService(user_repository=user_repository,
                        executor_repository=executor_repository,
-                       customer_repository=customer_repository)
+                       customer_repository=customer_repository,
+                       card_repository=card_repository)
 
 
 # Service and Specialization
-def get_service_repository(db: Session = Depends(get_session)):
-    return ServiceRepository(model=Service, session=db)
+def get_service_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncServiceRepository(model=Service, session=db)
 
-def get_specialization_repository(db: Session = Depends(get_session)):
-    return ServiceRepository(model=Specialization, session=db)
+def get_specialization_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncServiceRepository(model=Specialization, session=db)
 
-def get_service_service(service_repository: ServiceRepository = Depends(get_service_repository),
-                        specialization_repository: ServiceRepository = Depends(get_specialization_repository)) -> ServiceService:
+def get_service_service(service_repository: AsyncServiceRepository = Depends(get_service_repository),
+                        specialization_repository: AsyncServiceRepository = Depends(get_specialization_repository),
+                        card_repository: AsyncServiceCardRepository = Depends(get_service_card_repository)) -> ServiceService:
     return ServiceService(service_repository=service_repository,
-                          specialization_repository=specialization_repository)
+                          specialization_repository=specialization_repository,
+                          card_repository=card_repository)
 
 
 # Order
-def get_order_repository(db: Session = Depends(get_session)):
-    return OrderRepository(model=Order, session=db)
+def get_order_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncOrderRepository(model=Order, session=db)
 
 
-def get_order_service(order_repository: OrderRepository = Depends(get_order_repository), service_repository: ServiceRepository = Depends(get_service_repository)) -> OrderService:
+def get_order_service(order_repository: AsyncOrderRepository = Depends(get_order_repository), service_repository: AsyncServiceRepository = Depends(get_service_repository)) -> OrderService:
     return OrderService(order_repository=order_repository, service_repository=service_repository)
 
 # Review
-def get_review_repository(db: Session = Depends(get_session)):
-    return ReviewRepository(model=Review, session=db)
+def get_review_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncReviewRepository(model=Review, session=db)
 
-def get_review_service(review_repository: ReviewRepository = Depends(get_review_repository)) -> ReviewService:
+def get_review_service(review_repository: AsyncReviewRepository = Depends(get_review_repository)) -> ReviewService:
     return ReviewService(review_repository=review_repository)
 
 # Transaction
-def get_transaction_repository(db: Session = Depends(get_session)):
-    return TransactionRepository(model=Transaction, session=db)
+def get_transaction_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncTransactionRepository(model=Transaction, session=db)
 
-def get_transaction_service(transaction_repository: TransactionRepository = Depends(get_transaction_repository)) -> TransactionService:
+def get_transaction_service(transaction_repository: AsyncTransactionRepository = Depends(get_transaction_repository)) -> TransactionService:
     return TransactionService(transaction_repository=transaction_repository)
 
+def get_ledger_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncLedgerRepository(model=LedgerEntry, session=db)
 
-# Message
-def get_message_repository(db: Session = Depends(get_session)):
-    return MessageRepository(model=Message, session=db)
+def get_ledger_service(transaction_repository: AsyncTransactionRepository = Depends(get_transaction_repository),
+                       user_repository: AsyncUserRepository = Depends(get_user_repository),
+                       order_repository: AsyncOrderRepository = Depends(get_order_repository),
+                       ledger_repository: AsyncLedgerRepository = Depends(get_ledger_repository)) -> LedgerService:
+    return LedgerService(transaction_repository=transaction_repository,
+                         user_repository=user_repository,
+                         order_repository=order_repository,
+                         ledger_repository=ledger_repository)
+
+
+# Reports
+def get_rollup_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncTransactionRollupRepository(model=TransactionRollup, session=db)
 
-def get_message_service(message_repository: MessageRepository = Depends(get_message_repository)) -> MessageService:
-    return MessageService(message_repository=message_repository)
+def get_report_service(rollup_repository: AsyncTransactionRollupRepository = Depends(get_rollup_repository),
+                       service_service: ServiceService = Depends(get_service_service)) -> ReportService:
+    return ReportService(rollup_repository=rollup_repository, service_service=service_service)
+
+
+# Idempotency
+def get_idempotency_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncIdempotencyRepository(model=IdempotencyKey, session=db)
+
+def get_idempotency_service(idempotency_repository: AsyncIdempotencyRepository = Depends(get_idempotency_repository)) -> IdempotencyService:
+    return IdempotencyService(idempotency_repository=idempotency_repository)
+
+
+# Message
+def get_message_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncMessageRepository(model=Message, session=db)
+
+def get_conversation_repository(db: AsyncSession = Depends(get_async_session)):
+    return AsyncConversationRepository(model=Conversation, session=db)
+
+def get_message_service(message_repository: AsyncMessageRepository = Depends(get_message_repository),
+                        conversation_repository: AsyncConversationRepository = Depends(get_conversation_repository)) -> MessageService:
+    return MessageService(message_repository=message_repository, conversation_repository=conversation_repository)
+
+
+# Hydration
+def get_hydration_service(user_service: UserService = Depends(get_user_service),
+                          service_service: ServiceService = Depends(get_service_service),
+                          order_service: OrderService = Depends(get_order_service),
+                          message_service: MessageService = Depends(get_message_service)) -> HydrationService:
+    return HydrationService(user_service=user_service,
+                            service_service=service_service,
+                            order_service=order_service,
+                            message_service=message_service)
+
+def get_service_card_service(service_repository: AsyncServiceRepository = Depends(get_service_repository),
+                             card_repository: AsyncServiceCardRepository = Depends(get_service_card_repository),
+                             hydration_service: HydrationService = Depends(get_hydration_service)) -> ServiceCardService:
+    return ServiceCardService(service_repository=service_repository,
+                              card_repository=card_repository,
+                              hydration_service=hydration_service)
@@ -1,15 +1,39 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from routers import routers
 from starlette.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
-from utils.ws_manager import manager
-import json
-from datetime import datetime
-from config.database import SessionLocal
-from models.messages import Message
-from models.users import User
+from utils.ws_manager import manager, negotiate_encoding, decode_frame, Frame
+from utils.message_writer import message_writer
+from utils.ledger_reconciler import ledger_reconciler
+from utils.idempotency_cleaner import idempotency_cleaner
+from utils.websocket_handler import process_websocket_message, resume_websocket, authenticate_websocket
+from config.pagination import NEXT_CURSOR_HEADER
+from config.idempotency import IDEMPOTENT_REPLAY_HEADER
+from utils.http_cache import ConditionalGetMiddleware
+from config.database import async_engine, AsyncSessionLocal
+from crud.services import AsyncServiceRepository
+from models.services import Service, Specialization
+from service.services import ServiceService
 
-app = FastAPI(title="Freelance API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with AsyncSessionLocal() as db:
+        await ServiceService(service_repository=AsyncServiceRepository(model=Service, session=db),
+                             specialization_repository=AsyncServiceRepository(model=Specialization, session=db)
+                             ).get_specializations()
+    message_writer.start()
+    await manager.start()
+    ledger_reconciler.start()
+    idempotency_cleaner.start()
+    yield
+    await idempotency_cleaner.stop()
+    await ledger_reconciler.stop()
+    await manager.stop()
+    await message_writer.stop()
+    await async_engine.dispose()
+
+app = FastAPI(title="Freelance API", lifespan=lifespan)
 
 app.include_router(routers)
 
@@ -19,41 +43,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, 'ETag', IDEMPOTENT_REPLAY_HEADER],
 )
 
+app.add_middleware(ConditionalGetMiddleware)
+
 @app.get('/{image_name}')
 async def get_image(image_name: str):
     return FileResponse(f'./images/{image_name}')
 
 @app.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: int):
-    await websocket.accept()
-    await manager.connect(user_id, websocket)
+    encoding = negotiate_encoding(websocket.scope.get('subprotocols', []))
+    await websocket.accept(subprotocol=encoding)
+    try:
+        authenticated = await authenticate_websocket(websocket, user_id)
+    except WebSocketDisconnect:
+        return
+    if not authenticated:
+        await websocket.close(code=1008)
+        return
+    connection = await manager.connect(user_id, websocket, encoding or 'json')
 
     try:
         while True:
-            data_str = await websocket.receive_text()
-            data = json.loads(data_str)
-            
+            data = decode_frame(await websocket.receive())
+            connection.touch(heartbeat=data.get("type") in ("ping", "pong"))
+
             if data.get("type") == "message":
-                sender_id = user_id
-                recipient_id = data["recipient_id"]
-                message = data["message"]
-
-                message_data = {
-                    "type": "message",
-                    "sender_id": sender_id,
-                    "recipient_id": recipient_id,
-                    "message": message,
-                    "created_at": datetime.now().isoformat(),
-                }
-
-                await manager.broadcast_to_chat(
-                    message=message_data,
-                    recipient_id=recipient_id,
-                    sender_id=sender_id
+                await process_websocket_message(
+                    user_id=user_id,
+                    recipient_id=data["recipient_id"],
+                    message_text=data["message"],
+                    order_id=data.get("order_id")
                 )
+            elif data.get("type") == "resume":
+                await resume_websocket(connection, user_id, int(data.get("last_message_id") or 0))
+            elif data.get("type") == "ping":
+                connection.enqueue(Frame({"type": "pong"}))
 
     except WebSocketDisconnect:
-        manager.disconnect(user_id)
         print(f"User {user_id} disconnected")
+    finally:
+        manager.disconnect(user_id, websocket)
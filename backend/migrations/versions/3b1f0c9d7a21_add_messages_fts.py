@@ -0,0 +1,71 @@
+"""add messages fts
+
+Revision ID: 3b1f0c9d7a21
+Revises: ea867be504ac
+Create Date: 2026-10-18 11:40:12.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b1f0c9d7a21'
+down_revision: Union[str, None] = 'ea867be504ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PARTICIPANTS = "'u' || {0}.id_user_sender || ' u' || {0}.id_user_recipient"
+
+
+# External content index: the text stays in messages and is read back through
+# the messages_fts_content view for snippets, the triggers keep the index in sync.
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(f"""
+        CREATE VIEW messages_fts_content AS
+        SELECT id, message, {PARTICIPANTS.format('messages')} AS participants FROM messages
+    """)
+    op.execute("""
+        CREATE VIRTUAL TABLE messages_fts USING fts5(
+            message, participants,
+            content='messages_fts_content', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+    op.execute("INSERT INTO messages_fts (messages_fts, rank) VALUES ('rank', 'bm25(1.0, 0.0)')")
+    op.execute(f"""
+        CREATE TRIGGER messages_fts_insert AFTER INSERT ON messages BEGIN
+            INSERT INTO messages_fts (rowid, message, participants)
+            VALUES (new.id, new.message, {PARTICIPANTS.format('new')});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER messages_fts_delete AFTER DELETE ON messages BEGIN
+            INSERT INTO messages_fts (messages_fts, rowid, message, participants)
+            VALUES ('delete', old.id, old.message, {PARTICIPANTS.format('old')});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER messages_fts_update AFTER UPDATE OF message, id_user_sender, id_user_recipient ON messages BEGIN
+            INSERT INTO messages_fts (messages_fts, rowid, message, participants)
+            VALUES ('delete', old.id, old.message, {PARTICIPANTS.format('old')});
+            INSERT INTO messages_fts (rowid, message, participants)
+            VALUES (new.id, new.message, {PARTICIPANTS.format('new')});
+        END
+    """)
+    op.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute('DROP TRIGGER IF EXISTS messages_fts_update')
+    op.execute('DROP TRIGGER IF EXISTS messages_fts_delete')
+    op.execute('DROP TRIGGER IF EXISTS messages_fts_insert')
+    op.execute('DROP TABLE IF EXISTS messages_fts')
+    op.execute('DROP VIEW IF EXISTS messages_fts_content')
@@ -0,0 +1,71 @@
+"""add catalog fts
+
+Revision ID: 9d4e2a7c1b53
+Revises: 3b1f0c9d7a21
+Create Date: 2026-10-18 12:25:41.730915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4e2a7c1b53'
+down_revision: Union[str, None] = '3b1f0c9d7a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index, content table, indexed columns, bm25 weights)
+INDEXES = [
+    ('services_fts', 'services', ('name', 'description'), '10.0, 1.0'),
+    ('executors_fts', 'executor_profiles', ('skills', 'description'), '5.0, 1.0'),
+]
+
+
+# External content indexes: the text stays in the catalog tables, the triggers
+# keep the index in sync with every insert, update and delete.
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for index, table, columns, weights in INDEXES:
+        names = ', '.join(columns)
+        new = ', '.join(f'new.{column}' for column in columns)
+        old = ', '.join(f'old.{column}' for column in columns)
+        op.execute(f"""
+            CREATE VIRTUAL TABLE {index} USING fts5(
+                {names},
+                content='{table}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """)
+        op.execute(f"INSERT INTO {index} ({index}, rank) VALUES ('rank', 'bm25({weights})')")
+        op.execute(f"""
+            CREATE TRIGGER {index}_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO {index} (rowid, {names}) VALUES (new.id, {new});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {index}_delete AFTER DELETE ON {table} BEGIN
+                INSERT INTO {index} ({index}, rowid, {names}) VALUES ('delete', old.id, {old});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {index}_update AFTER UPDATE OF {names} ON {table} BEGIN
+                INSERT INTO {index} ({index}, rowid, {names}) VALUES ('delete', old.id, {old});
+                INSERT INTO {index} (rowid, {names}) VALUES (new.id, {new});
+            END
+        """)
+        op.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for index, table, columns, weights in reversed(INDEXES):
+        op.execute(f'DROP TRIGGER IF EXISTS {index}_update')
+        op.execute(f'DROP TRIGGER IF EXISTS {index}_delete')
+        op.execute(f'DROP TRIGGER IF EXISTS {index}_insert')
+        op.execute(f'DROP TABLE IF EXISTS {index}')
@@ -3,3 +3,6 @@ from .users import *
 from .messages import *
 from .reviews import *
 from .services import *
+from .ledger import *
+from .idempotency import *
+from .reports import *
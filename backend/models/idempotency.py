@@ -0,0 +1,22 @@
+from config.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, String, Text, ForeignKey, DATETIME, Index
+from datetime import datetime
+from typing import Optional
+
+# Response stored for an Idempotency-Key. status_code stays empty until the
+# first request with the key commits its write, response until it is stored.
+class IdempotencyKey(Base):
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        Index('ix_idempotency_keys_user_key', 'id_user', 'key', unique=True),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    id_user: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    key: Mapped[str] = mapped_column(String(255))
+    fingerprint: Mapped[str] = mapped_column(String(64))
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    response: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DATETIME, default=datetime.now)
+    expires_at: Mapped[datetime] = mapped_column(DATETIME, index=True)
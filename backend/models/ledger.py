@@ -0,0 +1,32 @@
+from config.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, DECIMAL, ForeignKey, DATETIME, Index
+from datetime import datetime
+from typing import Optional
+
+# Append-only: every balance change is one signed entry. id_transaction is
+# empty for opening balances and manual corrections.
+class LedgerEntry(Base):
+    __tablename__ = 'ledger_entries'
+    __table_args__ = (
+        Index('ix_ledger_entries_user_id', 'id_user', 'id'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    id_user: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    id_transaction: Mapped[Optional[int]] = mapped_column(ForeignKey('transactions.id'), nullable=True, index=True)
+    amount: Mapped[float] = mapped_column(DECIMAL(12, 2))
+    created_at: Mapped[datetime] = mapped_column(DATETIME, default=datetime.now)
+
+# Checkpoint of a user's balance: the sum of all their entries up to id_last_entry.
+class BalanceSnapshot(Base):
+    __tablename__ = 'balance_snapshots'
+    __table_args__ = (
+        Index('ix_balance_snapshots_user_last_entry', 'id_user', 'id_last_entry'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    id_user: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    id_last_entry: Mapped[int] = mapped_column(Integer)
+    balance: Mapped[float] = mapped_column(DECIMAL(12, 2))
+    created_at: Mapped[datetime] = mapped_column(DATETIME, default=datetime.now)
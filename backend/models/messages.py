@@ -1,19 +1,59 @@
 from config.database import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
-from sqlalchemy import Integer, String, DECIMAL, ForeignKey, Text, DateTime, DATE
+from sqlalchemy import Integer, String, DECIMAL, ForeignKey, Text, DateTime, DATE, Index, Float, Table, Column, MetaData, func, literal_column
 from datetime import datetime
 from typing import Optional, List
 
 class Message(Base):
     __tablename__ = 'messages'
+    __table_args__ = (
+        Index('ix_messages_sender_recipient_created_at', 'id_user_sender', 'id_user_recipient', 'created_at'),
+        Index('ix_messages_sender_id', 'id_user_sender', 'id'),
+        Index('ix_messages_recipient_id', 'id_user_recipient', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     id_user_sender: Mapped[int] = mapped_column(ForeignKey('users.id'))
     id_user_recipient: Mapped[int] = mapped_column(ForeignKey('users.id'))
-    id_order: Mapped[Optional[int]] = mapped_column(ForeignKey('orders.id'), nullable=True)
+    id_order: Mapped[Optional[int]] = mapped_column(ForeignKey('orders.id'), nullable=True, index=True)
     message: Mapped[str] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
 
     sender: Mapped['User'] = relationship(foreign_keys=[id_user_sender], back_populates='sent_messages')
     recipient: Mapped['User'] = relationship(foreign_keys=[id_user_recipient], back_populates='received_messages')
-    order: Mapped[Optional['Order']] = relationship(back_populates='messages')
\ No newline at end of file
+    order: Mapped[Optional['Order']] = relationship(back_populates='messages')
+
+# Read model for the chat inbox: one row per user pair (and order), kept up to
+# date in the same transaction as the messages it summarizes.
+class Conversation(Base):
+    __tablename__ = 'conversations'
+    __table_args__ = (
+        Index('ix_conversations_low_last_activity_at', 'id_user_low', 'last_activity_at'),
+        Index('ix_conversations_high_last_activity_at', 'id_user_high', 'last_activity_at'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id_user_low: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    id_user_high: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    id_order: Mapped[Optional[int]] = mapped_column(ForeignKey('orders.id'), nullable=True)
+    id_last_message: Mapped[int] = mapped_column(ForeignKey('messages.id'))
+    last_activity_at: Mapped[datetime] = mapped_column(DateTime)
+    unread_low: Mapped[int] = mapped_column(Integer, default=0)
+    unread_high: Mapped[int] = mapped_column(Integer, default=0)
+
+# The conversation key; chats outside an order are keyed with id_order 0, so
+# NULL does not let a pair have several of them.
+CONVERSATION_KEY = [Conversation.id_user_low, Conversation.id_user_high, func.coalesce(Conversation.id_order, literal_column('0'))]
+Index('ix_conversations_users_order', *CONVERSATION_KEY, unique=True)
+
+# SQLite FTS5 index over messages.message, filled by triggers on messages.
+# participants holds 'u<sender> u<recipient>' so a search is scoped to one
+# user's chats inside the index. Virtual tables are created by the migration,
+# not by Base.metadata.
+messages_fts = Table(
+    'messages_fts', MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    Column('message', Text),
+    Column('participants', Text),
+    Column('rank', Float),
+)
@@ -1,22 +1,25 @@
 from config.database import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
-from sqlalchemy import Integer, String, DECIMAL, ForeignKey, Text, DATETIME, DATE
+from sqlalchemy import Integer, String, DECIMAL, ForeignKey, Text, DATETIME, DATE, Index
 from datetime import datetime
 from typing import Optional, List
 from utils.enums import OrderStatus
 
 class Order(Base):
     __tablename__ = 'orders'
+    __table_args__ = (
+        Index('ix_orders_status_created_at', 'status', 'created_at'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    id_user_customer: Mapped[int] = mapped_column(ForeignKey('users.id'))
-    id_user_executor: Mapped[int] = mapped_column(ForeignKey('users.id'), nullable=True)
-    id_service: Mapped[int] = mapped_column(ForeignKey('services.id'), nullable=True)
+    id_user_customer: Mapped[int] = mapped_column(ForeignKey('users.id'), index=True)
+    id_user_executor: Mapped[int] = mapped_column(ForeignKey('users.id'), nullable=True, index=True)
+    id_service: Mapped[int] = mapped_column(ForeignKey('services.id'), nullable=True, index=True)
     status: Mapped[str] = mapped_column(String(50), default=OrderStatus.PENDING.value)
     price: Mapped[float] = mapped_column(DECIMAL(10, 2))
     name: Mapped[str] = mapped_column(String(255))
     description: Mapped[str] = mapped_column(Text)
-    created_at: Mapped[datetime] = mapped_column(DATETIME, default=datetime.now)
+    created_at: Mapped[datetime] = mapped_column(DATETIME, default=datetime.now, index=True)
     updated_at: Mapped[Optional[datetime]] = mapped_column(DATETIME, nullable=True)
     deadline: Mapped[Optional[datetime]] = mapped_column(DATETIME, nullable=True)
 
@@ -31,13 +34,13 @@ class Transaction(Base):
     __tablename__ = 'transactions'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    id_order: Mapped[Optional[int]] = mapped_column(ForeignKey('orders.id'), nullable=True)
-    id_user_sender: Mapped[int] = mapped_column(ForeignKey('users.id'))
-    id_user_recipient: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    id_order: Mapped[Optional[int]] = mapped_column(ForeignKey('orders.id'), nullable=True, index=True)
+    id_user_sender: Mapped[int] = mapped_column(ForeignKey('users.id'), index=True)
+    id_user_recipient: Mapped[int] = mapped_column(ForeignKey('users.id'), index=True)
     amount: Mapped[float] = mapped_column(DECIMAL(10, 2))
     commission: Mapped[float] = mapped_column(DECIMAL(10, 2), default=0.0)
     type: Mapped[str] = mapped_column(String(50))  # payment, refund, deposit, withdrawal
-    created_at: Mapped[datetime] = mapped_column(DATETIME, default=datetime.now)
+    created_at: Mapped[datetime] = mapped_column(DATETIME, default=datetime.now, index=True)
     
     order: Mapped[Optional['Order']] = relationship(back_populates='transactions')
     sender: Mapped['User'] = relationship(foreign_keys=[id_user_sender], back_populates='sent_transactions')
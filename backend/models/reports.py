@@ -0,0 +1,17 @@
+from config.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, String, DECIMAL, Date
+from datetime import date
+
+# Daily transaction totals per type and specialization, updated in the same
+# commit as each transfer and rebuildable from transactions. id_specialization
+# is 0 for transactions without an order or service.
+class TransactionRollup(Base):
+    __tablename__ = 'transaction_rollups'
+
+    bucket: Mapped[date] = mapped_column(Date, primary_key=True)
+    type: Mapped[str] = mapped_column(String(50), primary_key=True)
+    id_specialization: Mapped[int] = mapped_column(Integer, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    amount: Mapped[float] = mapped_column(DECIMAL(14, 2), default=0)
+    commission: Mapped[float] = mapped_column(DECIMAL(14, 2), default=0)
@@ -8,12 +8,12 @@ class Review(Base):
     __tablename__ = 'reviews'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    id_order: Mapped[int] = mapped_column(ForeignKey('orders.id'))
-    id_user_author: Mapped[int] = mapped_column(ForeignKey('users.id'))
-    id_user_target: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    id_order: Mapped[int] = mapped_column(ForeignKey('orders.id'), index=True)
+    id_user_author: Mapped[int] = mapped_column(ForeignKey('users.id'), index=True)
+    id_user_target: Mapped[int] = mapped_column(ForeignKey('users.id'), index=True)
     rating: Mapped[int] = mapped_column(Integer)
     comment: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DATETIME, default=datetime.now)
+    created_at: Mapped[datetime] = mapped_column(DATETIME, default=datetime.now, index=True)
     updated_at: Mapped[datetime] = mapped_column(DATETIME, nullable=True)
     
     order: Mapped['Order'] = relationship(back_populates='reviews')
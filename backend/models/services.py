@@ -1,6 +1,6 @@
 from config.database import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
-from sqlalchemy import Integer, String, Text, ForeignKey, Float
+from sqlalchemy import Integer, String, Text, ForeignKey, Float, Table, Column, MetaData
 from datetime import datetime
 from typing import Optional, List
 
@@ -19,11 +19,29 @@ class Service(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(255))
     description: Mapped[str] = mapped_column(Text)
-    id_specialization: Mapped[int] = mapped_column(ForeignKey('specializations.id'))
-    id_user_executor: Mapped[int] = mapped_column(ForeignKey('users.id'))  
+    id_specialization: Mapped[int] = mapped_column(ForeignKey('specializations.id'), index=True)
+    id_user_executor: Mapped[int] = mapped_column(ForeignKey('users.id'), index=True)  
     price: Mapped[float] = mapped_column(Float)
     delivery_time: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     
     specialization: Mapped['Specialization'] = relationship('Specialization', back_populates='services')
     executor: Mapped['User'] = relationship('User', back_populates='services')
-    orders: Mapped[List['Order']] = relationship('Order', back_populates='service')
\ No newline at end of file
+    orders: Mapped[List['Order']] = relationship('Order', back_populates='service')
+
+# Read model: the ServiceResponse JSON of a service, as the catalog returns it.
+class ServiceCard(Base):
+    __tablename__ = 'service_cards'
+
+    id: Mapped[int] = mapped_column(ForeignKey('services.id'), primary_key=True)
+    id_user_executor: Mapped[int] = mapped_column(ForeignKey('users.id'), index=True)
+    document: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    version: Mapped[int] = mapped_column(Integer, default=0)
+
+# FTS5 index over services.name and services.description, created by the migration.
+services_fts = Table(
+    'services_fts', MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    Column('name', Text),
+    Column('description', Text),
+    Column('rank', Float),
+)
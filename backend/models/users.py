@@ -1,6 +1,6 @@
 from config.database import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
-from sqlalchemy import Integer, String, DECIMAL, ForeignKey, Text, DATETIME, DATE
+from sqlalchemy import Integer, String, DECIMAL, ForeignKey, Text, DATETIME, DATE, Float, Table, Column, MetaData
 from datetime import datetime
 from typing import Optional, List
 
@@ -33,7 +33,7 @@ class ExecutorProfile(Base):
     __tablename__ = 'executor_profiles'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    id_specialization: Mapped[int] = mapped_column(ForeignKey('specializations.id'))
+    id_specialization: Mapped[int] = mapped_column(ForeignKey('specializations.id'), index=True)
     contacts: Mapped[str] = mapped_column(Text, nullable=True)
     experience: Mapped[int] = mapped_column(Integer, default=0)
     skills: Mapped[str] = mapped_column(Text, nullable=True)
@@ -50,4 +50,13 @@ class CustomerProfile(Base):
     company: Mapped[str] = mapped_column(String(255), nullable=True)
     contacts: Mapped[str] = mapped_column(Text, nullable=True)
     
-    user: Mapped['User'] = relationship(back_populates='customer_profile')
\ No newline at end of file
+    user: Mapped['User'] = relationship(back_populates='customer_profile')
+
+# FTS5 index over executor_profiles.skills and description, created by the migration.
+executors_fts = Table(
+    'executors_fts', MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    Column('skills', Text),
+    Column('description', Text),
+    Column('rank', Float),
+)
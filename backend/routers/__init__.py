@@ -6,6 +6,7 @@ from .orders import router as order_router
 from .transactions import router as transaction_router
 from .reviews import router as review_router
 from .messages import router as message_router
+from .reports import router as report_router
 
 from fastapi import APIRouter
 
@@ -17,4 +18,5 @@ routers.include_router(service_router, prefix='/services', tags=['services'])
 routers.include_router(order_router, prefix='/orders', tags=['orders'])
 routers.include_router(transaction_router, prefix='/transactions', tags=['transactions'])
 routers.include_router(review_router, prefix='/reviews', tags=['reviews'])
-routers.include_router(message_router, tags=['messages'])
\ No newline at end of file
+routers.include_router(message_router, tags=['messages'])
+routers.include_router(report_router, prefix='/reports', tags=['reports'])
\ No newline at end of file
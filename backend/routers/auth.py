@@ -41,7 +41,7 @@ async def signup(new_user: CreateUser,
                     detail={'status': Status.FAILED.value, 'message': 'Customer profile is not allowed for EXECUTOR role'}
                 )
             executor_profile = new_user.executor_profile.model_dump()
-            executor = user_service.create_executor(executor_profile)
+            executor = await user_service.create_executor(executor_profile)
             if not executor:
                 raise HTTPException(
                     status_code=400,
@@ -61,7 +61,7 @@ async def signup(new_user: CreateUser,
                     detail={'status': Status.FAILED.value, 'message': 'Executor profile is not allowed for CUSTOMER role'}
                 )
             customer_profile = new_user.customer_profile.model_dump()
-            customer = user_service.create_customer(customer_profile)
+            customer = await user_service.create_customer(customer_profile)
             if not customer:
                 raise HTTPException(
                     status_code=400,
@@ -75,14 +75,14 @@ async def signup(new_user: CreateUser,
                 detail={'status': Status.FAILED.value, 'message': f'Invalid role: {user_role}'}
             )
 
-        create_user = auth_service.create_user(user_data)
+        create_user = await auth_service.create_user(user_data)
         if not create_user:
             raise HTTPException(
                 status_code=400,
                 detail={'status': Status.FAILED.value, 'message': 'Failed to create user'}
             )
 
-        token, update_token = auth_service.login(UserLogin(email=user_email, password=user_password))
+        token, update_token = await auth_service.login(UserLogin(email=user_email, password=user_password))
         response = JSONResponse(content=token)
         response.set_cookie(key='update_token', value=update_token, httponly=True, max_age=60*60*24*7)
         return response
@@ -97,7 +97,7 @@ async def signup(new_user: CreateUser,
 
 @router.post('/login', status_code=200)
 async def login(email: EmailStr = Form(...), password = Form(...), auth_service: AuthService = Depends(get_auth_service)):
-    token, update_token = auth_service.login(UserLogin(email=email, password=password))
+    token, update_token = await auth_service.login(UserLogin(email=email, password=password))
     response = JSONResponse(content=token)
     response.set_cookie(key='update_token', value=update_token, httponly=True, max_age=60*60*24*7)
     return response
@@ -107,7 +107,7 @@ async def refresh(request: Request, auth_service: AuthService = Depends(get_auth
     token = request.cookies.get('update_token')
     if not token:
         raise HTTPException(status_code=401, detail={'status': Status.UNAUTHORIZED.value})
-    new_token, update_token = auth_service.refresh_token(token)
+    new_token, update_token = await auth_service.refresh_token(token)
     response = JSONResponse(content=new_token)
     response.set_cookie(key='update_token', value=update_token, httponly=True, max_age=timedelta(days=60).total_seconds())
     return response
@@ -1,50 +1,96 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
 from dependencies import *
 from schemas.messages import *
 from utils.ws_manager import manager
-from utils.to_dict import to_dict
+from utils.enums import Status
 from service.message import MessageService
+from config.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.pagination import set_next_cursor
 
 router = APIRouter()
 
 @router.get('/chats/{id_user}/messages', status_code=200)
-async def get_chat_messages(id_user: int,
+async def get_chat_messages(response: Response,
                             id_recipient: int,
                             id_order: Optional[int] = Query(None),
+                            limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                            cursor: str | None = Query(None),
                             message_service: MessageService = Depends(get_message_service),
-                            user_service: UserService = Depends(get_user_service),
-                            order_service: OrderService = Depends(get_order_service),
+                            hydration_service: HydrationService = Depends(get_hydration_service),
+                            current_user: User = Depends(get_chat_user),
                             ):
-    messages = message_service.get_chat_messages(id_user=id_user, 
-                                                 id_recipient=id_recipient, 
-                                                 id_order=id_order)
-    response = []
-    for message in messages:
-        sender = user_service.get_user_filter_by(id=message.id_user_sender)
-        if not sender:
-            continue  
-        sender_resp = UserMessageResponse(**sender.__dict__)
-        recipient = user_service.get_user_filter_by(id=message.id_user_recipient)
-        if not recipient:
-            continue 
-            
-        recipient_resp = UserMessageResponse(**recipient.__dict__)
-
-        order_resp = None
-        if message.id_order:
-            order = order_service.get_one_order_filter_by(id=message.id_order)
-            if order:
-                order_resp = ShortOrderResponse(**order.__dict__)
-
-        message_dict = to_dict(message)
-        message_dict['sender'] = sender_resp
-        message_dict['recipient'] = recipient_resp
-        message_dict['order'] = order_resp
-
-        response.append(MessageResponse(**message_dict))
+    messages, next_cursor = await message_service.get_chat_messages_page(id_user=current_user.id, 
+                                                                   id_recipient=id_recipient, 
+                                                                   limit=limit,
+                                                                   cursor=cursor,
+                                                                   id_order=id_order)
+    messages_response = await hydration_service.messages(messages)
     
-    if not response:
+    if not messages_response:
         raise HTTPException(status_code=404, detail="No messages found or users don't exist")
-        
-    return response
\ No newline at end of file
+    
+    set_next_cursor(response, next_cursor)
+    return messages_response
+
+@router.get('/chats/{id_user}/history', status_code=200)
+async def get_chat_history(id_recipient: int,
+                           id_order: Optional[int] = Query(None),
+                           before: Optional[int] = Query(None),
+                           after: Optional[int] = Query(None),
+                           limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                           message_service: MessageService = Depends(get_message_service),
+                           hydration_service: HydrationService = Depends(get_hydration_service),
+                           current_user: User = Depends(get_chat_user),
+                           ):
+    messages = await message_service.get_chat_history_page(id_user=current_user.id,
+                                                           id_recipient=id_recipient,
+                                                           limit=limit,
+                                                           before=before,
+                                                           after=after,
+                                                           id_order=id_order)
+    return await hydration_service.messages(messages)
+
+
+@router.get('/chats/{id_user}/search', status_code=200)
+async def search_chat_messages(response: Response,
+                               q: str = Query(..., min_length=1, max_length=200),
+                               id_recipient: Optional[int] = Query(None),
+                               limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                               cursor: str | None = Query(None),
+                               message_service: MessageService = Depends(get_message_service),
+                               hydration_service: HydrationService = Depends(get_hydration_service),
+                               current_user: User = Depends(get_chat_user),
+                               ):
+    messages, snippets, next_cursor = await message_service.search_messages_page(id_user=current_user.id,
+                                                                                query=q,
+                                                                                limit=limit,
+                                                                                cursor=cursor,
+                                                                                id_recipient=id_recipient)
+    set_next_cursor(response, next_cursor)
+    return await hydration_service.search_results(messages, snippets)
+
+
+@router.get('/chats/{id_user}/conversations', status_code=200)
+async def get_conversations(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                            message_service: MessageService = Depends(get_message_service),
+                            hydration_service: HydrationService = Depends(get_hydration_service),
+                            current_user: User = Depends(get_chat_user),
+                            ):
+    conversations = await message_service.get_inbox_page(id_user=current_user.id, limit=limit)
+    return await hydration_service.conversations(conversations, id_user=current_user.id)
+
+
+@router.post('/chats/{id_user}/conversations/{id_conversation}/read', status_code=200)
+async def read_conversation(id_conversation: int,
+                            message_service: MessageService = Depends(get_message_service),
+                            current_user: User = Depends(get_chat_user),
+                            ):
+    if not await message_service.mark_conversation_read(id_user=current_user.id, id_conversation=id_conversation):
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    return {'status': Status.SUCCESS.value}
+
+
+@router.get('/ws/stats', status_code=200)
+async def get_ws_stats(current_admin = Depends(get_current_admin)):
+    return manager.stats()
@@ -1,26 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Request, Response
 from dependencies import *
 from utils.enums import *
 from schemas.orders import *
 from datetime import datetime, date
-from utils.to_dict import to_dict
+from config.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from config.idempotency import IDEMPOTENCY_KEY_HEADER, IDEMPOTENCY_KEY_MAX_LENGTH
+from config.export import EXPORT_FORMATS
+from utils.export import export_response
+from utils.pagination import set_next_cursor
+from utils.filters import FilterSet, parse_filters, NUMBER, TEXT, CHOICE, COMPARISON
 
 router = APIRouter()
 
+ORDER_FILTERS = FilterSet(Order, fields={
+    'id_user_customer': CHOICE,
+    'id_user_executor': CHOICE,
+    'id_service': CHOICE,
+    'status': CHOICE,
+    'price': NUMBER,
+    'name': TEXT,
+    'created_at': COMPARISON,
+    'updated_at': COMPARISON,
+    'deadline': COMPARISON,
+}, sortable={'price', 'name', 'status', 'created_at'})
+
 @router.post('/', status_code=201)
-async def create_order(new_order: CreateOrder,
+async def create_order(request: Request,
+                       new_order: CreateOrder,
+                       idempotency_key: str | None = Header(None, alias=IDEMPOTENCY_KEY_HEADER,
+                                                            min_length=1, max_length=IDEMPOTENCY_KEY_MAX_LENGTH),
+                       idempotency_service: IdempotencyService = Depends(get_idempotency_service),
                        order_service: OrderService = Depends(get_order_service),
                        current_user = Depends(get_current_user)
                        ):
-    new_order_dict = new_order.model_dump()
-    new_order_dict['id_user_customer'] = current_user.id
-    created_order = order_service.create_order(new_order_dict)
-    if not created_order:
-        raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
-    return created_order
+    async def handler():
+        new_order_dict = new_order.model_dump()
+        new_order_dict['id_user_customer'] = current_user.id
+        created_order = await order_service.create_order(new_order_dict)
+        if not created_order:
+            raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
+        return created_order
+    return await idempotency_service.run(current_user.id, idempotency_key, request.method, request.url.path,
+                                         new_order, 201, handler)
+
+@router.get('/export', status_code=200)
+async def export_orders(request: Request,
+                        format: str = Query('csv', pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+                        order_service: OrderService = Depends(get_order_service),
+                        current_user = Depends(get_current_user),
+                        ):
+    conditions, = parse_filters(request.query_params, ORDER_FILTERS)
+    columns, batches = order_service.export_orders(conditions=conditions)
+    return export_response(columns, batches, format, 'orders')
 
 @router.get('/')
-async def get_all_orders(id_user_customer: int | None = Query(None),
+async def get_all_orders(request: Request,
+                         response: Response,
+                         id_user_customer: int | None = Query(None),
                          id_user_executor: int | None = Query(None),
                          id_service: int | None = Query(None),
                          status: str | None = Query(None),
@@ -29,103 +65,35 @@ async def get_all_orders(id_user_customer: int | None = Query(None),
                          created_at: datetime | None = Query(None),
                          updated_at: datetime | None = Query(None),
                          deadline: datetime | None = Query(None),
+                         limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                         cursor: str | None = Query(None),
+                         order_by: str | None = Query(None),
                          order_service: OrderService = Depends(get_order_service),
-                         user_service: UserService = Depends(get_user_service),
-                         service_service: ServiceService = Depends(get_service_service),
+                         hydration_service: HydrationService = Depends(get_hydration_service),
                          current_user = Depends(get_current_user),
                          ):
     filter = {k: v for k, v in locals().items() if v is not None and k not in 
-              {'order_service', 'service_service', 'user_service', 'current_user'}}
+              {'order_service', 'hydration_service', 'current_user', 'request', 'response', 'limit', 'cursor', 'order_by'}}
+    conditions, = parse_filters(request.query_params, ORDER_FILTERS)
 
-    orders = order_service.get_all_orders_filter_by(**filter)
+    orders, next_cursor = await order_service.get_orders_page(limit, cursor,
+                                                              order_by=ORDER_FILTERS.parse_order_by(order_by),
+                                                              conditions=conditions, **filter)
     if not orders:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    response = []
-    for order in orders:
-        user_customer = user_service.get_user_filter_by(id=order.id_user_customer)
-        if user_customer:
-            customer_profile = user_service.get_customer_filter_by(id=user_customer.id_customer_profile)
-            customer_response_dict = {**user_customer.__dict__, **customer_profile.__dict__}
-            customer_response = CustomerResponse(**customer_response_dict)
-        else:
-            customer_response = None
-
-        user_executor = user_service.get_user_filter_by(id=order.id_user_executor)
-        if user_executor:
-            executor_profile = user_service.get_executor_filter_by(id=user_executor.id_executor_profile)
-            exec_spec = service_service.get_one_specialization_filter_by(id=executor_profile.id_specialization)
-            executor_profile_dict = executor_profile.__dict__
-            executor_profile_dict['specialization'] = SpecializationResponse(**exec_spec.__dict__)
-            executor_profile_dict.pop('id')
-            executor_response_dict = {**user_executor.__dict__, **executor_profile_dict}
-            executor_response = ExecutorResponse(**executor_response_dict)
-        else:
-            executor_response = None
-
-        service = service_service.get_one_service_filter_by(id=order.id_service)
-        if service:
-            service_spec = service_service.get_one_specialization_filter_by(id=service.id_specialization)
-            service_dict = to_dict(service)
-            service_dict['specialization'] = SpecializationResponse(**service_spec.__dict__)
-            service_response = ShortServiceResponse(**service_dict)
-        else:
-            service_response = None
-
-        order_dict = to_dict(order)
-        order_dict.update({
-            'user_customer': customer_response,
-            'user_executor': executor_response,
-            'service': service_response,
-        })
-        response.append(OrderResponse(**order_dict))
-    return response
+    set_next_cursor(response, next_cursor)
+    return await hydration_service.orders(orders)
 
 @router.get('/{id}', status_code=200)
 async def get_one_order(id: int,
                         order_service: OrderService = Depends(get_order_service),
-                        user_service: UserService = Depends(get_user_service),
-                        service_service: ServiceService = Depends(get_service_service),
+                        hydration_service: HydrationService = Depends(get_hydration_service),
                         current_user = Depends(get_current_user),
                         ):
-    order = order_service.get_one_order_filter_by(id=id)
+    order = await order_service.get_one_order_filter_by(id=id)
     if not order:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    user_customer = user_service.get_user_filter_by(id=order.id_user_customer)
-    if user_customer:
-        customer_profile = user_service.get_customer_filter_by(id=user_customer.id_customer_profile)
-        customer_response_dict = {**user_customer.__dict__, **customer_profile.__dict__}
-        customer_response = CustomerResponse(**customer_response_dict)
-    else:
-        customer_response = None
-
-    user_executor = user_service.get_user_filter_by(id=order.id_user_executor)
-    if user_executor:
-        executor_profile = user_service.get_executor_filter_by(id=user_executor.id_executor_profile)
-        exec_spec = service_service.get_one_specialization_filter_by(id=executor_profile.id_specialization)
-        executor_profile_dict = executor_profile.__dict__
-        executor_profile_dict['specialization'] = SpecializationResponse(**exec_spec.__dict__)
-        executor_profile_dict.pop('id')
-        executor_response_dict = {**user_executor.__dict__, **executor_profile_dict}
-        executor_response = ExecutorResponse(**executor_response_dict)
-    else:
-        executor_response = None
-
-    service = service_service.get_one_service_filter_by(id=order.id_service)
-    if service:
-        service_spec = service_service.get_one_specialization_filter_by(id=service.id_specialization)
-        service_dict = to_dict(service)
-        service_dict['specialization'] = SpecializationResponse(**service_spec.__dict__)
-        service_response = ShortServiceResponse(**service_dict)
-    else:
-        service_response = None
-
-    order_dict = to_dict(order)
-    order_dict.update({
-        'user_customer': customer_response,
-        'user_executor': executor_response,
-        'service': service_response,
-    })
-    return OrderResponse(**order_dict)
+    return (await hydration_service.orders([order]))[0]
     
 @router.put('/{id}', status_code=200)
 async def update_order(id: int,
@@ -133,12 +101,12 @@ async def update_order(id: int,
                        order_service: OrderService = Depends(get_order_service),
                        current_user = Depends(get_current_user),
                        ):
-    order = order_service.get_one_order_filter_by(id=id)
+    order = await order_service.get_one_order_filter_by(id=id)
     if not order:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     upd_order_dict = upd_order.model_dump()
     upd_order_dict['updated_at'] = datetime.now()
-    updated_order = order_service.update_order(id=id, entity=upd_order_dict)
+    updated_order = await order_service.update_order(id=id, entity=upd_order_dict)
     return updated_order
 
 @router.delete('/{id}', status_code=200)
@@ -146,8 +114,8 @@ async def delete_order(id: int,
                        order_service: OrderService = Depends(get_order_service),
                        current_user = Depends(get_current_user),
                        ):
-    order = order_service.get_one_order_filter_by(id=id)
+    order = await order_service.get_one_order_filter_by(id=id)
     if not order:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    order_service.delete_order(id=id)
+    await order_service.delete_order(id=id)
     return {'status': Status.SUCCESS.value}
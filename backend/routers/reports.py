@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Query
+from datetime import date
+from dependencies import *
+from utils.enums import TransactionType
+from config.reports import REPORT_PERIODS
+
+router = APIRouter()
+
+PERIOD = f"^({'|'.join(REPORT_PERIODS)})$"
+
+@router.get('/summary', status_code=200)
+async def get_summary(period: str = Query('day', pattern=PERIOD),
+                      date_from: date | None = Query(None),
+                      date_to: date | None = Query(None),
+                      id_specialization: int | None = Query(None),
+                      by_specialization: bool = Query(False),
+                      report_service: ReportService = Depends(get_report_service),
+                      current_admin = Depends(get_current_admin)):
+    conditions = report_service.conditions(date_from, date_to, id_specialization=id_specialization)
+    return await report_service.get_summary(period, conditions, by_specialization=by_specialization)
+
+@router.get('/transactions', status_code=200)
+async def get_transaction_report(period: str = Query('day', pattern=PERIOD),
+                                 date_from: date | None = Query(None),
+                                 date_to: date | None = Query(None),
+                                 type: TransactionType | None = Query(None),
+                                 id_specialization: int | None = Query(None),
+                                 by_type: bool = Query(True),
+                                 by_specialization: bool = Query(True),
+                                 report_service: ReportService = Depends(get_report_service),
+                                 current_admin = Depends(get_current_admin)):
+    conditions = report_service.conditions(date_from, date_to, type, id_specialization)
+    return await report_service.get_report(period, conditions, by_type=by_type, by_specialization=by_specialization)
+
+@router.post('/rebuild', status_code=200)
+async def rebuild_rollups(report_service: ReportService = Depends(get_report_service),
+                          current_admin = Depends(get_current_admin)):
+    return await report_service.rebuild()
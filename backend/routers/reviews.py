@@ -1,13 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from utils.enums import Status, OrderStatus
 from dependencies import *
 from utils.enums import *
 from schemas.reviews import *
 from datetime import datetime, date
-from utils.to_dict import to_dict
+from config.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.pagination import set_next_cursor
+from utils.filters import FilterSet, parse_filters, NUMBER, TEXT, CHOICE, COMPARISON
 
 router = APIRouter()
 
+REVIEW_FILTERS = FilterSet(Review, fields={
+    'id_order': CHOICE,
+    'id_user_author': CHOICE,
+    'id_user_target': CHOICE,
+    'rating': NUMBER,
+    'comment': {'ilike'},
+    'created_at': COMPARISON,
+    'updated_at': COMPARISON,
+}, sortable={'rating', 'created_at'})
+
 @router.post('/', status_code=201)
 async def create_reviews(new_review: CreateReview,
                          review_service: ReviewService = Depends(get_review_service),
@@ -17,106 +29,74 @@ async def create_reviews(new_review: CreateReview,
     new_review_dict = new_review.model_dump()
     new_review_dict['id_user_author'] = current_user.id
 
-    order = order_service.get_one_order_filter_by(id=new_review_dict['id_order'])
+    order = await order_service.get_one_order_filter_by(id=new_review_dict['id_order'])
     if not order or order.id_user_executor != new_review_dict['id_user_target'] or order.status != OrderStatus.COMPLETED.value:
         raise HTTPException(status_code=400, detail={'status': Status.FAILED.value, 'message': 'Invalid order or target user'})
     
-    created_review = review_service.create_review(new_review_dict)
+    created_review = await review_service.create_review(new_review_dict)
     if not created_review:
         raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
     return created_review
     
 @router.get('/', status_code=200)
-async def get_all_reviews(id_user_author: int | None = Query(None),
+async def get_all_reviews(request: Request,
+                          response: Response,
+                          id_user_author: int | None = Query(None),
                           id_user_target: int | None = Query(None),
                           rating: int | None = Query(None),
                           comment: str | None = Query(None),
                           created_at: datetime | None = Query(None),
                           updated_at: datetime | None = Query(None),
+                          limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                          cursor: str | None = Query(None),
+                          order_by: str | None = Query(None),
                           review_service: ReviewService = Depends(get_review_service),
-                          user_service: UserService = Depends(get_user_service),
-                          order_service: OrderService = Depends(get_order_service)
+                          hydration_service: HydrationService = Depends(get_hydration_service)
                           ):
     filter = {k: v for k, v in locals().items() if v is not None and k not in 
-              {'review_service', 'user_service', 'order_service'}}
+              {'review_service', 'hydration_service', 'request', 'response', 'limit', 'cursor', 'order_by'}}
+    conditions, = parse_filters(request.query_params, REVIEW_FILTERS)
 
-    reviews = review_service.get_all_reviews_filter_by(**filter)
+    reviews, next_cursor = await review_service.get_reviews_page(limit, cursor,
+                                                                 order_by=REVIEW_FILTERS.parse_order_by(order_by),
+                                                                 conditions=conditions, **filter)
     if not reviews:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    
-    response = []
-    for review in reviews:
-        order = order_service.get_one_order_filter_by(id=review.id_order)
-        if order:
-            order_response = ShortOrderResponse(**to_dict(order))
-        else:
-            order_response = None
-
-        user_author = user_service.get_user_filter_by(id=review.id_user_author)
-        author_response = UserResponse(**to_dict(user_author))
-
-        user_target = user_service.get_user_filter_by(id=review.id_user_target)
-        target_response = UserResponse(**to_dict(user_target))
-
-        review_dict = to_dict(review)
-        review_dict.update({
-            'user_author': author_response,
-            'user_target': target_response,
-            'order': order_response
-        })
-        response.append(ReviewResponse(**review_dict))
-    
-    return response
+    set_next_cursor(response, next_cursor)
+    return await hydration_service.reviews(reviews)
 
 @router.get('/{id}', status_code=200)
 async def get_one_review(id: int,
                          review_service: ReviewService = Depends(get_review_service),
-                         user_service: UserService = Depends(get_user_service),
-                         order_service: OrderService = Depends(get_order_service)
+                         hydration_service: HydrationService = Depends(get_hydration_service)
                          ):
-    review = review_service.get_one_review_filter_by(id=id)
+    review = await review_service.get_one_review_filter_by(id=id)
     if not review:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    
-    order = order_service.get_one_order_filter_by(id=review.id_order)
-    if order:
-        order_response = ShortOrderResponse(**to_dict(order))
-    else:
-        order_response = None
-
-    user_author = user_service.get_user_filter_by(id=review.id_user_author)
-    author_response = UserResponse(**to_dict(user_author))
-
-    user_target = user_service.get_user_filter_by(id=review.id_user_target)
-    target_response = UserResponse(**to_dict(user_target))
-
-    review_dict = to_dict(review)
-    review_dict.update({
-        'user_author': author_response,
-        'user_target': target_response,
-        'order': order_response
-    })
-    return ReviewResponse(**review_dict)
+    response = await hydration_service.reviews([review])
+    if not response:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    return response[0]
 
 @router.put('/{id}', status_code=200)
 async def update_review(id: int,
                         upd_review: UpdateReview,
                         review_service: ReviewService = Depends(get_review_service),
                         ):
-    review = review_service.get_one_review_filter_by(id=id)
+    review = await review_service.get_one_review_filter_by(id=id)
     if not review:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     upd_review_dict = upd_review.model_dump()
     upd_review_dict['updated_at'] = datetime.now()
-    updated_review = review_service.update_review(id=id, entity=upd_review_dict)
+    updated_review = await review_service.update_review(id=id, entity=upd_review_dict)
     return updated_review
 
 @router.delete('/{id}', status_code=200)
 async def delete_review(id: int,
                         review_service: ReviewService = Depends(get_review_service),
                         ):
-    review = review_service.get_one_review_filter_by(id=id)
+    review = await review_service.get_one_review_filter_by(id=id)
     if not review:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    deleted_review = review_service.delete_review(id=id)
+    deleted_review = await review_service.delete_review(id=id)
     return Status.SUCCESS.value
\ No newline at end of file
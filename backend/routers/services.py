@@ -1,102 +1,139 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from utils.enums import Status
 from dependencies import *
 from schemas.services import *
-from utils.to_dict import to_dict
+from config.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.pagination import set_next_cursor
+from utils.http_cache import json_response
+from config.pagination import NEXT_CURSOR_HEADER
+from utils.filters import FilterSet, parse_filters, NUMBER, TEXT, CHOICE, COMPARISON
+from utils.facets import Facet, exclude_field
+from config.facets import PRICE_BUCKETS, DELIVERY_TIME_BUCKETS
 
 router = APIRouter()
 
+SERVICE_FILTERS = FilterSet(Service, fields={
+    'id_specialization': CHOICE,
+    'id_user_executor': CHOICE,
+    'name': TEXT,
+    'description': {'ilike'},
+    'price': NUMBER,
+    'delivery_time': NUMBER,
+}, sortable={'price', 'name'})
+
+SERVICE_FACETS = [
+    Facet('id_specialization'),
+    Facet('price', PRICE_BUCKETS),
+    Facet('delivery_time', DELIVERY_TIME_BUCKETS),
+]
+
 @router.post('/', status_code=201)
 async def create_service(new_service: CreateService,
                           service_service: ServiceService = Depends(get_service_service)):
-    created_service = service_service.create_service(new_service)
+    created_service = await service_service.create_service(new_service)
     if not created_service:
         raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
     return {'status': Status.SUCCESS.value}
 
 @router.get('/', status_code=200)
-async def get_all_services(name: str | None = Query(None),
+async def get_all_services(request: Request,
+                           name: str | None = Query(None),
                            id_specialization: int | None = Query(None),
                            id_user_executor: int | None = Query(None),
                            price: float  | None = Query(None),
                            delivery_time: int | None = Query(None),
-                           service_service: ServiceService = Depends(get_service_service),
-                           user_service: UserService = Depends(get_user_service)
+                           limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                           cursor: str | None = Query(None),
+                           order_by: str | None = Query(None),
+                           service_card_service: ServiceCardService = Depends(get_service_card_service)
                            ):
     filter = {k: v for k, v in locals().items() if v is not None and k not in 
-              {'service_service', 'user_service'}}
-    services = service_service.get_all_services_filter_by(**filter)
-    if not services:
+              {'service_card_service', 'request', 'limit', 'cursor', 'order_by'}}
+    conditions, = parse_filters(request.query_params, SERVICE_FILTERS)
+    cards, next_cursor = await service_card_service.get_cards_page(limit, cursor,
+                                                                   order_by=SERVICE_FILTERS.parse_order_by(order_by),
+                                                                   conditions=conditions, **filter)
+    if not cards:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    response = []
-    for service in services:
-        user = user_service.get_user_filter_by(id=service.id_user_executor)
-        executor_profile = user_service.get_executor_filter_by(id=user.id_executor_profile)
-
-        executor_profile_dict = executor_profile.__dict__
-        executor_profile_dict.pop('id')
-
-        exec_spec = service_service.get_one_specialization_filter_by(id=executor_profile.id_specialization)
-        executor_profile_dict['specialization'] = SpecializationResponse(**exec_spec.__dict__)
-
-        user_response = ExecutorResponse(**{**user.__dict__, **executor_profile_dict})
+    return json_response(request, f'[{",".join(cards)}]',
+                         headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
 
-        service_spec = service_service.get_one_specialization_filter_by(id=service.id_specialization)
-        specialization_response = SpecializationResponse(**service_spec.__dict__)
+@router.get('/facets', status_code=200)
+async def get_services_facets(request: Request,
+                              response: Response,
+                              name: str | None = Query(None),
+                              id_specialization: int | None = Query(None),
+                              id_user_executor: int | None = Query(None),
+                              price: float | None = Query(None),
+                              delivery_time: int | None = Query(None),
+                              limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                              cursor: str | None = Query(None),
+                              order_by: str | None = Query(None),
+                              service_service: ServiceService = Depends(get_service_service),
+                              hydration_service: HydrationService = Depends(get_hydration_service)
+                              ) -> ServiceFacetsResponse:
+    filter = {k: v for k, v in locals().items() if v is not None and k not in
+              {'service_service', 'hydration_service', 'request', 'response', 'limit', 'cursor', 'order_by'}}
+    conditions, = parse_filters(request.query_params, SERVICE_FILTERS)
+    services, next_cursor = await service_service.get_services_page(limit, cursor,
+                                                                    order_by=SERVICE_FILTERS.parse_order_by(order_by),
+                                                                    conditions=conditions, **filter)
+    facets = {}
+    for facet in SERVICE_FACETS:
+        facet_conditions, = parse_filters(exclude_field(request.query_params, facet.field), SERVICE_FILTERS)
+        facets[facet.field] = await service_service.get_services_facet(facet, facet_conditions,
+                                                                       **exclude_field(filter, facet.field))
+    set_next_cursor(response, next_cursor)
+    return ServiceFacetsResponse(results=await hydration_service.services(services), facets=facets)
 
-        service_dict = to_dict(service)
-        service_dict.update({
-            'specialization': specialization_response,
-            'user_executor': user_response
-        })
-        response.append(ServiceResponse(**service_dict))
-    return response
+@router.get('/search', status_code=200)
+async def search_services(request: Request,
+                          response: Response,
+                          q: str = Query(..., min_length=1, max_length=200),
+                          id_specialization: int | None = Query(None),
+                          id_user_executor: int | None = Query(None),
+                          price: float | None = Query(None),
+                          delivery_time: int | None = Query(None),
+                          limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                          cursor: str | None = Query(None),
+                          service_service: ServiceService = Depends(get_service_service),
+                          hydration_service: HydrationService = Depends(get_hydration_service)
+                          ):
+    filter = {k: v for k, v in locals().items() if v is not None and k not in
+              {'service_service', 'hydration_service', 'request', 'response', 'q', 'limit', 'cursor'}}
+    conditions, = parse_filters(request.query_params, SERVICE_FILTERS)
+    services, next_cursor = await service_service.search_services_page(q, limit, cursor,
+                                                                       conditions=conditions, **filter)
+    set_next_cursor(response, next_cursor)
+    return await hydration_service.services(services)
 
 @router.get('/{id}', status_code=200)
-async def get_one_services(id: int,
-                           service_service: ServiceService = Depends(get_service_service),
-                           user_service: UserService = Depends(get_user_service)
+async def get_one_services(request: Request,
+                           id: int,
+                           service_card_service: ServiceCardService = Depends(get_service_card_service)
                            ):
-    service = service_service.get_one_service_filter_by(id=id)
-    if not service:
+    card = await service_card_service.get_card(id)
+    if not card:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    user = user_service.get_user_filter_by(id=service.id_user_executor)
-    executor_profile = user_service.get_executor_filter_by(id=user.id_executor_profile)
-
-    executor_profile_dict = executor_profile.__dict__
-    
-    exec_spec = service_service.get_one_specialization_filter_by(id=executor_profile.id_specialization)
-    executor_profile_dict['specialization'] = SpecializationResponse(**exec_spec.__dict__)
-
-    user_response = ExecutorResponse(**{**user.__dict__, **executor_profile_dict})
-
-    service_spec = service_service.get_one_specialization_filter_by(id=service.id_specialization)
-    specialization_response = SpecializationResponse(**service_spec.__dict__)
-
-    service_dict = to_dict(service)
-    service_dict.update({
-        'specialization': specialization_response,
-        'user_executor': user_response
-    })
-    return ServiceResponse(**service_dict)
+    return json_response(request, card)
 
 @router.put('/{id}', status_code=200)
 async def update_service(id: int,
                          upd_service: UpdateService,
                          service_service: ServiceService = Depends(get_service_service)
                          ):
-    service = service_service.get_one_service_filter_by(id=id)
+    service = await service_service.get_one_service_filter_by(id=id)
     if not service:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    updated_service = service_service.update_service(id=id, upd_service=upd_service)
+    updated_service = await service_service.update_service(id=id, upd_service=upd_service)
     return updated_service
 
 @router.delete('/{id}', status_code=200)
 async def delete_service(id: int,
                          service_service: ServiceService = Depends(get_service_service)
                          ):
-    service = service_service.get_one_service_filter_by(id=id)
+    service = await service_service.get_one_service_filter_by(id=id)
     if not service:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    service_service.delete_service(id=id)
+    await service_service.delete_service(id=id)
     return {'status': Status.SUCCESS.value}    
\ No newline at end of file
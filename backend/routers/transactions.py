@@ -1,119 +1,111 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Request, Response
 from utils.enums import Status, OrderStatus
 from dependencies import *
 from utils.enums import *
 from schemas.transactions import *
 from datetime import datetime, date
-from decimal import Decimal
-from utils.to_dict import to_dict
+from config.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from config.ledger import LEDGER_SNAPSHOT_MIN_ENTRIES
+from config.idempotency import IDEMPOTENCY_KEY_HEADER, IDEMPOTENCY_KEY_MAX_LENGTH
+from config.export import EXPORT_FORMATS
+from utils.export import export_response
+from utils.pagination import set_next_cursor
+from utils.filters import FilterSet, parse_filters, NUMBER, TEXT, CHOICE, COMPARISON
 
 router = APIRouter()
 
+TRANSACTION_FILTERS = FilterSet(Transaction, fields={
+    'id_order': CHOICE,
+    'id_user_sender': CHOICE,
+    'id_user_recipient': CHOICE,
+    'amount': NUMBER,
+    'commission': NUMBER,
+    'type': CHOICE,
+    'created_at': COMPARISON,
+}, sortable={'amount', 'created_at'})
+
 @router.post('/', status_code=201)
-async def create_transaction(new_trans: CreateTransaction,
-                             transaction_service: TransactionService = Depends(get_transaction_service),
-                             user_service: UserService = Depends(get_user_service),
-                             order_service: OrderService = Depends(get_order_service),
+async def create_transaction(request: Request,
+                             new_trans: CreateTransaction,
+                             idempotency_key: str | None = Header(None, alias=IDEMPOTENCY_KEY_HEADER,
+                                                                  min_length=1, max_length=IDEMPOTENCY_KEY_MAX_LENGTH),
+                             idempotency_service: IdempotencyService = Depends(get_idempotency_service),
+                             ledger_service: LedgerService = Depends(get_ledger_service),
                              current_user: User = Depends(get_current_user),
                              ):
-    new_trans_dict = new_trans.model_dump()
-    new_trans_dict['id_user_sender'] = current_user.id
-
-    sender = user_service.get_user_filter_by(id=new_trans_dict['id_user_sender'])
-    recipient = user_service.get_user_filter_by(id=new_trans_dict['id_user_recipient'])
-    if not sender or not recipient:
-        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value, 'message': 'Sender or recipient not found'})
-    
-    amount_transaction = Decimal(str(new_trans_dict['amount']))
-    service_commission = amount_transaction * Decimal('0.01')
-    new_trans_dict['commission'] = float(service_commission)
-    total_debit = amount_transaction + service_commission
-
-    if new_trans_dict['type'] == TransactionType.PAYMENT.value:
-        if sender.balance < total_debit:
-            raise HTTPException(status_code=400, detail={'status': Status.FAILED.value, 'message': f'Недостаточно средств.'})
-        
-        order = order_service.get_one_order_filter_by(id=new_trans_dict['id_order'])
-        if amount_transaction < order.price:
-            raise HTTPException(status_code=400, detail={'status': Status.FAILED.value, 'message': f'Сумма транзакции не может быть меньше стоимости заказа {order.price}.'})
-        
-        sender_new_balance = sender.balance - total_debit
-        user_service.update(user_id=sender.id, data=UserUpdate(balance=sender_new_balance))
-
-        recipient_new_balance = recipient.balance + amount_transaction
-        user_service.update(user_id=recipient.id, data=UserUpdate(balance=recipient_new_balance))
-    elif new_trans_dict['type'] == TransactionType.DEPOSIT.value:
-        sender_new_balance = sender.balance + amount_transaction
-        user_service.update(user_id=sender.id, data=UserUpdate(balance=sender_new_balance))
-
-    transaction = transaction_service.create_transaction(new_trans_dict)
-    return Status.SUCCESS.value
-
+    async def handler():
+        await ledger_service.create_transaction(current_user.id, new_trans)
+        return Status.SUCCESS.value
+    return await idempotency_service.run(current_user.id, idempotency_key, request.method, request.url.path,
+                                         new_trans, 201, handler)
+
+
+@router.get('/balance', status_code=200)
+async def get_balance(ledger_service: LedgerService = Depends(get_ledger_service),
+                      current_user: User = Depends(get_current_user)):
+    return {'id_user': current_user.id, 'balance': await ledger_service.get_balance(current_user.id)}
+
+@router.post('/reconcile', status_code=200)
+async def reconcile_ledger(min_entries: int = Query(LEDGER_SNAPSHOT_MIN_ENTRIES, ge=1),
+                           ledger_service: LedgerService = Depends(get_ledger_service),
+                           current_admin = Depends(get_current_admin)):
+    return await ledger_service.reconcile(min_entries)
+
+@router.get('/export', status_code=200)
+async def export_transactions(request: Request,
+                              format: str = Query('csv', pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+                              transaction_service: TransactionService = Depends(get_transaction_service),
+                              current_user: User = Depends(get_current_user)
+                              ):
+    conditions, = parse_filters(request.query_params, TRANSACTION_FILTERS)
+    id_user = None if current_user.role == Roles.ADMIN.value else current_user.id
+    columns, batches = transaction_service.export_transactions(id_user, conditions=conditions)
+    return export_response(columns, batches, format, 'transactions')
 
 @router.get('/', status_code=200)
-async def get_all_transactions(id_order: int = Query(None),
+async def get_all_transactions(request: Request,
+                               response: Response,
+                               id_order: int = Query(None),
                                id_user_sender: int = Query(None),
                                id_user_recipient: int = Query(None),
                                amount: float = Query(None),
                                commission: float = Query(None),
                                type: TransactionType = Query(None),
                                created_at: str = Query(None),
+                               limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                               cursor: str | None = Query(None),
+                               order_by: str | None = Query(None),
                                transaction_service: TransactionService = Depends(get_transaction_service),
-                               order_service: OrderService = Depends(get_order_service),
-                               user_service: UserService = Depends(get_user_service),
+                               hydration_service: HydrationService = Depends(get_hydration_service),
                                current_user: User = Depends(get_current_user)
                                ):
     filter = {k: v for k, v in locals().items() if v is not None and k
-                    not in {'transaction_service', 'user_service', 'current_user', 'order_service'}}
-    if current_user.role == Roles.USER.value:
-        filter['id_user'] = current_user.id
-    transactions = transaction_service.get_all_transactions_filter_by(**filter)
+                    not in {'transaction_service', 'hydration_service', 'current_user',
+                            'request', 'response', 'limit', 'cursor', 'order_by'}}
+    conditions, = parse_filters(request.query_params, TRANSACTION_FILTERS)
+    order_by = TRANSACTION_FILTERS.parse_order_by(order_by)
+    if current_user.role == Roles.ADMIN.value:
+        transactions, next_cursor = await transaction_service.get_transactions_page(limit, cursor, order_by=order_by,
+                                                                                    conditions=conditions, **filter)
+    else:
+        transactions, next_cursor = await transaction_service.get_user_transactions_page(current_user.id, limit, cursor,
+                                                                                         order_by=order_by,
+                                                                                         conditions=conditions, **filter)
     if not transactions:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    
-    response= []
-    for trans in transactions:
-        order = order_service.get_one_order_filter_by(id=trans.id_order)
-        order_resp = ShortOrderResponse(**order.__dict__) if order else None
-
-        sender = user_service.get_user_filter_by(id=trans.id_user_sender)
-        sender_resp = UserTransactionResponse(**sender.__dict__) if sender else None
-
-        recipient = user_service.get_user_filter_by(id=trans.id_user_recipient)
-        recipient_resp = UserTransactionResponse(**recipient.__dict__) if recipient else None
-
-        trans_dict = to_dict(trans)
-        trans_dict['order'] = order_resp
-        trans_dict['sender_name'] = sender_resp
-        trans_dict['recipient_name'] = recipient_resp
-
-        response.append(TransactionResponse(**trans_dict))
-
-    return response
+    set_next_cursor(response, next_cursor)
+    return await hydration_service.transactions(transactions)
 
 @router.get('/{id}', status_code=200)
 async def get_one_transaction(id: int,
                               transaction_service: TransactionService = Depends(get_transaction_service),
-                              order_service: OrderService = Depends(get_order_service),
-                              user_service: UserService = Depends(get_user_service),
+                              hydration_service: HydrationService = Depends(get_hydration_service),
                               current_user: User = Depends(get_current_user)
                               ):
-    trans = transaction_service.get_one_transaction_filter_by(id=id)
+    trans = await transaction_service.get_one_transaction_filter_by(id=id)
     if not trans:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    
-    order = order_service.get_one_order_filter_by(id=trans.id_order)
-    order_resp = ShortOrderResponse(**order.__dict__) if order else None
-
-    sender = user_service.get_user_filter_by(id=trans.id_user_sender)
-    sender_resp = UserTransactionResponse(**sender.__dict__) if sender else None
-
-    recipient = user_service.get_user_filter_by(id=trans.id_user_recipient)
-    recipient_resp = UserTransactionResponse(**recipient.__dict__) if recipient else None
-
-    trans_dict = to_dict(trans)
-    trans_dict['order'] = order_resp
-    trans_dict['sender_name'] = sender_resp
-    trans_dict['recipient_name'] = recipient_resp
-
-    return TransactionResponse(**trans_dict)
\ No newline at end of file
+    response = await hydration_service.transactions([trans])
+    if not response:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    return response[0]
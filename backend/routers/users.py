@@ -1,112 +1,154 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile, Request, Response
 from dependencies import *
 from schemas.users import *
 from utils.enums import AuthStatus, Roles, Status
 from utils.image import save_image
+from utils.cache import user_cache
+from config.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.pagination import set_next_cursor
+from utils.filters import FilterSet, parse_filters, NUMBER, TEXT, CHOICE, COMPARISON
+from utils.facets import Facet, exclude_field
+from config.facets import EXPERIENCE_BANDS, HOURLY_RATE_BUCKETS
+from models.users import User as UserModel, ExecutorProfile
 
 router = APIRouter()
 
+USER_FILTERS = FilterSet(UserModel, fields={
+    'name': TEXT,
+    'email': TEXT,
+    'role': CHOICE,
+    'balance': NUMBER,
+}, sortable={'name', 'email', 'balance'})
+
+EXECUTOR_FILTERS = FilterSet(ExecutorProfile, fields={
+    'id_specialization': CHOICE,
+    'experience': NUMBER,
+    'hourly_rate': NUMBER,
+    'skills': {'ilike'},
+    'description': {'ilike'},
+})
+
+EXECUTOR_FACETS = [
+    Facet('id_specialization'),
+    Facet('experience', EXPERIENCE_BANDS),
+    Facet('hourly_rate', HOURLY_RATE_BUCKETS),
+]
+
 @router.get('/me', status_code=290)
-async def get_me(user_service: UserService = Depends(get_user_service),
-                 service_service: ServiceService = Depends(get_service_service),
+async def get_me(hydration_service: HydrationService = Depends(get_hydration_service),
                  current_user = Depends(get_current_user)
                  ):
-    user = user_service.get_user_filter_by(id=current_user.id)
-    if not user:
+    response = await hydration_service.users([current_user])
+    if not response:
         raise HTTPException(status_code=404, detail={'status': AuthStatus.USER_NOT_FOUND.value})
-    if user.role == Roles.EXECUTOR.value:
-        executor_profile = user_service.get_executor_filter_by(id=user.id_executor_profile).__dict__
-
-        exec_spec = service_service.get_one_specialization_filter_by(id=executor_profile['id_specialization']).__dict__
-        executor_profile['specialization'] = SpecializationResponse(**exec_spec)
-        executor_profile.pop('id')
-        response_data = {**user.__dict__, **executor_profile}
-        return ExecutorResponse(**response_data)
-    elif user.role == Roles.CUSTOMER.value:
-        customer_profile = user_service.get_customer_filter_by(id=user.id_customer_profile).__dict__
-        customer_profile.pop('id')
-        response_data = {**user.__dict__, **customer_profile}
-        return CustomerResponse(**response_data)
-    elif user.role == Roles.ADMIN.value:
-        return UserResponse(**user.__dict__)
+    return response[0]
 
 @router.get('/', status_code=200)
-async def get_all_users(name: str | None = Query(None), 
+async def get_all_users(request: Request,
+                        response: Response,
+                        name: str | None = Query(None), 
                         role: Roles | None = Query(None),
                         email: str | None = Query(None),
 
                         id_specialization: int | None = Query(None),
                         experience: int | None = Query(None),
                         hourly_rate: float | None = Query(None),
+                        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                        cursor: str | None = Query(None),
+                        order_by: str | None = Query(None),
 
                         user_service: UserService = Depends(get_user_service),
-                        service_service: ServiceService = Depends(get_service_service)
+                        hydration_service: HydrationService = Depends(get_hydration_service)
                         ):
+    executor_filter = {k: v for k, v in locals().items() if v is not None and k in
+                       {'id_specialization', 'experience', 'hourly_rate'}}
     filter = {k: v for k, v in locals().items() if v is not None and k not in 
-              {'user_service', 'service_service', 'id_specialization', 'experience', 'hourly_rate'}}
-    users = user_service.get_all_users_filter_by(**filter)
+              {'user_service', 'hydration_service', 'executor_filter', 'request', 'response', 'limit', 'cursor',
+               'order_by', 'id_specialization', 'experience', 'hourly_rate'}}
+    conditions, executor_conditions = parse_filters(request.query_params, USER_FILTERS, EXECUTOR_FILTERS)
+    if executor_filter or executor_conditions:
+        conditions.append(user_service.executor_filter_condition(*executor_conditions, **executor_filter))
+    users, next_cursor = await user_service.get_users_page(limit, cursor,
+                                                           order_by=USER_FILTERS.parse_order_by(order_by),
+                                                           conditions=conditions, **filter)
     if not users:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    response = []
-    for user in users:
-        if user.role == Roles.EXECUTOR.value:
-            filter = {k: v for k, v in locals().items() if v is not None and k in
-                      {'id_specialization', 'experience', 'hourly_rate'}}
-            filter['id'] = user.id_executor_profile
-
-            executor_profile = user_service.get_executor_filter_by(**filter)
-            if not executor_profile:
-                continue
-            executor_profile_dict = executor_profile.__dict__
-
-            del executor_profile_dict['id']
-
-            exec_spec = service_service.get_one_specialization_filter_by(id=executor_profile_dict['id_specialization']).__dict__
-            executor_profile_dict['specialization'] = SpecializationResponse(**exec_spec)
-
-            response_data = {**user.__dict__, **executor_profile_dict}
-            response.append(ExecutorResponse(**response_data))
-        elif user.role == Roles.CUSTOMER.value:
-            customer_profile = user_service.get_customer_filter_by(id=user.id_customer_profile).__dict__
-
-            del customer_profile['id']
-
-            response_data = {**user.__dict__, **customer_profile}
-            response.append(CustomerResponse(**response_data))
-        elif user.role == Roles.ADMIN.value:
-            response.append(UserResponse(**user.__dict__))
-    return response
+    set_next_cursor(response, next_cursor)
+    return await hydration_service.users(users)
+
+@router.get('/facets', status_code=200)
+async def get_executors_facets(request: Request,
+                               response: Response,
+                               id_specialization: int | None = Query(None),
+                               experience: int | None = Query(None),
+                               hourly_rate: float | None = Query(None),
+                               limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                               cursor: str | None = Query(None),
+                               order_by: str | None = Query(None),
+                               user_service: UserService = Depends(get_user_service),
+                               hydration_service: HydrationService = Depends(get_hydration_service)
+                               ) -> ExecutorFacetsResponse:
+    executor_filter = {k: v for k, v in locals().items() if v is not None and k in
+                       {'id_specialization', 'experience', 'hourly_rate'}}
+    conditions, executor_conditions = parse_filters(request.query_params, USER_FILTERS, EXECUTOR_FILTERS)
+    page_conditions = conditions + [user_service.executor_filter_condition(*executor_conditions, **executor_filter)]
+    users, next_cursor = await user_service.get_users_page(limit, cursor,
+                                                           order_by=USER_FILTERS.parse_order_by(order_by),
+                                                           conditions=page_conditions, role=Roles.EXECUTOR.value)
+    facets = {}
+    for facet in EXECUTOR_FACETS:
+        facet_conditions, facet_executor_conditions = parse_filters(
+            exclude_field(request.query_params, facet.field), USER_FILTERS, EXECUTOR_FILTERS)
+        facets[facet.field] = await user_service.get_executors_facet(facet, facet_conditions, facet_executor_conditions,
+                                                                     **exclude_field(executor_filter, facet.field))
+    set_next_cursor(response, next_cursor)
+    return ExecutorFacetsResponse(results=await hydration_service.users(users), facets=facets)
+
+@router.get('/search', status_code=200)
+async def search_executors(request: Request,
+                           response: Response,
+                           q: str = Query(..., min_length=1, max_length=200),
+                           id_specialization: int | None = Query(None),
+                           experience: int | None = Query(None),
+                           hourly_rate: float | None = Query(None),
+                           limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                           cursor: str | None = Query(None),
+                           user_service: UserService = Depends(get_user_service),
+                           hydration_service: HydrationService = Depends(get_hydration_service)
+                           ):
+    executor_filter = {k: v for k, v in locals().items() if v is not None and k in
+                       {'id_specialization', 'experience', 'hourly_rate'}}
+    conditions, executor_conditions = parse_filters(request.query_params, USER_FILTERS, EXECUTOR_FILTERS)
+    if executor_filter or executor_conditions:
+        conditions.append(user_service.executor_filter_condition(*executor_conditions, **executor_filter))
+    users, next_cursor = await user_service.search_executors_page(q, limit, cursor, conditions=conditions,
+                                                                  role=Roles.EXECUTOR.value)
+    set_next_cursor(response, next_cursor)
+    return await hydration_service.users(users)
+
+@router.get('/cache/stats', status_code=200)
+async def get_user_cache_stats(current_admin = Depends(get_current_admin)):
+    return user_cache.stats()
 
 @router.get('/{id}', status_code=200)
 async def get_one_user(id: int,
                        user_service: UserService = Depends(get_user_service),
-                       service_service: ServiceService = Depends(get_service_service)
+                       hydration_service: HydrationService = Depends(get_hydration_service)
                        ):
-    user = user_service.get_user_filter_by(id=id)
+    user = await user_service.get_user_filter_by(id=id)
     if not user:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    if user.role == Roles.EXECUTOR.value:
-        executor_profile = user_service.get_executor_filter_by(id=user.id_executor_profile).__dict__
-
-        exec_spec = service_service.get_one_specialization_filter_by(id=executor_profile['id_specialization']).__dict__
-        executor_profile['specialization'] = SpecializationResponse(**exec_spec)
-        executor_profile.pop('id')
-        response_data = {**user.__dict__, **executor_profile}
-        return ExecutorResponse(**response_data)
-    elif user.role == Roles.CUSTOMER.value:
-        customer_profile = user_service.get_customer_filter_by(id=user.id_customer_profile).__dict__
-        customer_profile.pop('id')
-        response_data = {**user.__dict__, **customer_profile}
-        return CustomerResponse(**response_data)
-    elif user.role == Roles.ADMIN.value:
-        return UserResponse(**user.__dict__)
+    response = await hydration_service.users([user])
+    if not response:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    return response[0]
     
 @router.put('/{id}', status_code=200)
 async def update_user(id: int,
                       upd_user: UpdateUser,
                       user_service: UserService = Depends(get_user_service)
                       ):
-    user = user_service.get_user_filter_by(id=id)
+    user = await user_service.get_user_filter_by(id=id)
     if not user:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     
@@ -114,30 +156,30 @@ async def update_user(id: int,
 
     if user_role == Roles.EXECUTOR.value and upd_user.executor_profile is not None:
         executor_profile = upd_user.executor_profile.model_dump()
-        user_service.update_executor(id=user.id_executor_profile, data=executor_profile)
+        await user_service.update_executor(id=user.id_executor_profile, data=executor_profile)
 
     elif user_role == Roles.CUSTOMER.value and upd_user.customer_profile is not None:
         customer_profile = upd_user.customer_profile.model_dump()
-        user_service.update_customer(id=user.id_customer_profile, data=customer_profile)
+        await user_service.update_customer(id=user.id_customer_profile, data=customer_profile)
 
     if upd_user.user is not None:
         user_data = upd_user.user.model_dump()
-        updated_user = user_service.update(user_id=id, data=UserUpdate(**user_data))
+        updated_user = await user_service.update(user_id=id, data=UserUpdate(**user_data))
     return {'status': Status.SUCCESS.value}
 
 @router.delete('/{id}', status_code=200)
 async def delete_user(id: int,
                       user_service: UserService = Depends(get_user_service)
                       ):
-    user = user_service.get_user_filter_by(id=id)
+    user = await user_service.get_user_filter_by(id=id)
     if not user:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     
-    user_service.delete_user(user_id=id)
+    await user_service.delete_user(user_id=id)
     if user.role == Roles.EXECUTOR.value:
-        user_service.delete_executor(id=user.id_executor_profile)
+        await user_service.delete_executor(id=user.id_executor_profile)
     elif user.role == Roles.CUSTOMER.value:
-        user_service.delete_customer(id=user.id_customer_profile)
+        await user_service.delete_customer(id=user.id_customer_profile)
 
     return {'status': Status.SUCCESS.value}
 
@@ -146,9 +188,9 @@ async def delete_user(id: int,
 async def update_user_image(id: int, 
                             image: UploadFile = File(...),
                             user_service: UserService = Depends(get_user_service)):
-    user = user_service.get_user_filter_by(id=id)
+    user = await user_service.get_user_filter_by(id=id)
     if not user:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    upd_user = user_service.update_image(id, image.filename)
+    upd_user = await user_service.update_image(id, image.filename)
     image_name = save_image(image)
     return {'status': Status.SUCCESS.value, 'update_image': image_name}
\ No newline at end of file
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class FacetValue(BaseModel):
+    value: Optional[int] = None
+    count: int
+
+class FacetRange(BaseModel):
+    min: float
+    max: Optional[float] = None
+    count: int
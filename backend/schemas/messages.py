@@ -13,11 +13,28 @@ class MessageResponse(BaseModel):
     message: str
     created_at: datetime
 
+class MessageSearchResponse(MessageResponse):
+    snippet: str
+
 class MessageWSResponse(BaseModel):
     id: int
     message: str
     created_at: str
 
+class ConversationMessageResponse(BaseModel):
+    id: int
+    id_user_sender: int
+    message: str
+    created_at: datetime
+
+class ConversationResponse(BaseModel):
+    id: int
+    user: UserMessageResponse
+    order: Optional[ShortOrderResponse] = None
+    last_message: Optional[ConversationMessageResponse] = None
+    last_activity_at: datetime
+    unread: int
+
 class CreateMessage(BaseModel):
     id_user_recipient: int
     id_order: Optional[int] = None
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+from .specializations import SpecializationResponse
+
+class RollupResponse(BaseModel):
+    bucket: date
+    type: Optional[str] = None
+    id_specialization: Optional[int] = None
+    specialization: Optional[SpecializationResponse] = None
+    count: int
+    amount: float
+    commission: float
+
+class SummaryResponse(BaseModel):
+    bucket: date
+    id_specialization: Optional[int] = None
+    specialization: Optional[SpecializationResponse] = None
+    gmv: float
+    payments: int
+    commission: float
+    deposits: float
+    withdrawals: float
+    refunds: float
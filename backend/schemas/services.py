@@ -3,6 +3,7 @@ import re
 from typing import Optional
 from .specializations import SpecializationResponse
 from .users import ExecutorResponse
+from .facets import FacetValue, FacetRange
 
 class ShortServiceResponse(BaseModel):
     id: int
@@ -21,6 +22,10 @@ class ServiceResponse(BaseModel):
     price: float
     delivery_time: int
 
+class ServiceFacetsResponse(BaseModel):
+    results: list[ServiceResponse]
+    facets: dict[str, list[FacetValue | FacetRange]]
+
 class CreateService(BaseModel):
     name: str
     description: str
@@ -3,6 +3,7 @@ import re
 from typing import Optional
 from utils.enums import Roles
 from .specializations import SpecializationResponse
+from .facets import FacetValue, FacetRange
 
 class UserCreate(BaseModel):
     name: str
@@ -75,6 +76,16 @@ class User(BaseModel):
     password: str
     balance: float
 
+class CurrentUser(BaseModel):
+    id: int
+    name: str
+    image: str
+    role: str
+    email: str
+    balance: float
+    id_executor_profile: Optional[int] = None
+    id_customer_profile: Optional[int] = None
+
 class UserResponse(BaseModel):
     id: int
     name: str
@@ -115,6 +126,10 @@ class ExecutorResponse(UserResponse):
     hourly_rate: Optional[float] = None
     description: Optional[str] = None
 
+class ExecutorFacetsResponse(BaseModel):
+    results: list[ExecutorResponse]
+    facets: dict[str, list[FacetValue | FacetRange]]
+
 class CreateExecutor(BaseModel):
     id_specialization: int
     contacts: Optional[str] = None
@@ -1,25 +1,27 @@
 from fastapi import HTTPException
 from utils.enums import AuthStatus
-from passlib.hash import pbkdf2_sha256
 from datetime import datetime, timedelta
 import jwt
 from config.auth import SECRET_KEY, ALGORITHM, UPDATE_EXPIRATION_TIME, EXPIRATION_TIME
-from crud.users import UserRepository
-from schemas.users import UserCreate, User, UserLogin
+from crud.users import AsyncUserRepository
+from schemas.users import UserCreate, User, UserLogin, CurrentUser
+from utils.cache import user_cache
+from utils.passwords import hash_password, verify_password, needs_rehash
+from utils.to_dict import to_dict
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class AuthService:
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: AsyncUserRepository):
         self.user_repository = user_repository
 
-    def create_user(self, user: dict):
-        user['password'] = pbkdf2_sha256.hash(user['password'])
-        return self.user_repository.add(user)
+    async def create_user(self, user: dict):
+        user['password'] = await hash_password(user['password'])
+        return await self.user_repository.add(user)
 
-    def get_user_filter_by(self, **filter_by):
-        return self.user_repository.get_one_filter_by(**filter_by)
+    async def get_user_filter_by(self, **filter_by):
+        return await self.user_repository.get_one_filter_by(**filter_by)
 
 
     def gen_token(self, user: User):
@@ -36,23 +38,30 @@ class AuthService:
         except jwt.InvalidTokenError:
             raise HTTPException(status_code=401, detail={'status': AuthStatus.INVALID_TOKEN.value})
 
-    def get_user_by_token(self, token: str):
+    async def get_user_by_token(self, token: str):
         payload = self.decode_token(token)
-        user = self.get_user_filter_by(id=payload['sub'])
+        user = user_cache.get(payload['sub'])
+        if user:
+            return user
+        user = await self.get_user_filter_by(id=payload['sub'])
         if not user:
             raise HTTPException(status_code=401, detail={'status': AuthStatus.USER_NOT_FOUND.value})
+        user = CurrentUser(**to_dict(user))
+        user_cache.set(user.id, user)
         return user
     
     def gen_update_token(self, user: User):
         payload = {"sub": user.id, "exp": datetime.now() + UPDATE_EXPIRATION_TIME}
         return jwt.encode(payload, SECRET_KEY, algorithm='HS256')
     
-    def login(self, user_login: UserLogin):
-        user = self.get_user_filter_by(email=user_login.email)
+    async def login(self, user_login: UserLogin):
+        user = await self.get_user_filter_by(email=user_login.email)
         if not user:
             raise HTTPException(status_code=401, detail={'status': AuthStatus.INVALID_EMAIL_OR_PASSWORD.value})
-        if not pbkdf2_sha256.verify(user_login.password, user.password):
+        if not await verify_password(user_login.password, user.password):
             raise HTTPException(status_code=401, detail={'status': AuthStatus.INVALID_EMAIL_OR_PASSWORD.value})
+        if needs_rehash(user.password):
+            await self.user_repository.update({'id': user.id, 'password': await hash_password(user_login.password)})
         token = self.gen_token(user)
         return {
             'access_token': token,
@@ -60,9 +69,9 @@ class AuthService:
             'expires': EXPIRATION_TIME.total_seconds()
         }, self.gen_update_token(user)
 
-    def refresh_token(self, token: str):
+    async def refresh_token(self, token: str):
         payload = self.decode_token(token)
-        user = self.get_user_filter_by(id=payload['sub'])
+        user = await self.get_user_filter_by(id=payload['sub'])
         if not user:
             raise HTTPException(status_code=401, detail={'status': AuthStatus.USER_NOT_FOUND.value})
         token = self.gen_token(user)
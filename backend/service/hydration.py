@@ -0,0 +1,255 @@
+from schemas.users import *
+from schemas.services import *
+from schemas.orders import *
+from schemas.reviews import *
+from schemas.transactions import *
+from schemas.messages import *
+from service.users import UserService
+from service.services import ServiceService
+from service.orders import OrderService
+from service.message import MessageService
+from utils.enums import Roles
+from utils.to_dict import to_dict
+from utils.search import render_snippet
+
+# Builds responses for a page of rows: foreign keys are collected first and
+# every related table is loaded once with an IN (...) query.
+class HydrationService:
+    def __init__(self, user_service: UserService,
+                 service_service: ServiceService,
+                 order_service: OrderService,
+                 message_service: MessageService = None):
+        self.user_service = user_service
+        self.service_service = service_service
+        self.order_service = order_service
+        self.message_service = message_service
+
+    # Helpers
+    async def _specializations(self, ids):
+        return await self.service_service.get_specializations_by_ids(ids)
+
+    def _executor_response(self, user, executor_profile, specializations):
+        profile_dict = to_dict(executor_profile)
+        profile_dict.pop('id')
+        profile_dict['specialization'] = specializations.get(executor_profile.id_specialization)
+        return ExecutorResponse(**{**to_dict(user), **profile_dict})
+
+    def _customer_response(self, user, customer_profile):
+        profile_dict = to_dict(customer_profile) if customer_profile else {}
+        profile_dict.pop('id', None)
+        return CustomerResponse(**{**to_dict(user), **profile_dict})
+
+    async def _short_orders(self, ids):
+        orders = await self.order_service.get_orders_by_ids(ids)
+        return {id: ShortOrderResponse(**to_dict(order)) for id, order in orders.items()}
+
+    # Users
+    async def users(self, users, **executor_filter):
+        users = list(users)
+        executor_profiles = await self.user_service.get_executors_by_ids(
+            [user.id_executor_profile for user in users if user.role == Roles.EXECUTOR.value],
+            **executor_filter
+        )
+        customer_profiles = await self.user_service.get_customers_by_ids(
+            [user.id_customer_profile for user in users if user.role == Roles.CUSTOMER.value]
+        )
+        specializations = await self._specializations(
+            [profile.id_specialization for profile in executor_profiles.values()]
+        )
+
+        response = []
+        for user in users:
+            if user.role == Roles.EXECUTOR.value:
+                executor_profile = executor_profiles.get(user.id_executor_profile)
+                if not executor_profile:
+                    continue
+                response.append(self._executor_response(user, executor_profile, specializations))
+            elif user.role == Roles.CUSTOMER.value:
+                customer_profile = customer_profiles.get(user.id_customer_profile)
+                response.append(self._customer_response(user, customer_profile))
+            elif user.role == Roles.ADMIN.value:
+                response.append(UserResponse(**to_dict(user)))
+        return response
+
+    # Services
+    async def services(self, services):
+        services = list(services)
+        users = await self.user_service.get_users_by_ids([service.id_user_executor for service in services])
+        executor_profiles = await self.user_service.get_executors_by_ids(
+            [user.id_executor_profile for user in users.values()]
+        )
+        specializations = await self._specializations(
+            [service.id_specialization for service in services] +
+            [profile.id_specialization for profile in executor_profiles.values()]
+        )
+
+        response = []
+        for service in services:
+            user = users.get(service.id_user_executor)
+            executor_profile = executor_profiles.get(user.id_executor_profile) if user else None
+            if not executor_profile:
+                continue
+            service_dict = to_dict(service)
+            service_dict.update({
+                'specialization': specializations.get(service.id_specialization),
+                'user_executor': self._executor_response(user, executor_profile, specializations)
+            })
+            response.append(ServiceResponse(**service_dict))
+        return response
+
+    # Orders
+    async def orders(self, orders):
+        orders = list(orders)
+        users = await self.user_service.get_users_by_ids(
+            [order.id_user_customer for order in orders] +
+            [order.id_user_executor for order in orders]
+        )
+        customer_profiles = await self.user_service.get_customers_by_ids(
+            [user.id_customer_profile for user in users.values()]
+        )
+        executor_profiles = await self.user_service.get_executors_by_ids(
+            [user.id_executor_profile for user in users.values()]
+        )
+        services = await self.service_service.get_services_by_ids([order.id_service for order in orders])
+        specializations = await self._specializations(
+            [service.id_specialization for service in services.values()] +
+            [profile.id_specialization for profile in executor_profiles.values()]
+        )
+
+        response = []
+        for order in orders:
+            user_customer = users.get(order.id_user_customer)
+            customer_response = None
+            if user_customer:
+                customer_profile = customer_profiles.get(user_customer.id_customer_profile)
+                customer_response = self._customer_response(user_customer, customer_profile)
+
+            user_executor = users.get(order.id_user_executor)
+            executor_response = None
+            if user_executor:
+                executor_profile = executor_profiles.get(user_executor.id_executor_profile)
+                if executor_profile:
+                    executor_response = self._executor_response(user_executor, executor_profile, specializations)
+
+            service = services.get(order.id_service)
+            service_response = None
+            if service:
+                service_dict = to_dict(service)
+                service_dict['specialization'] = specializations.get(service.id_specialization)
+                service_response = ShortServiceResponse(**service_dict)
+
+            order_dict = to_dict(order)
+            order_dict.update({
+                'user_customer': customer_response,
+                'user_executor': executor_response,
+                'service': service_response,
+            })
+            response.append(OrderResponse(**order_dict))
+        return response
+
+    # Reviews
+    async def reviews(self, reviews):
+        reviews = list(reviews)
+        orders = await self._short_orders([review.id_order for review in reviews])
+        users = await self.user_service.get_users_by_ids(
+            [review.id_user_author for review in reviews] +
+            [review.id_user_target for review in reviews]
+        )
+
+        response = []
+        for review in reviews:
+            user_author = users.get(review.id_user_author)
+            user_target = users.get(review.id_user_target)
+            if not user_author or not user_target:
+                continue
+            review_dict = to_dict(review)
+            review_dict.update({
+                'user_author': UserResponse(**to_dict(user_author)),
+                'user_target': UserResponse(**to_dict(user_target)),
+                'order': orders.get(review.id_order)
+            })
+            response.append(ReviewResponse(**review_dict))
+        return response
+
+    # Transactions
+    async def transactions(self, transactions):
+        transactions = list(transactions)
+        orders = await self._short_orders([trans.id_order for trans in transactions])
+        users = await self.user_service.get_users_by_ids(
+            [trans.id_user_sender for trans in transactions] +
+            [trans.id_user_recipient for trans in transactions]
+        )
+
+        response = []
+        for trans in transactions:
+            sender = users.get(trans.id_user_sender)
+            recipient = users.get(trans.id_user_recipient)
+            if not sender or not recipient:
+                continue
+            trans_dict = to_dict(trans)
+            trans_dict.update({
+                'order': orders.get(trans.id_order),
+                'sender': UserTransactionResponse(**to_dict(sender)),
+                'recipient': UserTransactionResponse(**to_dict(recipient))
+            })
+            response.append(TransactionResponse(**trans_dict))
+        return response
+
+    # Messages
+    async def messages(self, messages):
+        messages = list(messages)
+        orders = await self._short_orders([message.id_order for message in messages])
+        users = await self.user_service.get_users_by_ids(
+            [message.id_user_sender for message in messages] +
+            [message.id_user_recipient for message in messages]
+        )
+
+        response = []
+        for message in messages:
+            sender = users.get(message.id_user_sender)
+            recipient = users.get(message.id_user_recipient)
+            if not sender or not recipient:
+                continue
+            message_dict = to_dict(message)
+            message_dict.update({
+                'sender': UserMessageResponse(**to_dict(sender)),
+                'recipient': UserMessageResponse(**to_dict(recipient)),
+                'order': orders.get(message.id_order)
+            })
+            response.append(MessageResponse(**message_dict))
+        return response
+
+    async def search_results(self, messages, snippets):
+        return [
+            MessageSearchResponse(**message.model_dump(), snippet=render_snippet(snippets.get(message.id)))
+            for message in await self.messages(messages)
+        ]
+
+    # Conversations
+    async def conversations(self, conversations, id_user: int):
+        conversations = list(conversations)
+        peers = {
+            conversation.id: conversation.id_user_high if conversation.id_user_low == id_user else conversation.id_user_low
+            for conversation in conversations
+        }
+        users = await self.user_service.get_users_by_ids(peers.values())
+        orders = await self._short_orders([conversation.id_order for conversation in conversations])
+        messages = await self.message_service.get_messages_by_ids(
+            [conversation.id_last_message for conversation in conversations]
+        )
+
+        response = []
+        for conversation in conversations:
+            user = users.get(peers[conversation.id])
+            if not user:
+                continue
+            last_message = messages.get(conversation.id_last_message)
+            response.append(ConversationResponse(
+                id=conversation.id,
+                user=UserMessageResponse(**to_dict(user)),
+                order=orders.get(conversation.id_order),
+                last_message=ConversationMessageResponse(**to_dict(last_message)) if last_message else None,
+                last_activity_at=conversation.last_activity_at,
+                unread=conversation.unread_low if conversation.id_user_low == id_user else conversation.unread_high
+            ))
+        return response
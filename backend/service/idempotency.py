@@ -0,0 +1,114 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from crud.idempotency import AsyncIdempotencyRepository, IdempotencyKeyLost
+from utils.enums import Status
+from utils.cache import idempotency_cache
+from config.idempotency import IDEMPOTENCY_KEY_TTL, IDEMPOTENCY_LOCK_TIMEOUT, IDEMPOTENT_REPLAY_HEADER
+
+# Runs a POST handler at most once per (user, Idempotency-Key). The key is
+# reserved before the handler runs, so a retry that races the first request
+# gets 409 instead of executing twice, and marked completed by the handler's
+# own commit, so a write is never committed without it. Finished responses
+# are replayed from idempotency_cache or, in other workers, from one indexed
+# lookup.
+class IdempotencyService:
+    def __init__(self, idempotency_repository: AsyncIdempotencyRepository):
+        self.idempotency_repository = idempotency_repository
+
+    @staticmethod
+    def fingerprint(method: str, path: str, payload) -> str:
+        body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(f'{method} {path} {body}'.encode()).hexdigest()
+
+    @staticmethod
+    def replay(stored: tuple, fingerprint: str):
+        stored_fingerprint, status_code, body, _ = stored
+        if stored_fingerprint != fingerprint:
+            raise IdempotencyService.mismatch()
+        return Response(content=body, status_code=status_code, media_type='application/json',
+                        headers={IDEMPOTENT_REPLAY_HEADER: 'true'})
+
+    def cached(self, cache_key: tuple, now: datetime):
+        stored = idempotency_cache.get(cache_key)
+        if stored is not None and stored[3] <= now:
+            idempotency_cache.invalidate(cache_key)
+            return None
+        return stored
+
+    async def run(self, id_user: int, key: str | None, method: str, path: str, payload,
+                  status_code: int, handler):
+        if key is None:
+            return await handler()
+
+        now = datetime.now()
+        cache_key = (id_user, key)
+        fingerprint = self.fingerprint(method, path, payload)
+        stored = self.cached(cache_key, now)
+        if stored is not None:
+            return self.replay(stored, fingerprint)
+
+        record = await self.idempotency_repository.get_one_filter_by(id_user=id_user, key=key)
+        if record is not None and record.expires_at <= now:
+            await self.idempotency_repository.delete(record.id)
+            record = None
+
+        entity = {'fingerprint': fingerprint, 'created_at': now,
+                  'expires_at': now + timedelta(seconds=IDEMPOTENCY_KEY_TTL)}
+        if record is None:
+            record = await self.idempotency_repository.reserve({'id_user': id_user, 'key': key, **entity})
+            if record is None:
+                raise self.in_progress()
+        elif record.status_code is not None and record.response is not None:
+            stored = (record.fingerprint, record.status_code, record.response, record.expires_at)
+            idempotency_cache.set(cache_key, stored)
+            return self.replay(stored, fingerprint)
+        elif record.fingerprint != fingerprint:
+            raise self.mismatch()
+        elif record.status_code is not None:
+            # The write committed but the response was never stored.
+            raise self.completed()
+        elif not await self.idempotency_repository.claim(
+                record.id, now - timedelta(seconds=IDEMPOTENCY_LOCK_TIMEOUT), entity):
+            raise self.in_progress()
+
+        id, reserved_at = record.id, entity['created_at']
+        self.idempotency_repository.complete_on_commit(id, reserved_at, status_code)
+        try:
+            result = await handler()
+            # Completes the key here if the handler had nothing to commit.
+            await self.idempotency_repository.session.commit()
+        except BaseException as e:
+            self.idempotency_repository.cancel_completion()
+            await self.idempotency_repository.session.rollback()
+            # Only a reservation still in progress is released: after a
+            # committed write the key stays completed, after a lost one it
+            # belongs to the request that claimed it.
+            await self.idempotency_repository.release(id, reserved_at)
+            if isinstance(e, IdempotencyKeyLost):
+                raise self.in_progress()
+            raise
+        body = json.dumps(jsonable_encoder(result))
+        await self.idempotency_repository.update({'id': id, 'response': body})
+        idempotency_cache.set(cache_key, (fingerprint, status_code, body, entity['expires_at']))
+        return Response(content=body, status_code=status_code, media_type='application/json')
+
+    @staticmethod
+    def mismatch():
+        return HTTPException(status_code=422, detail={'status': Status.FAILED.value,
+                                                      'message': 'Idempotency-Key was used for a different request'})
+
+    @staticmethod
+    def in_progress():
+        return HTTPException(status_code=409, detail={'status': Status.FAILED.value,
+                                                      'message': 'A request with this Idempotency-Key is in progress'})
+
+    @staticmethod
+    def completed():
+        return HTTPException(status_code=409, detail={'status': Status.FAILED.value,
+                                                      'message': 'A request with this Idempotency-Key already completed'})
+
+    async def delete_expired(self):
+        return await self.idempotency_repository.delete_expired(datetime.now())
@@ -0,0 +1,90 @@
+from decimal import Decimal
+from fastapi import HTTPException
+from schemas.transactions import *
+from crud.transactions import AsyncTransactionRepository, AsyncLedgerRepository, InsufficientFunds, AccountNotFound
+from crud.users import AsyncUserRepository
+from crud.orders import AsyncOrderRepository
+from utils.enums import Status, TransactionType
+from utils.cache import user_cache
+from models.users import User
+from config.ledger import LEDGER_SNAPSHOT_MIN_ENTRIES
+
+COMMISSION_RATE = Decimal('0.01')
+CENT = Decimal('0.01')
+
+# Moves money for POST /api/transactions: the debit, the credit and the
+# transaction row are one database transaction (see AsyncTransactionRepository.transfer).
+class LedgerService:
+    def __init__(self, transaction_repository: AsyncTransactionRepository,
+                 user_repository: AsyncUserRepository,
+                 order_repository: AsyncOrderRepository,
+                 ledger_repository: AsyncLedgerRepository = None):
+        self.transaction_repository = transaction_repository
+        self.user_repository = user_repository
+        self.order_repository = order_repository
+        self.ledger_repository = ledger_repository
+
+    async def create_transaction(self, id_user_sender: int, new_transaction: CreateTransaction):
+        entity = new_transaction.model_dump()
+        entity['id_user_sender'] = id_user_sender
+        amount = Decimal(str(entity['amount']))
+        commission = amount * COMMISSION_RATE
+        entity['commission'] = float(commission)
+
+        debits, credits = {}, {}
+        if entity['type'] == TransactionType.PAYMENT.value:
+            order = await self.order_repository.get_one_filter_by(id=entity['id_order'])
+            if not order:
+                raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value, 'message': 'Order not found'})
+            if amount < order.price:
+                raise HTTPException(status_code=400, detail={'status': Status.FAILED.value, 'message': f'Сумма транзакции не может быть меньше стоимости заказа {order.price}.'})
+            debits[id_user_sender] = amount + commission
+            credits[entity['id_user_recipient']] = amount
+        else:
+            if not await self.user_repository.get_one_filter_by(id=entity['id_user_recipient']):
+                raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value, 'message': 'Sender or recipient not found'})
+            if entity['type'] == TransactionType.DEPOSIT.value:
+                credits[id_user_sender] = amount
+
+        try:
+            transaction = await self.transaction_repository.transfer(entity, debits, credits)
+        except InsufficientFunds:
+            raise HTTPException(status_code=400, detail={'status': Status.FAILED.value, 'message': f'Недостаточно средств.'})
+        except AccountNotFound:
+            raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value, 'message': 'Sender or recipient not found'})
+        for id_user in {*debits, *credits}:
+            user_cache.invalidate(id_user)
+        return transaction
+
+    # Balances: the latest snapshot plus the ledger entries after it.
+    async def get_balance(self, id_user: int):
+        rows = await self.ledger_repository.get_rows(self.ledger_repository.select_balances(User.id == id_user))
+        return Decimal(str(rows[0].derived)).quantize(CENT) if rows else None
+
+    # Checks every user's stored balance against the ledger, reading only the
+    # entries after each user's last snapshot, and checkpoints users whose
+    # tail has grown to min_entries.
+    async def reconcile(self, min_entries: int = LEDGER_SNAPSHOT_MIN_ENTRIES, batch_size: int = 500) -> dict:
+        report = {'users': 0, 'entries': 0, 'snapshots': 0, 'mismatches': []}
+        last_id = 0
+        while True:
+            rows = await self.ledger_repository.get_rows(
+                self.ledger_repository.select_balances(User.id > last_id).order_by(User.id).limit(batch_size)
+            )
+            if not rows:
+                break
+            snapshots = []
+            for row in rows:
+                derived = Decimal(str(row.derived)).quantize(CENT)
+                stored = Decimal(str(row.stored or 0)).quantize(CENT)
+                if derived != stored:
+                    report['mismatches'].append({'id_user': row.id, 'stored': stored, 'derived': derived})
+                if row.entries and row.entries >= min_entries:
+                    snapshots.append({'id_user': row.id, 'id_last_entry': row.id_last_entry, 'balance': derived})
+                report['entries'] += row.entries
+            if snapshots:
+                await self.ledger_repository.add_snapshots(snapshots)
+            report['users'] += len(rows)
+            report['snapshots'] += len(snapshots)
+            last_id = rows[-1].id
+        return report
@@ -1,25 +1,156 @@
+from sqlalchemy import select, union_all
 from crud.messages import *
 from schemas.messages import *
-from models.messages import Message
+from models.messages import Message, Conversation, messages_fts
+from utils.pagination import keyset_condition, split_page
+from utils.search import require_match, column_match, fts_hits, fts_match, fts_snippet
+
+NEWEST_FIRST = [('created_at', True), ('id', True)]
 
 class MessageService:
-    def __init__(self, message_repository: MessageRepository):
+    def __init__(self, message_repository: AsyncMessageRepository,
+                 conversation_repository: AsyncConversationRepository = None):
         self.message_repository = message_repository
+        self.conversation_repository = conversation_repository
 
-    def get_all_messages_filter_by(self, **filters):
-        return self.message_repository.get_all_filter_by(**filters)
+    async def get_all_messages_filter_by(self, **filters):
+        return await self.message_repository.get_all_filter_by(**filters)
     
-    def get_one_message_filter_by(self, **filters):
-        return self.message_repository.get_one_filter_by(**filters)
+    async def get_one_message_filter_by(self, **filters):
+        return await self.message_repository.get_one_filter_by(**filters)
     
     def get_chat_messages(self, id_user: int, id_recipient: int, id_order: Optional[int] = None):
-        return self.message_repository.get_all_filter_by(
+        return self.message_repository.select_filter_by(
             id_order=id_order
-        ).filter(
-            (Message.id_user_sender == id_user) | (Message.id_user_recipient == id_user),
-            (Message.id_user_sender == id_recipient) | (Message.id_user_recipient == id_recipient)
+        ).where(
+            ((Message.id_user_sender == id_user) & (Message.id_user_recipient == id_recipient)) |
+            ((Message.id_user_sender == id_recipient) & (Message.id_user_recipient == id_user))
         ).order_by(Message.created_at)
-    
-    def create_message(self, new_message: dict):
-        return self.message_repository.add(new_message)
+
+    async def get_chat_messages_page(self, id_user: int, id_recipient: int, limit: int,
+                                     cursor: Optional[str] = None, id_order: Optional[int] = None):
+        # The first page is the latest `limit` messages and the cursor walks back
+        # in time; each page is still returned oldest to newest.
+        query = self.get_chat_messages(id_user=id_user, id_recipient=id_recipient, id_order=id_order)
+        messages, next_cursor = await self.message_repository.get_page(limit, cursor, query=query,
+                                                                       order_by=NEWEST_FIRST)
+        messages.reverse()
+        return messages, next_cursor
+
+    def history_anchor(self, id_message: int, before: bool):
+        created_at = select(Message.created_at).where(Message.id == id_message).scalar_subquery()
+        # The non-strict bound on created_at alone is what narrows the index range.
+        if before:
+            return (Message.created_at <= created_at) & (
+                (Message.created_at < created_at) | (Message.id < id_message))
+        return (Message.created_at >= created_at) & (
+            (Message.created_at > created_at) | (Message.id > id_message))
+
+    def get_chat_history(self, id_user: int, id_recipient: int, limit: int,
+                         before: Optional[int] = None, after: Optional[int] = None, id_order: Optional[int] = None):
+        # Each direction of the chat is a range of the sender/recipient/created_at
+        # index read up to the limit; the page is the newest (or, with after only,
+        # the oldest) `limit` rows of the two.
+        conditions = []
+        if before is not None:
+            conditions.append(self.history_anchor(before, before=True))
+        if after is not None:
+            conditions.append(self.history_anchor(after, before=False))
+        descending = after is None or before is not None
+        sort = [Message.created_at.desc(), Message.id.desc()] if descending else [Message.created_at, Message.id]
+
+        directions = [
+            self.message_repository.select_filter_by(
+                *conditions, id_user_sender=sender, id_user_recipient=recipient, id_order=id_order
+            ).with_only_columns(Message.id).order_by(*sort).limit(limit).subquery()
+            for sender, recipient in ((id_user, id_recipient), (id_recipient, id_user))
+        ]
+        ids = union_all(*(select(direction.c.id) for direction in directions))
+        return self.message_repository.select_filter_by(Message.id.in_(ids)).order_by(*sort).limit(limit), descending
+
+    async def get_chat_history_page(self, id_user: int, id_recipient: int, limit: int,
+                                    before: Optional[int] = None, after: Optional[int] = None,
+                                    id_order: Optional[int] = None):
+        query, descending = self.get_chat_history(id_user, id_recipient, limit, before, after, id_order)
+        messages = list(await self.message_repository.get_all_filter_by(query))
+        if descending:
+            messages.reverse()
+        return messages
+
+    def get_messages_since(self, id_user: int, id_message: int, limit: int):
+        # Everything the user sent or received after a message id, read from
+        # the (sender, id) and (recipient, id) indexes.
+        sides = [
+            self.message_repository.select_filter_by(Message.id > id_message, **{column: id_user})
+            .with_only_columns(Message.id).order_by(Message.id).limit(limit).subquery()
+            for column in ('id_user_sender', 'id_user_recipient')
+        ]
+        ids = union_all(*(select(side.c.id) for side in sides))
+        return self.message_repository.select_filter_by(Message.id.in_(ids)).order_by(Message.id).limit(limit)
+
+    async def get_messages_since_page(self, id_user: int, id_message: int, limit: int):
+        return await self.message_repository.get_all_filter_by(self.get_messages_since(id_user, id_message, limit))
+
+    # Search
+    def search_match(self, id_user: int, query: str, id_recipient: Optional[int] = None):
+        expression = f'{column_match("message", require_match(query))} AND {column_match("participants", f"u{id_user}")}'
+        if id_recipient is not None:
+            expression += f' AND {column_match("participants", f"u{id_recipient}")}'
+        return expression
+
+    def search_messages(self, id_user: int, query: str, limit: int,
+                        cursor: Optional[str] = None, id_recipient: Optional[int] = None):
+        hits = fts_hits(messages_fts, self.search_match(id_user, query, id_recipient))
+        columns = [hits.c.rank, hits.c.id]
+        page = select(hits.c.id, hits.c.rank)
+        if cursor:
+            page = page.where(keyset_condition(columns, cursor))
+        return page.order_by(*columns).limit(limit + 1)
+
+    async def search_messages_page(self, id_user: int, query: str, limit: int,
+                                   cursor: Optional[str] = None, id_recipient: Optional[int] = None):
+        hits, next_cursor = split_page(
+            await self.message_repository.get_rows(self.search_messages(id_user, query, limit, cursor, id_recipient)),
+            limit, ('rank', 'id')
+        )
+        ids = [hit.id for hit in hits]
+        if not ids:
+            return [], {}, next_cursor
+        # Snippets only for the page, in the same FTS query context they need.
+        snippets = dict(await self.message_repository.get_rows(
+            select(messages_fts.c.rowid, fts_snippet('messages_fts', 0)).where(
+                fts_match('messages_fts', self.search_match(id_user, query, id_recipient)),
+                messages_fts.c.rowid.in_(ids)
+            )
+        ))
+        messages = await self.message_repository.get_all_by_ids(ids)
+        return [messages[id] for id in ids if id in messages], snippets, next_cursor
+
+    async def get_messages_by_ids(self, ids):
+        return await self.message_repository.get_all_by_ids(ids)
+
+    async def create_message(self, new_message: dict):
+        message, = await self.message_repository.add_all([new_message])
+        return message
+
+    # Conversations
+    def get_inbox(self, id_user: int, limit: int):
+        sort = [Conversation.last_activity_at.desc(), Conversation.id.desc()]
+        sides = [
+            self.conversation_repository.select_filter_by(**{column: id_user})
+            .with_only_columns(Conversation.id).order_by(*sort).limit(limit).subquery()
+            for column in ('id_user_low', 'id_user_high')
+        ]
+        ids = union_all(*(select(side.c.id) for side in sides))
+        return self.conversation_repository.select_filter_by(Conversation.id.in_(ids)).order_by(*sort).limit(limit)
+
+    async def get_inbox_page(self, id_user: int, limit: int):
+        return await self.conversation_repository.get_all_filter_by(self.get_inbox(id_user, limit))
+
+    async def mark_conversation_read(self, id_user: int, id_conversation: int):
+        low = await self.conversation_repository.update_by_filter(
+            {'id': id_conversation, 'id_user_low': id_user}, {'unread_low': 0})
+        high = await self.conversation_repository.update_by_filter(
+            {'id': id_conversation, 'id_user_high': id_user}, {'unread_high': 0})
+        return low + high > 0
     
@@ -1,29 +1,41 @@
 from schemas.orders import *
 from crud.orders import *
-from crud.services import ServiceRepository
+from crud.services import AsyncServiceRepository
+from config.export import EXPORT_YIELD_PER
 
 class OrderService:
-    def __init__(self, order_repository: OrderRepository, service_repository: ServiceRepository):
+    def __init__(self, order_repository: AsyncOrderRepository, service_repository: AsyncServiceRepository):
         self.order_repository = order_repository
         self.service_repository = service_repository
 
     # Order
-    def get_all_orders_filter_by(self, **filter):
-        return self.order_repository.get_all_filter_by(**filter)
+    async def get_all_orders_filter_by(self, **filter):
+        return await self.order_repository.get_all_filter_by(**filter)
 
-    def get_one_order_filter_by(self, **filter):
-        return self.order_repository.get_one_filter_by(**filter)
+    async def get_orders_page(self, limit: int, cursor: str | None = None,
+                              order_by=(), conditions=(), **filter):
+        return await self.order_repository.get_page(limit, cursor, order_by=order_by, conditions=conditions, **filter)
+
+    def export_orders(self, conditions=(), **filter):
+        query = self.order_repository.select_export(self.order_repository.select_filter_by(*conditions, **filter))
+        return self.order_repository.EXPORT_COLUMNS, self.order_repository.stream_rows(query, EXPORT_YIELD_PER)
+
+    async def get_one_order_filter_by(self, **filter):
+        return await self.order_repository.get_one_filter_by(**filter)
+
+    async def get_orders_by_ids(self, ids, **filter):
+        return await self.order_repository.get_all_by_ids(ids, **filter)
     
-    def create_order(self, new_order: dict):
+    async def create_order(self, new_order: dict):
         if not new_order.get('id_user_executor'):
-            service = self.service_repository.get_one_filter_by(id=new_order['id_service'])
+            service = await self.service_repository.get_one_filter_by(id=new_order['id_service'])
             new_order['id_user_executor'] = service.id_user_executor
-        return self.order_repository.add(new_order)
+        return await self.order_repository.add(new_order)
     
-    def update_order(self, id: int, entity: dict):
+    async def update_order(self, id: int, entity: dict):
         entity['id'] = id
         entity = {k: v for k, v in entity.items() if v is not None}
-        return self.order_repository.update(entity)
+        return await self.order_repository.update(entity)
     
-    def delete_order(self, id: int):
-        return self.order_repository.delete(id)
\ No newline at end of file
+    async def delete_order(self, id: int):
+        return await self.order_repository.delete(id)
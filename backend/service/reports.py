@@ -0,0 +1,70 @@
+import time
+from datetime import date
+from schemas.reports import *
+from crud.reports import AsyncTransactionRollupRepository
+from models.orders import Transaction
+from models.reports import TransactionRollup
+from service.services import ServiceService
+from utils.rollups import NO_SPECIALIZATION, aggregate, merge, by_period
+from config.reports import ROLLUP_BATCH_SIZE
+
+REPORT_SUMS = ('count', 'amount', 'commission')
+SUMMARY_SUMS = ('gmv', 'payments', 'commission', 'deposits', 'withdrawals', 'refunds')
+
+# Admin reporting over transaction_rollups. Reports never touch transactions;
+# rebuild recomputes the rollups from them in NumPy batches.
+class ReportService:
+    def __init__(self, rollup_repository: AsyncTransactionRollupRepository,
+                 service_service: ServiceService):
+        self.rollup_repository = rollup_repository
+        self.service_service = service_service
+
+    @staticmethod
+    def conditions(date_from: date | None = None, date_to: date | None = None,
+                   type: str | None = None, id_specialization: int | None = None) -> list:
+        conditions = []
+        if date_from is not None:
+            conditions.append(TransactionRollup.bucket >= date_from)
+        if date_to is not None:
+            conditions.append(TransactionRollup.bucket <= date_to)
+        if type is not None:
+            conditions.append(TransactionRollup.type == type)
+        if id_specialization is not None:
+            conditions.append(TransactionRollup.id_specialization == id_specialization)
+        return conditions
+
+    # Rollups of transactions without a specialization are reported with null.
+    async def with_specializations(self, rows: list, response_model) -> list:
+        for row in rows:
+            if row.get('id_specialization') == NO_SPECIALIZATION:
+                row['id_specialization'] = None
+        specializations = await self.service_service.get_specializations_by_ids(
+            [row['id_specialization'] for row in rows if row.get('id_specialization')]
+        )
+        return [response_model(**row, specialization=specializations.get(row.get('id_specialization')))
+                for row in rows]
+
+    async def get_period_rows(self, query, period: str, sums) -> list:
+        rows = await self.rollup_repository.get_rows(query)
+        return by_period([row._asdict() for row in rows], period, sums)
+
+    async def get_report(self, period: str, conditions=(), by_type: bool = True, by_specialization: bool = True):
+        query = self.rollup_repository.select_report(*conditions, by_type=by_type, by_specialization=by_specialization)
+        rows = await self.get_period_rows(query, period, REPORT_SUMS)
+        return await self.with_specializations(rows, RollupResponse)
+
+    async def get_summary(self, period: str, conditions=(), by_specialization: bool = False):
+        query = self.rollup_repository.select_summary(*conditions, by_specialization=by_specialization)
+        rows = await self.get_period_rows(query, period, SUMMARY_SUMS)
+        return await self.with_specializations(rows, SummaryResponse)
+
+    async def rebuild(self) -> dict:
+        started = time.perf_counter()
+        id_last_transaction = await self.rollup_repository.get_last_transaction_id()
+        query = self.rollup_repository.select_source(Transaction.id <= id_last_transaction)
+        totals, transactions = {}, 0
+        async for rows in self.rollup_repository.stream_rows(query, ROLLUP_BATCH_SIZE):
+            merge(totals, aggregate(rows))
+            transactions += len(rows)
+        transactions += await self.rollup_repository.replace(totals, id_last_transaction)
+        return {'transactions': transactions, 'rows': len(totals), 'seconds': round(time.perf_counter() - started, 3)}
@@ -2,22 +2,26 @@ from schemas.reviews import *
 from crud.reviews import *
 
 class ReviewService:
-    def __init__(self, review_repository: ReviewRepository):
+    def __init__(self, review_repository: AsyncReviewRepository):
         self.review_repository = review_repository
 
-    def get_all_reviews_filter_by(self, **filter):
-        return self.review_repository.get_all_filter_by(**filter)
+    async def get_all_reviews_filter_by(self, **filter):
+        return await self.review_repository.get_all_filter_by(**filter)
+
+    async def get_reviews_page(self, limit: int, cursor: str | None = None,
+                               order_by=(), conditions=(), **filter):
+        return await self.review_repository.get_page(limit, cursor, order_by=order_by, conditions=conditions, **filter)
     
-    def get_one_review_filter_by(self, **filter):
-        return self.review_repository.get_one_filter_by(**filter)
+    async def get_one_review_filter_by(self, **filter):
+        return await self.review_repository.get_one_filter_by(**filter)
     
-    def create_review(self, data: dict):
-        return self.review_repository.add(data)
+    async def create_review(self, data: dict):
+        return await self.review_repository.add(data)
     
-    def update_review(self, id: int, entity: dict):
+    async def update_review(self, id: int, entity: dict):
         entity['id'] = id
         entity = {k: v for k, v in entity.items() if v is not None}
-        return self.review_repository.update(entity)
+        return await self.review_repository.update(entity)
 
-    def delete_review(self, id: int):
-        return self.review_repository.delete(id)
\ No newline at end of file
+    async def delete_review(self, id: int):
+        return await self.review_repository.delete(id)
@@ -0,0 +1,49 @@
+from crud.services import AsyncServiceRepository, AsyncServiceCardRepository
+from models.services import Service, ServiceCard
+from service.hydration import HydrationService
+from utils.pagination import split_page
+
+# Serves the catalog from service_cards: one indexed read returns the page
+# keys and the stored JSON. Writers empty cards in their own transaction, an
+# empty card is built here with HydrationService and stored for the next
+# request unless a write bumped its version while it was being built.
+class ServiceCardService:
+    def __init__(self, service_repository: AsyncServiceRepository,
+                 card_repository: AsyncServiceCardRepository,
+                 hydration_service: HydrationService):
+        self.service_repository = service_repository
+        self.card_repository = card_repository
+        self.hydration_service = hydration_service
+
+    async def build_cards(self, ids) -> dict:
+        cards = await self.card_repository.reserve(ids)
+        documents = {id: card.document for id, card in cards.items() if card.document is not None}
+        services = await self.service_repository.get_all_by_ids([id for id in cards if id not in documents])
+        responses = await self.hydration_service.services(services.values())
+        built = [{
+            'card_id': response.id,
+            'card_version': cards[response.id].version,
+            'card_document': response.model_dump_json(),
+        } for response in responses]
+        if built:
+            await self.card_repository.store(built)
+        documents.update({card['card_id']: card['card_document'] for card in built})
+        return documents
+
+    async def get_cards_page(self, limit: int, cursor: str | None = None,
+                             order_by=(), conditions=(), **filter):
+        query, keys = self.service_repository.select_page(limit, cursor, order_by=order_by,
+                                                          conditions=conditions, **filter)
+        query = query.outerjoin(ServiceCard, ServiceCard.id == Service.id).with_only_columns(
+            *(getattr(Service, key) for key in keys), ServiceCard.document
+        )
+        rows, next_cursor = split_page(await self.service_repository.get_rows(query), limit, keys)
+        built = await self.build_cards([row.id for row in rows if row.document is None])
+        documents = [row.document or built.get(row.id) for row in rows]
+        return [document for document in documents if document], next_cursor
+
+    async def get_card(self, id: int) -> str | None:
+        card = await self.card_repository.get_one_filter_by(id=id)
+        if card and card.document is not None:
+            return card.document
+        return (await self.build_cards([id])).get(id)
@@ -1,47 +1,113 @@
 from schemas.specializations import *
 from schemas.services import *
 from crud.services import *
+from models.services import Service, ServiceCard, services_fts
+from utils.pagination import keyset_condition, split_page
+from utils.search import require_match, fts_hits
+from utils.facets import Facet
+from utils.cache import specialization_cache
+from utils.to_dict import to_dict
 
 class ServiceService:
-    def __init__(self, service_repository: ServiceRepository, 
-                 specialization_repository: ServiceRepository):
+    def __init__(self, service_repository: AsyncServiceRepository, 
+                 specialization_repository: AsyncServiceRepository,
+                 card_repository: AsyncServiceCardRepository = None):
         self.service_repository = service_repository
         self.specialization_repository = specialization_repository
+        self.card_repository = card_repository
+
+    # Called before every write, which then commits the invalidation with it;
+    # cards are rebuilt on the next read.
+    async def invalidate_cards(self, *conditions):
+        if self.card_repository:
+            await self.card_repository.invalidate(*conditions)
 
     # Specialization
-    def get_all_specializations_filter_by(self, **filter):
-        return self.specialization_repository.get_all_filter_by(**filter)
+    async def get_all_specializations_filter_by(self, **filter):
+        return await self.specialization_repository.get_all_filter_by(**filter)
     
-    def get_one_specialization_filter_by(self, **filter):
-        return self.specialization_repository.get_one_filter_by(**filter)
+    async def get_one_specialization_filter_by(self, **filter):
+        return await self.specialization_repository.get_one_filter_by(**filter)
+
+    async def load_specializations(self) -> dict:
+        specializations = await self.specialization_repository.get_all_filter_by()
+        return {spec.id: SpecializationResponse(**to_dict(spec)) for spec in specializations}
+
+    async def get_specializations(self) -> dict:
+        return await specialization_cache.get(self.load_specializations)
 
-    def create_specialization(self, data: CreateSpecialization):
-        return self.specialization_repository.add(data.model_dump())
+    async def get_specializations_by_ids(self, ids):
+        specializations = await self.get_specializations()
+        return {id: specializations[id] for id in ids if id in specializations}
 
-    def update_specialization(self, id: int, upd_specialization: UpdateSpecialization):
+    async def create_specialization(self, data: CreateSpecialization):
+        specialization = await self.specialization_repository.add(data.model_dump())
+        specialization_cache.invalidate()
+        return specialization
+
+    async def update_specialization(self, id: int, upd_specialization: UpdateSpecialization):
         entity = upd_specialization.model_dump()
         entity['id'] = id
         entity = {k: v for k, v in entity.items() if v is not None}
-        return self.specialization_repository.update(entity)
+        await self.invalidate_cards()
+        specialization = await self.specialization_repository.update(entity)
+        specialization_cache.invalidate()
+        return specialization
     
-    def delete_specialization(self, id: int):
-        return self.specialization_repository.delete(id)
+    async def delete_specialization(self, id: int):
+        await self.invalidate_cards()
+        result = await self.specialization_repository.delete(id)
+        specialization_cache.invalidate()
+        return result
 
     # Service
-    def get_all_services_filter_by(self, **filter):
-        return self.service_repository.get_all_filter_by(**filter)
+    async def get_all_services_filter_by(self, **filter):
+        return await self.service_repository.get_all_filter_by(**filter)
     
-    def get_one_service_filter_by(self, **filter):
-        return self.service_repository.get_one_filter_by(**filter)
+    async def get_services_page(self, limit: int, cursor: str | None = None,
+                                order_by=(), conditions=(), **filter):
+        return await self.service_repository.get_page(limit, cursor, order_by=order_by, conditions=conditions, **filter)
+
+    def search_services(self, query: str, limit: int, cursor: str | None = None, conditions=(), **filter):
+        hits = fts_hits(services_fts, require_match(query))
+        columns = [hits.c.rank, hits.c.id]
+        page = self.service_repository.select_filter_by(*conditions, **filter).join(
+            hits, hits.c.id == Service.id
+        ).with_only_columns(hits.c.id, hits.c.rank)
+        if cursor:
+            page = page.where(keyset_condition(columns, cursor))
+        return page.order_by(*columns).limit(limit + 1)
+
+    async def search_services_page(self, query: str, limit: int, cursor: str | None = None,
+                                   conditions=(), **filter):
+        hits, next_cursor = split_page(
+            await self.service_repository.get_rows(self.search_services(query, limit, cursor, conditions, **filter)),
+            limit, ('rank', 'id')
+        )
+        services = await self.service_repository.get_all_by_ids([hit.id for hit in hits])
+        return [services[hit.id] for hit in hits if hit.id in services], next_cursor
+
+    async def get_services_facet(self, facet: Facet, conditions=(), **filter):
+        query = facet.select(self.service_repository.select_filter_by(*conditions, **filter), Service)
+        return facet.response(await self.service_repository.get_rows(query))
+
+    async def get_one_service_filter_by(self, **filter):
+        return await self.service_repository.get_one_filter_by(**filter)
+
+    async def get_services_by_ids(self, ids, **filter):
+        return await self.service_repository.get_all_by_ids(ids, **filter)
 
-    def create_service(self, data: CreateService):
-        return self.service_repository.add(data.model_dump())
+    async def create_service(self, data: CreateService):
+        return await self.service_repository.add(data.model_dump())
 
-    def update_service(self, id: int, upd_service: UpdateService):
+    async def update_service(self, id: int, upd_service: UpdateService):
         entity = upd_service.model_dump()
         entity['id'] = id
         entity = {k: v for k, v in entity.items() if v is not None}
-        return self.service_repository.update(entity)
+        await self.invalidate_cards(ServiceCard.id == id)
+        return await self.service_repository.update(entity)
 
-    def delete_service(self, id: int):
-        return self.service_repository.delete(id)
\ No newline at end of file
+    async def delete_service(self, id: int):
+        if self.card_repository:
+            await self.card_repository.remove(id)
+        return await self.service_repository.delete(id)
\ No newline at end of file
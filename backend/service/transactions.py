@@ -1,16 +1,40 @@
 from schemas.transactions import *
 from crud.transactions import *
+from models.orders import Transaction
+from config.export import EXPORT_YIELD_PER
 
 class TransactionService:
-    def __init__(self, transaction_repository: TransactionRepository):
+    def __init__(self, transaction_repository: AsyncTransactionRepository):
         self.transaction_repository = transaction_repository
 
-    def get_all_transactions_filter_by(self, **filter):
-        return self.transaction_repository.get_all_filter_by(**filter)
+    async def get_all_transactions_filter_by(self, **filter):
+        return await self.transaction_repository.get_all_filter_by(**filter)
 
-    def get_one_transaction_filter_by(self, **filter):
-        return self.transaction_repository.get_one_filter_by(**filter)
+    async def get_transactions_page(self, limit: int, cursor: str | None = None,
+                                    order_by=(), conditions=(), **filter):
+        return await self.transaction_repository.get_page(limit, cursor, order_by=order_by, conditions=conditions, **filter)
 
-    def create_transaction(self, new_transaction: dict):
-        return self.transaction_repository.add(new_transaction)
+    def get_user_transactions_filter_by(self, id_user: int, *conditions, **filter):
+        return self.transaction_repository.select_filter_by(*conditions, **filter).where(
+            (Transaction.id_user_sender == id_user) | (Transaction.id_user_recipient == id_user)
+        )
 
+    async def get_user_transactions_page(self, id_user: int, limit: int, cursor: str | None = None,
+                                         order_by=(), conditions=(), **filter):
+        query = self.get_user_transactions_filter_by(id_user, *conditions, **filter)
+        return await self.transaction_repository.get_page(limit, cursor, query=query, order_by=order_by)
+
+    # Admins export everything (id_user=None), other users their own transactions.
+    def export_transactions(self, id_user: int | None, conditions=(), **filter):
+        if id_user is None:
+            query = self.transaction_repository.select_filter_by(*conditions, **filter)
+        else:
+            query = self.get_user_transactions_filter_by(id_user, *conditions, **filter)
+        query = self.transaction_repository.select_export(query)
+        return self.transaction_repository.EXPORT_COLUMNS, self.transaction_repository.stream_rows(query, EXPORT_YIELD_PER)
+
+    async def get_one_transaction_filter_by(self, **filter):
+        return await self.transaction_repository.get_one_filter_by(**filter)
+
+    async def create_transaction(self, new_transaction: dict):
+        return await self.transaction_repository.add(new_transaction)
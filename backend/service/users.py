@@ -1,77 +1,153 @@
 from utils.enums import Roles, AuthStatus
 from fastapi import HTTPException
-from passlib.hash import pbkdf2_sha256
+from utils.passwords import hash_password, verify_password
 from schemas.users import *
-from crud.users import UserRepository
+from crud.users import AsyncUserRepository
+from crud.services import AsyncServiceCardRepository
+from models.services import ServiceCard
+from utils.cache import user_cache
+from utils.pagination import keyset_condition, split_page
+from utils.search import require_match, fts_hits
+from models.users import executors_fts
+from utils.facets import Facet
 
 class UserService:
-    def __init__(self, user_repository: UserRepository,
-                 executor_repository: UserRepository,
-                 customer_repository: UserRepository):
+    def __init__(self, user_repository: AsyncUserRepository,
+                 executor_repository: AsyncUserRepository,
+                 customer_repository: AsyncUserRepository,
+                 card_repository: AsyncServiceCardRepository = None):
         self.user_repository = user_repository
         self.executor_repository = executor_repository
         self.customer_repository = customer_repository
+        self.card_repository = card_repository
 
-    def get_all_users_filter_by(self, **filter):
-        users = self.user_repository.get_all_filter_by(**filter)
+    # Service cards embed the executor, so every executor write invalidates
+    # them first and commits the invalidation with itself.
+    async def invalidate_cards(self, id_user: int):
+        if self.card_repository:
+            await self.card_repository.invalidate(ServiceCard.id_user_executor == id_user)
+
+    async def get_all_users_filter_by(self, **filter):
+        users = await self.user_repository.get_all_filter_by(**filter)
         return users
 
-    def get_user_filter_by(self, **filter):
-        user = self.user_repository.get_one_filter_by(**filter)
+    async def get_users_page(self, limit: int, cursor: str | None = None,
+                             order_by=(), conditions=(), **filter):
+        return await self.user_repository.get_page(limit, cursor, order_by=order_by, conditions=conditions, **filter)
+
+    async def get_user_filter_by(self, **filter):
+        user = await self.user_repository.get_one_filter_by(**filter)
         return user
 
-    def update(self, user_id: int, data: UserUpdate):
+    async def get_users_by_ids(self, ids, **filter):
+        return await self.user_repository.get_all_by_ids(ids, **filter)
+
+    async def update(self, user_id: int, data: UserUpdate):
         entity = data.model_dump()
-        user = self.user_repository.get_one_filter_by(id=user_id)
-        if data.password and not pbkdf2_sha256.verify(data.password, user.password):
+        user = await self.user_repository.get_one_filter_by(id=user_id)
+        if data.password and not await verify_password(data.password, user.password):
             raise HTTPException(status_code=403, detail={'status': AuthStatus.INVALID_PASSWORD.value})
         if data.password:
-            entity['password'] = pbkdf2_sha256.hash(data.password)
+            entity['password'] = await hash_password(data.password)
         entity['id'] = user_id
         entity = {k: v for k, v in entity.items() if v is not None}
-        upd_user = self.user_repository.update(entity)
+        balance = entity.pop('balance', None)
+        await self.invalidate_cards(user_id)
+        upd_user = await self.user_repository.update(entity)
+        if balance is not None:
+            await self.user_repository.set_balance(user_id, balance)
+            upd_user['balance'] = balance
+        user_cache.invalidate(user_id)
         return upd_user
 
-    def delete_user(self, user_id: int):
-        return self.user_repository.delete(user_id)
+    async def delete_user(self, user_id: int):
+        await self.invalidate_cards(user_id)
+        result = await self.user_repository.delete(user_id)
+        user_cache.invalidate(user_id)
+        return result
     
-    def update_image(self, id: int, image_name: str):
+    async def update_image(self, id: int, image_name: str):
         entity = {'id': id, 'image': image_name}
-        return self.user_repository.update(entity)
+        await self.invalidate_cards(id)
+        result = await self.user_repository.update(entity)
+        user_cache.invalidate(id)
+        return result
     
 
     # Executor
-    def get_all_executors_filter_by(self, **filter):
-        return self.executor_repository.get_all_filter_by(**filter)
+    async def get_all_executors_filter_by(self, **filter):
+        return await self.executor_repository.get_all_filter_by(**filter)
+
+    def executor_filter_condition(self, *conditions, **filter):
+        user_model = self.user_repository.model
+        executor_model = self.executor_repository.model
+        executor_ids = self.executor_repository.select_filter_by(*conditions, **filter).with_only_columns(executor_model.id)
+        return (user_model.role != Roles.EXECUTOR.value) | user_model.id_executor_profile.in_(executor_ids)
+
+    def search_executors(self, query: str, limit: int, cursor: str | None = None, conditions=(), **filter):
+        user_model = self.user_repository.model
+        hits = fts_hits(executors_fts, require_match(query))
+        columns = [hits.c.rank, user_model.id]
+        page = self.user_repository.select_filter_by(*conditions, **filter).join(
+            hits, hits.c.id == user_model.id_executor_profile
+        ).with_only_columns(user_model.id, hits.c.rank)
+        if cursor:
+            page = page.where(keyset_condition(columns, cursor))
+        return page.order_by(*columns).limit(limit + 1)
 
-    def get_executor_filter_by(self, **filter):
-        return self.executor_repository.get_one_filter_by(**filter)
+    async def search_executors_page(self, query: str, limit: int, cursor: str | None = None,
+                                    conditions=(), **filter):
+        hits, next_cursor = split_page(
+            await self.user_repository.get_rows(self.search_executors(query, limit, cursor, conditions, **filter)),
+            limit, ('rank', 'id')
+        )
+        users = await self.user_repository.get_all_by_ids([hit.id for hit in hits])
+        return [users[hit.id] for hit in hits if hit.id in users], next_cursor
 
-    def create_executor(self, data: dict):
-        return self.executor_repository.add(data)
+    async def get_executors_facet(self, facet: Facet, conditions=(), executor_conditions=(), **executor_filter):
+        user_model = self.user_repository.model
+        executor_model = self.executor_repository.model
+        query = self.user_repository.select_filter_by(*conditions, role=Roles.EXECUTOR.value).join(
+            executor_model, executor_model.id == user_model.id_executor_profile
+        ).where(*executor_conditions, *(getattr(executor_model, k) == v for k, v in executor_filter.items()))
+        return facet.response(await self.user_repository.get_rows(facet.select(query, executor_model)))
 
-    def update_executor(self, id: int, data: dict):
+    async def get_executor_filter_by(self, **filter):
+        return await self.executor_repository.get_one_filter_by(**filter)
+
+    async def get_executors_by_ids(self, ids, **filter):
+        return await self.executor_repository.get_all_by_ids(ids, **filter)
+
+    async def create_executor(self, data: dict):
+        return await self.executor_repository.add(data)
+
+    async def update_executor(self, id: int, data: dict):
         data['id'] = id
         data = {k: v for k, v in data.items() if v is not None}
-        return self.executor_repository.update(data)
+        if self.card_repository:
+            await self.card_repository.invalidate_by_executor_profile(id)
+        return await self.executor_repository.update(data)
 
-    def delete_executor(self, id: int):
-        return self.executor_repository.delete(id)
+    async def delete_executor(self, id: int):
+        return await self.executor_repository.delete(id)
 
     # Customer
-    def get_all_customers_filter_by(self, **filter):
-        return self.customer_repository.get_all_filter_by(**filter)
+    async def get_all_customers_filter_by(self, **filter):
+        return await self.customer_repository.get_all_filter_by(**filter)
+
+    async def get_customer_filter_by(self, **filter):
+        return await self.customer_repository.get_one_filter_by(**filter)
 
-    def get_customer_filter_by(self, **filter):
-        return self.customer_repository.get_one_filter_by(**filter)
+    async def get_customers_by_ids(self, ids, **filter):
+        return await self.customer_repository.get_all_by_ids(ids, **filter)
 
-    def create_customer(self, data: dict):
-        return self.customer_repository.add(data)
+    async def create_customer(self, data: dict):
+        return await self.customer_repository.add(data)
 
-    def update_customer(self, id: int, data: dict):
+    async def update_customer(self, id: int, data: dict):
         data['id'] = id
         data = {k: v for k, v in data.items() if v is not None}
-        return self.customer_repository.update(data)
+        return await self.customer_repository.update(data)
 
-    def delete_customer(self, id: int):
-        return self.customer_repository.delete(id)
\ No newline at end of file
+    async def delete_customer(self, id: int):
+        return await self.customer_repository.delete(id)
\ No newline at end of file
@@ -0,0 +1,28 @@
+import asyncio
+import orjson
+from utils.broker import UnixSocketBroker
+
+# A peer that counts the streams opened to it and records every frame.
+async def listen(path: str, connections: list, frames: list):
+    async def handle(reader, writer):
+        connections.append(writer)
+        async for line in reader:
+            frames.append(orjson.loads(line))
+    return await asyncio.start_unix_server(handle, path=path)
+
+def test_concurrent_sends_share_one_connection_in_order(tmp_path):
+    async def run():
+        peer = str(tmp_path / '1.sock')
+        connections, frames = [], []
+        server = await listen(peer, connections, frames)
+        broker = UnixSocketBroker(str(tmp_path))
+        await asyncio.gather(*(broker.send(peer, {'op': 'msg', 'n': n}) for n in range(100)))
+        await asyncio.sleep(0.1)
+        for writer in broker.writers.values():
+            writer.close()
+        server.close()
+        return connections, frames
+
+    connections, frames = asyncio.run(run())
+    assert len(connections) == 1
+    assert [frame['n'] for frame in frames] == list(range(100))
@@ -0,0 +1,55 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from config.database import Base
+from models import Conversation, Message
+from crud.messages import AsyncMessageRepository
+
+def message(sender: int, recipient: int, minutes: int, id_order: int | None = None) -> dict:
+    return {'id_user_sender': sender, 'id_user_recipient': recipient, 'id_order': id_order,
+            'message': f'{sender}->{recipient}', 'created_at': datetime(2026, 1, 1) + timedelta(minutes=minutes)}
+
+async def database(path):
+    engine = create_async_engine(f'sqlite+aiosqlite:///{path}', connect_args={'timeout': 30})
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+def test_concurrent_batches_share_one_conversation(tmp_path):
+    async def run():
+        engine, sessions = await database(tmp_path / 'chat.db')
+
+        async def write(batch):
+            async with sessions() as session:
+                return await AsyncMessageRepository(model=Message, session=session).add_all(batch)
+
+        first = [message(1, 2, 0), message(2, 1, 1), message(1, 2, 2)]
+        second = [message(2, 1, 3), message(2, 1, 4)]
+        _, written = await asyncio.gather(write(first), write(second))
+        async with sessions() as session:
+            conversations = (await session.scalars(select(Conversation))).all()
+        await engine.dispose()
+        return conversations, written
+
+    conversations, written = asyncio.run(run())
+    assert len(conversations) == 1
+    conversation = conversations[0]
+    assert (conversation.unread_low, conversation.unread_high) == (3, 2)
+    assert conversation.id_last_message == written[-1].id
+
+def test_conversation_key_is_unique_without_order(tmp_path):
+    async def run():
+        engine, sessions = await database(tmp_path / 'chat.db')
+        row = {'id_user_low': 1, 'id_user_high': 2, 'id_order': None, 'id_last_message': 1,
+               'last_activity_at': datetime(2026, 1, 1), 'unread_low': 0, 'unread_high': 0}
+        try:
+            async with sessions() as session:
+                await session.execute(insert(Conversation), [row, row])
+        finally:
+            await engine.dispose()
+
+    with pytest.raises(IntegrityError):
+        asyncio.run(run())
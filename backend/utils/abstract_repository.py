@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.pagination import keyset_condition, keyset_ordering, split_page
 
 class AbstractRepository(ABC):
     @abstractmethod
@@ -26,42 +28,86 @@ class AbstractRepository(ABC):
     def delete_by_filter(self, **filter):
         pass
 
-class IREpository(AbstractRepository):
-    def __init__(self, model, session: Session):
+class AsyncIREpository(AbstractRepository):
+    IN_CHUNK_SIZE = 500
+    KEYSET = ('id',)
+
+    def __init__(self, model, session: AsyncSession):
         self.model = model
         self.session = session
 
-    def get_all_filter_by(self, **filters):
-        query = self.session.query(self.model)
+    def select_filter_by(self, *conditions, **filters):
+        query = select(self.model).where(*conditions)
         for key, value in filters.items():
-            query = query.filter(getattr(self.model, key) == value)
+            query = query.where(getattr(self.model, key) == value)
         return query
 
-    def get_one_filter_by(self, **filter):
-        return self.session.query(self.model).filter_by(**filter).first()
+    async def get_all_filter_by(self, query=None, **filters):
+        if query is None:
+            query = self.select_filter_by(**filters)
+        return (await self.session.scalars(query)).all()
+
+    async def get_one_filter_by(self, **filter):
+        query = select(self.model).filter_by(**filter).limit(1)
+        return (await self.session.scalars(query)).first()
+
+    async def get_rows(self, query):
+        return (await self.session.execute(query)).all()
+
+    # Server-side iteration: yields one list of rows per fetch of yield_per rows.
+    async def stream_rows(self, query, yield_per: int):
+        result = await self.session.stream(query.execution_options(yield_per=yield_per))
+        async for rows in result.partitions():
+            yield rows
 
-    def add(self, entity: dict):
+    async def get_all_by_ids(self, ids, **filters):
+        ids = list({id for id in ids if id is not None})
+        entities = {}
+        for start in range(0, len(ids), self.IN_CHUNK_SIZE):
+            chunk = ids[start:start + self.IN_CHUNK_SIZE]
+            query = self.select_filter_by(**filters).where(self.model.id.in_(chunk))
+            entities.update({entity.id: entity for entity in await self.get_all_filter_by(query)})
+        return entities
+
+    def select_page(self, limit: int, cursor: str | None = None, query=None, order_by=(), conditions=(), **filters):
+        if query is None:
+            query = self.select_filter_by(*conditions, **filters)
+        ordering = keyset_ordering(self.KEYSET, order_by)
+        keys = [key for key, _ in ordering]
+        columns = [getattr(self.model, key) for key in keys]
+        descending = [desc for _, desc in ordering]
+        if cursor:
+            query = query.where(keyset_condition(columns, cursor, descending))
+        sort = [column.desc() if desc else column for column, desc in zip(columns, descending)]
+        return query.order_by(None).order_by(*sort).limit(limit + 1), keys
+
+    async def get_page(self, limit: int, cursor: str | None = None, query=None, order_by=(), conditions=(), **filters):
+        query, keys = self.select_page(limit, cursor, query, order_by, conditions, **filters)
+        rows = await self.get_all_filter_by(query)
+        return split_page(list(rows), limit, keys)
+
+    async def add(self, entity: dict):
         entity = self.model(**entity)
         self.session.add(entity)
-        self.session.commit()
-        self.session.refresh(entity)
+        await self.session.commit()
+        await self.session.refresh(entity)
         return entity
 
-    def update(self, entity: dict):
-        self.session.query(self.model).filter_by(id=entity['id']).update(entity)
-        self.session.commit()
+    async def update(self, entity: dict):
+        await self.session.execute(update(self.model).filter_by(id=entity['id']).values(entity))
+        await self.session.commit()
         return entity
 
-    def delete(self, id: int):
-        self.session.query(self.model).filter_by(id=id).delete()
-        self.session.commit()
+    async def delete(self, id: int):
+        await self.session.execute(delete(self.model).filter_by(id=id))
+        await self.session.commit()
 
-    def update_by_filter(self, filters: dict, updates: dict):
-        result = self.session.query(self.model).filter_by(**filters).update(updates)
-        self.session.commit()
-        return result
+    async def update_by_filter(self, filters: dict, updates: dict):
+        result = await self.session.execute(update(self.model).filter_by(**filters).values(updates))
+        await self.session.commit()
+        return result.rowcount
 
-    def delete_by_filter(self, **filter):
-        result = self.session.query(self.model).filter_by(**filter).delete()
-        self.session.commit()
-        return result > 0
\ No newline at end of file
+    async def delete_by_filter(self, **filter):
+        result = await self.session.execute(delete(self.model).filter_by(**filter))
+        await self.session.commit()
+        return result.rowcount > 0
@@ -0,0 +1,230 @@
+import asyncio
+import os
+import orjson
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Callable
+from config.chat import WS_BROKER, WS_BROKER_PATH, WS_BROKER_URL
+
+# Fan-out between workers: the ConnectionManager subscribes the users connected
+# to this process and publishes every chat frame; the broker calls deliver()
+# in whichever process holds the recipient's sockets.
+class Broker(ABC):
+    def __init__(self):
+        self.deliver: Callable[[list, dict], None] = lambda user_ids, message: None
+        self.local_users = set()
+
+    async def start(self, deliver: Callable[[list, dict], None]):
+        self.deliver = deliver
+
+    async def stop(self):
+        pass
+
+    def subscribe(self, user_id: int):
+        self.local_users.add(user_id)
+
+    def unsubscribe(self, user_id: int):
+        self.local_users.discard(user_id)
+
+    @abstractmethod
+    async def publish(self, user_ids: list, message: dict):
+        pass
+
+class MemoryBroker(Broker):
+    async def publish(self, user_ids: list, message: dict):
+        self.deliver(user_ids, message)
+
+class UnixSocketBroker(Broker):
+    # Every worker listens on a Unix socket in a shared directory. Workers tell
+    # each other which users they hold, so a frame is sent only to the
+    # workers that have one of its recipients.
+    def __init__(self, path: str):
+        super().__init__()
+        self.directory = path
+        self.path = os.path.join(path, f'{os.getpid()}.sock')
+        self.routes = defaultdict(set)
+        self.writers = {}
+        # One lock per peer, held from connecting through the write, so
+        # there is a single stream per peer and frames keep their send order.
+        self.locks = defaultdict(asyncio.Lock)
+        self.readers = {}
+        self.server = None
+
+    async def start(self, deliver):
+        await super().start(deliver)
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = await asyncio.start_unix_server(self.handle, path=self.path)
+        for peer in self.peers():
+            await self.send(peer, {'op': 'hello', 'from': self.path, 'users': list(self.local_users)})
+
+    async def stop(self):
+        for peer in list(self.writers):
+            await self.send(peer, {'op': 'sync', 'from': self.path, 'users': []})
+            writer = self.writers.pop(peer, None)
+            if writer:
+                writer.close()
+        if self.server:
+            self.server.close()
+            self.server = None
+        for writer in list(self.readers):
+            writer.close()
+        await asyncio.gather(*self.readers.values(), return_exceptions=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def peers(self) -> list:
+        return [
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.endswith('.sock') and os.path.join(self.directory, name) != self.path
+        ]
+
+    async def send(self, peer: str, data: dict):
+        try:
+            async with self.locks[peer]:
+                writer = self.writers.get(peer)
+                if writer is None:
+                    _, writer = await asyncio.open_unix_connection(peer)
+                    self.writers[peer] = writer
+                writer.write(orjson.dumps(data) + b'\n')
+            await writer.drain()
+        except (ConnectionError, OSError):
+            self.forget(peer)
+            if not self.alive(peer) and os.path.exists(peer):
+                # A worker that died without cleaning up its socket.
+                os.unlink(peer)
+
+    def alive(self, peer: str) -> bool:
+        try:
+            os.kill(int(os.path.basename(peer).split('.')[0]), 0)
+        except ProcessLookupError:
+            return False
+        except (ValueError, PermissionError):
+            pass
+        return True
+
+    def forget(self, peer: str):
+        writer = self.writers.pop(peer, None)
+        if writer:
+            writer.close()
+        for user_id in list(self.routes):
+            self.routes[user_id].discard(peer)
+            if not self.routes[user_id]:
+                del self.routes[user_id]
+
+    async def announce(self, op: str, user_id: int):
+        for peer in self.peers():
+            await self.send(peer, {'op': op, 'from': self.path, 'users': [user_id]})
+
+    def subscribe(self, user_id: int):
+        if user_id not in self.local_users:
+            super().subscribe(user_id)
+            if self.server:
+                asyncio.create_task(self.announce('sub', user_id))
+
+    def unsubscribe(self, user_id: int):
+        if user_id in self.local_users:
+            super().unsubscribe(user_id)
+            if self.server:
+                asyncio.create_task(self.announce('unsub', user_id))
+
+    async def publish(self, user_ids: list, message: dict):
+        local = [user_id for user_id in user_ids if user_id in self.local_users]
+        if local:
+            self.deliver(local, message)
+        remote = defaultdict(list)
+        for user_id in user_ids:
+            for peer in self.routes.get(user_id, ()):
+                remote[peer].append(user_id)
+        for peer, users in remote.items():
+            await self.send(peer, {'op': 'msg', 'users': users, 'message': message})
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.readers[writer] = asyncio.current_task()
+        try:
+            async for line in reader:
+                await self.received(orjson.loads(line))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.readers.pop(writer, None)
+            writer.close()
+
+    async def received(self, data: dict):
+        op = data['op']
+        if op == 'msg':
+            self.deliver(data['users'], data['message'])
+        elif op == 'hello':
+            self.routes_from(data['from'], data['users'])
+            await self.send(data['from'], {'op': 'sync', 'from': self.path, 'users': list(self.local_users)})
+        elif op == 'sync':
+            self.routes_from(data['from'], data['users'])
+        elif op == 'sub':
+            for user_id in data['users']:
+                self.routes[user_id].add(data['from'])
+        elif op == 'unsub':
+            for user_id in data['users']:
+                self.routes[user_id].discard(data['from'])
+
+    def routes_from(self, peer: str, users: list):
+        for user_id in list(self.routes):
+            self.routes[user_id].discard(peer)
+        for user_id in users:
+            self.routes[user_id].add(peer)
+
+class RedisBroker(Broker):
+    # One channel per user; Redis only forwards to workers subscribed to it.
+    def __init__(self, url: str, prefix: str = 'ws:'):
+        super().__init__()
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError('WS_BROKER=redis requires the redis package')
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+        self.pubsub = None
+        self.task = None
+
+    async def start(self, deliver):
+        await super().start(deliver)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        # redis-py cannot listen before the first subscription.
+        await self.pubsub.subscribe(f'{self.prefix}_')
+        self.task = asyncio.create_task(self.listen())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+        if self.pubsub:
+            await self.pubsub.aclose()
+        await self.client.aclose()
+
+    async def listen(self):
+        async for item in self.pubsub.listen():
+            user_id = int(item['channel'].decode()[len(self.prefix):])
+            self.deliver([user_id], orjson.loads(item['data']))
+
+    def subscribe(self, user_id: int):
+        if user_id not in self.local_users and self.pubsub:
+            asyncio.create_task(self.pubsub.subscribe(f'{self.prefix}{user_id}'))
+        super().subscribe(user_id)
+
+    def unsubscribe(self, user_id: int):
+        if user_id in self.local_users and self.pubsub:
+            asyncio.create_task(self.pubsub.unsubscribe(f'{self.prefix}{user_id}'))
+        super().unsubscribe(user_id)
+
+    async def publish(self, user_ids: list, message: dict):
+        data = orjson.dumps(message)
+        for user_id in set(user_ids):
+            await self.client.publish(f'{self.prefix}{user_id}', data)
+
+def create_broker(kind: str = WS_BROKER) -> Broker:
+    if kind == 'memory':
+        return MemoryBroker()
+    if kind == 'unix':
+        return UnixSocketBroker(WS_BROKER_PATH)
+    if kind == 'redis':
+        return RedisBroker(WS_BROKER_URL)
+    raise ValueError(f'Unknown websocket broker: {kind}')
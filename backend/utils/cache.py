@@ -0,0 +1,99 @@
+import asyncio
+import time
+from collections import OrderedDict
+from config.auth import USER_CACHE_SIZE, USER_CACHE_TTL
+from config.catalog import SPECIALIZATION_CACHE_TTL
+from config.idempotency import IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_CACHE_TTL
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        item = self.data.get(key)
+        if item is None or item[1] < time.monotonic():
+            if item is not None:
+                del self.data[key]
+            self.misses += 1
+            return None
+        self.data.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def set(self, key, value):
+        self.data[key] = (value, time.monotonic() + self.ttl)
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def invalidate(self, key):
+        self.data.pop(key, None)
+
+    def clear(self):
+        self.data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'size': len(self.data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+# Whole-table cache for small, rarely changing tables. The table is loaded on
+# the first miss, dropped on every local write and reloaded after ttl, which
+# is how writes made by other workers are picked up.
+class TableCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.data: dict | None = None
+        self.expires = 0.0
+        self.version = 0
+        self.lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fresh(self) -> bool:
+        return self.data is not None and self.expires > time.monotonic()
+
+    async def get(self, loader) -> dict:
+        if self.fresh():
+            self.hits += 1
+            return self.data
+        async with self.lock:
+            if self.fresh():
+                self.hits += 1
+                return self.data
+            self.misses += 1
+            version = self.version
+            data = await loader()
+            # A write that landed while loading makes this snapshot stale.
+            if version == self.version:
+                self.data = data
+                self.expires = time.monotonic() + self.ttl
+            return data
+
+    def invalidate(self):
+        self.version += 1
+        self.data = None
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'size': len(self.data) if self.data is not None else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+specialization_cache = TableCache(ttl=SPECIALIZATION_CACHE_TTL)
+idempotency_cache = TTLCache(maxsize=IDEMPOTENCY_CACHE_SIZE, ttl=IDEMPOTENCY_CACHE_TTL)
@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from fastapi.responses import StreamingResponse
+
+MEDIA_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+async def csv_chunks(columns: list, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+
+async def ndjson_chunks(columns: list, batches):
+    async for rows in batches:
+        yield ''.join(
+            json.dumps(dict(zip(columns, row)), default=json_default, ensure_ascii=False) + '\n'
+            for row in rows
+        )
+
+# batches yields lists of rows in column order, one list per database fetch.
+def export_response(columns: list, batches, format: str, filename: str) -> StreamingResponse:
+    chunks = csv_chunks(columns, batches) if format == 'csv' else ndjson_chunks(columns, batches)
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[format],
+                             headers={'Content-Disposition': f'attachment; filename="{filename}.{format}"'})
@@ -0,0 +1,37 @@
+from sqlalchemy import case, func
+from schemas.facets import FacetValue, FacetRange
+
+# A facet is one GROUP BY over the filtered rows: either the column itself or
+# the lower bound of the range bucket its value falls into.
+class Facet:
+    def __init__(self, field: str, bounds: list | None = None):
+        self.field = field
+        self.bounds = bounds
+
+    def key(self, model):
+        column = getattr(model, self.field)
+        if not self.bounds:
+            return column
+        return case(
+            (column.is_(None), None),
+            *((column < upper, lower) for lower, upper in zip(self.bounds, self.bounds[1:])),
+            else_=self.bounds[-1]
+        )
+
+    def select(self, query, model):
+        key = self.key(model)
+        return query.with_only_columns(key, func.count()).group_by(key)
+
+    def response(self, rows) -> list:
+        counts = dict(rows)
+        if not self.bounds:
+            return [FacetValue(value=value, count=count) for value, count in counts.items()]
+        uppers = self.bounds[1:] + [None]
+        # Rows with no value have nowhere to go in a range facet.
+        return [FacetRange(min=lower, max=upper, count=counts.get(lower, 0))
+                for lower, upper in zip(self.bounds, uppers)]
+
+def exclude_field(params, field: str) -> dict:
+    # A facet is counted without its own filter, so the panel still shows the
+    # alternatives to the value that is currently selected.
+    return {k: v for k, v in params.items() if k != field and not k.startswith(f'{field}__')}
@@ -0,0 +1,79 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from fastapi import HTTPException
+from utils.enums import Status
+
+OPERATORS = {
+    'eq': lambda column, value: column == value,
+    'ne': lambda column, value: column != value,
+    'gt': lambda column, value: column > value,
+    'gte': lambda column, value: column >= value,
+    'lt': lambda column, value: column < value,
+    'lte': lambda column, value: column <= value,
+    'in': lambda column, value: column.in_(value),
+    'ilike': lambda column, value: column.ilike(f'%{escape_like(value)}%', escape='\\'),
+}
+
+COMPARISON = {'eq', 'ne', 'gt', 'gte', 'lt', 'lte'}
+NUMBER = COMPARISON | {'in'}
+TEXT = {'eq', 'ne', 'in', 'ilike'}
+CHOICE = {'eq', 'ne', 'in'}
+
+def escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def filter_error(message: str):
+    return HTTPException(status_code=400, detail={'status': Status.FAILED.value, 'message': message})
+
+class FilterSet:
+    def __init__(self, model, fields: dict, sortable: set = frozenset()):
+        self.model = model
+        self.fields = fields
+        self.sortable = sortable
+
+    def convert(self, field: str, value: str):
+        python_type = getattr(self.model, field).type.python_type
+        try:
+            if python_type is datetime:
+                return datetime.fromisoformat(value)
+            if python_type is Decimal:
+                return Decimal(value)
+            return python_type(value)
+        except (ValueError, InvalidOperation):
+            raise filter_error(f'Invalid value for {field}: {value}')
+
+    def compile(self, field: str, op: str, value: str):
+        if op not in self.fields[field]:
+            raise filter_error(f'Unsupported operator for {field}: {op}')
+        column = getattr(self.model, field)
+        if op == 'in':
+            value = [self.convert(field, v) for v in value.split(',') if v]
+        elif op != 'ilike':
+            value = self.convert(field, value)
+        return OPERATORS[op](column, value)
+
+    def parse_order_by(self, order_by: str | None) -> list:
+        ordering = []
+        for key in (order_by or '').split(','):
+            key = key.strip()
+            if not key:
+                continue
+            field = key.lstrip('-')
+            if field not in self.sortable:
+                raise filter_error(f'Unsupported order_by field: {field}')
+            ordering.append((field, key.startswith('-')))
+        return ordering
+
+def parse_filters(params, *filter_sets: FilterSet) -> list:
+    conditions = [[] for _ in filter_sets]
+    for key, value in params.items():
+        if '__' not in key:
+            continue
+        field, op = key.rsplit('__', 1)
+        for i, filter_set in enumerate(filter_sets):
+            if field in filter_set.fields:
+                conditions[i].append(filter_set.compile(field, op, value))
+                break
+        else:
+            raise filter_error(f'Unsupported filter: {key}')
+    return conditions
@@ -0,0 +1,79 @@
+import hashlib
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from config.http_cache import CACHE_CONTROL, DEFAULT_CACHE_CONTROL
+
+def make_etag(*parts: bytes) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part)
+    return f'"{digest.hexdigest()}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses the weak comparison.
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+def cache_control(path: str) -> str:
+    prefixes = [prefix for prefix in CACHE_CONTROL if path == prefix or path.startswith(f'{prefix}/')]
+    return CACHE_CONTROL[max(prefixes, key=len)] if prefixes else DEFAULT_CACHE_CONTROL
+
+def json_response(request, content: str | bytes, headers: dict | None = None) -> Response:
+    # For bodies that are already serialized: the ETag covers the body and the
+    # headers (X-Next-Cursor), and a match answers 304 without a body.
+    content = content.encode() if isinstance(content, str) else content
+    headers = dict(headers or {})
+    headers['ETag'] = make_etag(content, *(f'{k}:{v}'.encode() for k, v in sorted(headers.items())))
+    if etag_matches(request.headers.get('if-none-match'), headers['ETag']):
+        return Response(status_code=304, headers=headers)
+    return Response(content, media_type='application/json', headers=headers)
+
+# Adds Cache-Control to successful GET responses and a strong ETag to JSON
+# ones that do not carry their own, answering 304 when If-None-Match matches.
+# Streaming and non-JSON responses pass through untouched.
+class ConditionalGetMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            await self.app(scope, receive, send)
+            return
+        if_none_match = Headers(scope=scope).get('if-none-match')
+        policy = cache_control(scope['path'])
+        start = None
+        body = []
+
+        async def send_conditional(message):
+            nonlocal start
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(scope=message)
+                if message['status'] in (200, 304) and 'cache-control' not in headers:
+                    headers['Cache-Control'] = policy
+                if (message['status'] == 200 and 'etag' not in headers
+                        and headers.get('content-type', '').startswith('application/json')):
+                    start = message
+                    return
+                await send(message)
+                return
+            if start is None:
+                await send(message)
+                return
+            body.append(message.get('body', b''))
+            if message.get('more_body', False):
+                return
+            content = b''.join(body)
+            headers = MutableHeaders(scope=start)
+            headers['ETag'] = make_etag(content, headers.get('x-next-cursor', '').encode())
+            if etag_matches(if_none_match, headers['ETag']):
+                start['status'] = 304
+                del headers['content-length']
+                del headers['content-type']
+                content = b''
+            await send(start)
+            await send({'type': 'http.response.body', 'body': content})
+
+        await self.app(scope, receive, send_conditional)
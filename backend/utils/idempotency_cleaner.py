@@ -0,0 +1,42 @@
+import asyncio
+from config.database import AsyncSessionLocal
+from config.idempotency import IDEMPOTENCY_CLEANUP_INTERVAL
+from crud.idempotency import AsyncIdempotencyRepository
+from models.idempotency import IdempotencyKey
+from service.idempotency import IdempotencyService
+
+# Deletes expired idempotency keys, run by the app lifespan.
+class IdempotencyCleaner:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.task: asyncio.Task | None = None
+
+    def start(self):
+        if self.interval > 0 and (self.task is None or self.task.done()):
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def cleanup(self) -> int:
+        async with AsyncSessionLocal() as db:
+            service = IdempotencyService(AsyncIdempotencyRepository(model=IdempotencyKey, session=db))
+            return await service.delete_expired()
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.cleanup()
+            except Exception as e:
+                print(f"Idempotency key cleanup failed: {e}")
+
+
+idempotency_cleaner = IdempotencyCleaner(interval=IDEMPOTENCY_CLEANUP_INTERVAL)
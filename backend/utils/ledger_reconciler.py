@@ -0,0 +1,48 @@
+import asyncio
+from config.database import AsyncSessionLocal
+from config.ledger import LEDGER_SNAPSHOT_INTERVAL
+from crud.transactions import AsyncLedgerRepository
+from models.ledger import LedgerEntry
+from service.ledger import LedgerService
+
+# Periodic reconciliation and balance checkpoints, run by the app lifespan.
+class LedgerReconciler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.task: asyncio.Task | None = None
+        self.last_report: dict | None = None
+
+    def start(self):
+        if self.interval > 0 and (self.task is None or self.task.done()):
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def reconcile(self) -> dict:
+        async with AsyncSessionLocal() as db:
+            ledger_service = LedgerService(transaction_repository=None, user_repository=None, order_repository=None,
+                                           ledger_repository=AsyncLedgerRepository(model=LedgerEntry, session=db))
+            self.last_report = await ledger_service.reconcile()
+        for mismatch in self.last_report['mismatches']:
+            print(f"Ledger mismatch for user {mismatch['id_user']}: "
+                  f"stored {mismatch['stored']}, ledger {mismatch['derived']}")
+        return self.last_report
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                print(f"Ledger reconciliation failed: {e}")
+
+
+ledger_reconciler = LedgerReconciler(interval=LEDGER_SNAPSHOT_INTERVAL)
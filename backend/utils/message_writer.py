@@ -0,0 +1,117 @@
+import asyncio
+from config.chat import MESSAGE_FLUSH_SIZE, MESSAGE_FLUSH_INTERVAL
+from config.database import AsyncSessionLocal
+from crud.messages import AsyncMessageRepository
+from models.messages import Message
+
+KEY_COLUMNS = ('id_user_sender', 'id_user_recipient', 'id_order', 'message', 'created_at')
+
+# Write-behind queue for chat messages: callers await their own message while
+# a background task inserts whatever is queued as one batch with one commit.
+class MessageWriter:
+    def __init__(self, flush_size: int, flush_interval: float):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: asyncio.Task | None = None
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        await self.queue.put(None)
+        await self.task
+        self.task = None
+
+    async def write(self, entity: dict) -> Message:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((entity, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.flush_size:
+                if self.queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self.queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                await self.flush(batch)
+            except Exception as e:
+                # The writer outlives any single batch.
+                print(f"Message batch failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def flush(self, batch: list):
+        try:
+            async with AsyncSessionLocal() as db:
+                # Unordered RETURNING lets SQLite take the batch in a single INSERT.
+                repository = AsyncMessageRepository(model=Message, session=db)
+                messages = await repository.add_all([entity for entity, _ in batch])
+        except Exception:
+            # Nothing was committed: one bad row must not fail the rest of the batch.
+            for item in batch:
+                await self.flush_one(*item)
+            return
+        # The rows are committed, so from here a problem fails the affected
+        # callers and is never retried. Each item's token is its position in
+        # the batch: ids are assigned in VALUES order, so the n-th smallest id
+        # is the row of the n-th item.
+        messages = sorted(messages, key=lambda message: message.id)
+        if len(messages) != len(batch):
+            error = RuntimeError(f'Inserted {len(messages)} messages for a batch of {len(batch)}')
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (entity, future), message in zip(batch, messages):
+            if future.done():
+                continue
+            if self.key(entity) != self.key(message):
+                future.set_exception(RuntimeError(f'Inserted message {message.id} does not match the queued one'))
+            else:
+                future.set_result(message)
+
+    @staticmethod
+    def key(message) -> tuple:
+        if isinstance(message, dict):
+            return tuple(message.get(column) for column in KEY_COLUMNS)
+        return tuple(getattr(message, column) for column in KEY_COLUMNS)
+
+    async def flush_one(self, entity: dict, future: asyncio.Future):
+        try:
+            async with AsyncSessionLocal() as db:
+                repository = AsyncMessageRepository(model=Message, session=db)
+                message, = await repository.add_all([entity])
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(message)
+
+
+message_writer = MessageWriter(MESSAGE_FLUSH_SIZE, MESSAGE_FLUSH_INTERVAL)
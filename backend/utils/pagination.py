@@ -0,0 +1,48 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from fastapi import HTTPException, Response
+from sqlalchemy import or_, and_
+from config.pagination import NEXT_CURSOR_HEADER
+from utils.enums import Status
+
+def encode_cursor(values: list) -> str:
+    raw = [v.isoformat() if isinstance(v, datetime) else str(v) if isinstance(v, Decimal) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(raw).encode()).decode()
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(v) if column.type.python_type is datetime else column.type.python_type(v)
+            for v, column in zip(raw, columns)
+        ]
+    except (ValueError, TypeError, ArithmeticError, NotImplementedError):
+        raise HTTPException(status_code=400, detail={'status': Status.FAILED.value, 'message': 'Invalid cursor'})
+
+def keyset_condition(columns: list, cursor: str, descending: list | None = None):
+    values = decode_cursor(cursor, columns)
+    descending = descending or [False] * len(columns)
+    conditions = []
+    for i, column in enumerate(columns):
+        seek = column < values[i] if descending[i] else column > values[i]
+        conditions.append(and_(*(c == v for c, v in zip(columns[:i], values[:i])), seek))
+    return or_(*conditions)
+
+def keyset_ordering(keyset: tuple, order_by: list) -> list:
+    ordering = list(order_by)
+    ordering += [(key, False) for key in keyset if key not in {field for field, _ in order_by}]
+    return ordering
+
+def split_page(rows: list, limit: int, keyset: tuple):
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], key) for key in keyset])
+
+def set_next_cursor(response: Response, next_cursor: str | None):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,18 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from passlib.hash import pbkdf2_sha256
+from config.auth import PASSWORD_HASH_ROUNDS, PASSWORD_HASH_WORKERS
+
+# hashlib.pbkdf2_hmac releases the GIL, so a thread pool hashes in parallel
+# without blocking the event loop.
+hasher = pbkdf2_sha256.using(rounds=PASSWORD_HASH_ROUNDS)
+executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash')
+
+async def hash_password(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(executor, hasher.hash, password)
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(executor, hasher.verify, password, password_hash)
+
+def needs_rehash(password_hash: str) -> bool:
+    return hasher.needs_update(password_hash)
@@ -0,0 +1,103 @@
+# Runs EXPLAIN QUERY PLAN for the repository queries on hot paths and fails
+# when any of them falls back to a full table scan.
+#
+#   python -m utils.query_plan
+import sys
+from datetime import date
+from sqlalchemy import create_engine
+from config.database import Base
+from models import *
+from crud import *
+from service.message import MessageService, NEWEST_FIRST
+from service.transactions import TransactionService
+
+PAGE_SIZE = 100
+
+def hot_queries() -> dict:
+    users = AsyncUserRepository(model=User, session=None)
+    executors = AsyncUserRepository(model=ExecutorProfile, session=None)
+    services = AsyncServiceRepository(model=Service, session=None)
+    orders = AsyncOrderRepository(model=Order, session=None)
+    reviews = AsyncReviewRepository(model=Review, session=None)
+    transactions = AsyncTransactionRepository(model=Transaction, session=None)
+    messages = AsyncMessageRepository(model=Message, session=None)
+    conversations = AsyncConversationRepository(model=Conversation, session=None)
+    ledger = AsyncLedgerRepository(model=LedgerEntry, session=None)
+    idempotency = AsyncIdempotencyRepository(model=IdempotencyKey, session=None)
+    rollups = AsyncTransactionRollupRepository(model=TransactionRollup, session=None)
+    message_service = MessageService(message_repository=messages, conversation_repository=conversations)
+    transaction_service = TransactionService(transaction_repository=transactions)
+
+    return {
+        'users.by_ids': users.select_filter_by(User.id.in_([1, 2])),
+        'executor_profiles.by_specialization': executors.select_filter_by(id_specialization=1),
+        'services.by_specialization': services.select_page(PAGE_SIZE, id_specialization=1)[0],
+        'services.by_executor': services.select_page(PAGE_SIZE, id_user_executor=1)[0],
+        'orders.page': orders.select_page(PAGE_SIZE)[0],
+        'orders.by_customer': orders.select_page(PAGE_SIZE, id_user_customer=1)[0],
+        'orders.by_executor': orders.select_page(PAGE_SIZE, id_user_executor=1)[0],
+        'orders.by_service': orders.select_page(PAGE_SIZE, id_service=1)[0],
+        'orders.by_status': orders.select_page(PAGE_SIZE, status='PENDING')[0],
+        'orders.export': orders.select_export(orders.select_filter_by()),
+        'reviews.by_author': reviews.select_page(PAGE_SIZE, id_user_author=1)[0],
+        'reviews.by_target': reviews.select_page(PAGE_SIZE, id_user_target=1)[0],
+        'reviews.by_order': reviews.select_filter_by(id_order=1),
+        'transactions.page': transactions.select_page(PAGE_SIZE)[0],
+        'transactions.by_sender': transactions.select_page(PAGE_SIZE, id_user_sender=1)[0],
+        'transactions.by_recipient': transactions.select_page(PAGE_SIZE, id_user_recipient=1)[0],
+        'transactions.by_user': transactions.select_page(
+            PAGE_SIZE, query=transaction_service.get_user_transactions_filter_by(1))[0],
+        'transactions.export': transactions.select_export(transactions.select_filter_by()),
+        'transactions.export_by_user': transactions.select_export(
+            transaction_service.get_user_transactions_filter_by(1)),
+        'transactions.by_order': transactions.select_filter_by(id_order=1),
+        'messages.chat': messages.select_page(
+            PAGE_SIZE, query=message_service.get_chat_messages(id_user=1, id_recipient=2), order_by=NEWEST_FIRST)[0],
+        'messages.history': message_service.get_chat_history(1, 2, PAGE_SIZE)[0],
+        'messages.history_before': message_service.get_chat_history(1, 2, PAGE_SIZE, before=10)[0],
+        'messages.history_after': message_service.get_chat_history(1, 2, PAGE_SIZE, after=10)[0],
+        'messages.since': message_service.get_messages_since(1, 10, PAGE_SIZE),
+        'conversations.inbox': message_service.get_inbox(1, PAGE_SIZE),
+        'ledger.balance': ledger.select_balances(User.id == 1),
+        'ledger.reconcile_batch': ledger.select_balances(User.id > 1).order_by(User.id).limit(PAGE_SIZE),
+        'rollups.report': rollups.select_report(TransactionRollup.bucket >= date(2026, 1, 1)),
+        'rollups.summary': rollups.select_summary(TransactionRollup.bucket >= date(2026, 1, 1)),
+        'idempotency.by_key': idempotency.select_filter_by(id_user=1, key='retry-1'),
+        'conversations.by_users': conversations.select_filter_by(id_user_low=1, id_user_high=2, id_order=None),
+    }
+
+def explain(connection, query) -> list:
+    compiled = query.compile(dialect=connection.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.construct_params()
+    args = tuple(params[name] for name in compiled.positiontup)
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', args)
+    return [row[3] for row in rows]
+
+def full_scans(plan: list) -> list:
+    # Scanning a subquery already bounded by its own LIMIT is not a table scan.
+    subqueries = {step.split()[-1] for step in plan if step.startswith(('CO-ROUTINE ', 'MATERIALIZE '))}
+    return [step for step in plan
+            if step.startswith('SCAN ') and ' USING ' not in step and step.split()[1] not in subqueries]
+
+def check(engine) -> dict:
+    failures = {}
+    with engine.connect() as connection:
+        for name, query in hot_queries().items():
+            plan = explain(connection, query)
+            if full_scans(plan):
+                failures[name] = plan
+    return failures
+
+def main() -> int:
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    failures = check(engine)
+    for name, plan in failures.items():
+        print(f'{name}: full table scan')
+        for step in plan:
+            print(f'    {step}')
+    print(f'{len(hot_queries()) - len(failures)} ok, {len(failures)} full scans')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+from decimal import Decimal
+import numpy as np
+
+NO_SPECIALIZATION = 0
+CENT = Decimal('0.01')
+
+# First day of the report bucket a day falls into; weeks start on Monday.
+PERIODS = {
+    'day': lambda day: day,
+    'week': lambda day: day - timedelta(days=day.weekday()),
+    'month': lambda day: day.replace(day=1),
+}
+
+# Sums one batch of (day, type, id_specialization, amount_cents,
+# commission_cents) rows per key with NumPy: the three key columns are packed
+# into one integer, np.unique assigns every row its group and np.bincount adds
+# up the counts and amounts of each group.
+def aggregate(rows) -> dict:
+    if not rows:
+        return {}
+    days, types, specializations, amounts, commissions = zip(*rows)
+    days = np.array(days, dtype='datetime64[D]').astype(np.int64)
+    type_names, type_codes = np.unique(np.array(types), return_inverse=True)
+    specializations = np.array(specializations, dtype=np.int64)
+    first_day = days.min()
+    shape = (days.max() - first_day + 1, len(type_names), specializations.max() + 1)
+    keys = np.ravel_multi_index((days - first_day, type_codes.ravel(), specializations), shape)
+    groups, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(groups))
+    amount_sums = np.rint(np.bincount(inverse, weights=np.array(amounts, dtype=np.float64), minlength=len(groups)))
+    commission_sums = np.rint(np.bincount(inverse, weights=np.array(commissions, dtype=np.float64), minlength=len(groups)))
+    group_days, group_types, group_specializations = np.unravel_index(groups, shape)
+    group_days = (group_days + first_day).astype('datetime64[D]').astype(date)
+    return {
+        (day, str(type_names[type_code]), int(id_specialization)): [int(count), int(amount), int(commission)]
+        for day, type_code, id_specialization, count, amount, commission
+        in zip(group_days, group_types, group_specializations, counts, amount_sums, commission_sums)
+    }
+
+def merge(totals: dict, batch: dict) -> dict:
+    for key, (count, amount, commission) in batch.items():
+        total = totals.setdefault(key, [0, 0, 0])
+        total[0] += count
+        total[1] += amount
+        total[2] += commission
+    return totals
+
+def to_rows(totals: dict) -> list:
+    return [{
+        'bucket': bucket,
+        'type': type,
+        'id_specialization': id_specialization,
+        'count': count,
+        'amount': Decimal(amount) * CENT,
+        'commission': Decimal(commission) * CENT,
+    } for (bucket, type, id_specialization), (count, amount, commission) in totals.items()]
+
+# Folds daily report rows (dicts keyed by 'bucket' and the other group keys)
+# into period buckets, adding up the columns in sums, ordered by bucket and keys.
+def by_period(rows: list, period: str, sums) -> list:
+    bucket_of = PERIODS[period]
+    buckets = {}
+    for row in rows:
+        row['bucket'] = bucket_of(row['bucket'])
+        key = tuple(value for column, value in row.items() if column not in sums)
+        total = buckets.get(key)
+        if total is None:
+            buckets[key] = row
+        else:
+            for column in sums:
+                total[column] += row[column]
+    return [buckets[key] for key in sorted(buckets)]
@@ -0,0 +1,45 @@
+import html
+import re
+from fastapi import HTTPException
+from sqlalchemy import func, literal_column, select
+from utils.enums import Status
+
+# Snippet markers from the private use area: FTS5 wraps matches in them, and
+# they become <mark> only after the text itself has been HTML-escaped.
+MARK_START = ''
+MARK_END = ''
+SNIPPET_TOKENS = 16
+
+def match_expression(query: str, prefix: bool = True) -> str | None:
+    # User input never reaches the FTS5 query syntax: every word is quoted,
+    # and the last one is a prefix so results follow the user's typing.
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return None
+    phrases = [f'"{term}"' for term in terms]
+    if prefix:
+        phrases[-1] += '*'
+    return ' AND '.join(phrases)
+
+def require_match(query: str, prefix: bool = True) -> str:
+    expression = match_expression(query, prefix)
+    if expression is None:
+        raise HTTPException(status_code=400, detail={'status': Status.FAILED.value, 'message': 'Empty search query'})
+    return expression
+
+def column_match(column: str, expression: str) -> str:
+    return f'{column} : ({expression})'
+
+def fts_match(table: str, expression: str):
+    return literal_column(table).op('MATCH')(expression)
+
+def fts_hits(table, expression: str):
+    return select(table.c.rowid.label('id'), table.c.rank.label('rank')).where(
+        fts_match(table.name, expression)
+    ).subquery()
+
+def fts_snippet(table: str, column: int):
+    return func.snippet(literal_column(table), column, MARK_START, MARK_END, '…', SNIPPET_TOKENS)
+
+def render_snippet(snippet: str | None) -> str:
+    return html.escape(snippet or '').replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
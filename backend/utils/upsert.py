@@ -0,0 +1,13 @@
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+# INSERT ... ON CONFLICT DO UPDATE in the dialect of the session. updates gets
+# the row that could not be inserted (excluded, or VALUES() on MySQL, where
+# assignments see the columns already updated before them) and returns the SET.
+def upsert(dialect: str, model, rows: list, index_elements: list, updates):
+    if dialect == 'mysql':
+        query = mysql.insert(model).values(rows)
+        return query.on_duplicate_key_update(updates(query.inserted))
+    query = INSERTS[dialect](model).values(rows)
+    return query.on_conflict_do_update(index_elements=index_elements, set_=updates(query.excluded))
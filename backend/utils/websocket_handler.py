@@ -1,10 +1,51 @@
 # utils/websocket_handler.py
-import json
+import asyncio
 from datetime import datetime
-from config.database import SessionLocal
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect
+from config.chat import WS_RESUME_LIMIT, WS_AUTH_TIMEOUT
+from config.database import AsyncSessionLocal
+from crud.messages import AsyncMessageRepository
+from crud.users import AsyncUserRepository
 from models.messages import Message
 from models.users import User
-from utils.ws_manager import manager
+from service.auth import AuthService
+from service.message import MessageService
+from utils.message_writer import message_writer
+from utils.ws_manager import manager, Connection, Frame, decode_frame
+
+def message_frame(message: Message) -> dict:
+    return {
+        "id": message.id,
+        "type": "message",
+        "sender_id": message.id_user_sender,
+        "recipient_id": message.id_user_recipient,
+        "message": message.message,
+        "order_id": message.id_order,
+        "created_at": message.created_at.isoformat(),
+    }
+
+async def authenticate_websocket(websocket: WebSocket, user_id: int) -> bool:
+    # Browsers cannot set headers on a WebSocket, so the access token comes
+    # in the query string or as the first frame; it must belong to user_id.
+    token = websocket.query_params.get('token')
+    if token is None:
+        try:
+            data = decode_frame(await asyncio.wait_for(websocket.receive(), WS_AUTH_TIMEOUT))
+        except WebSocketDisconnect:
+            raise
+        except Exception:
+            return False
+        if not isinstance(data, dict) or data.get('type') != 'auth':
+            return False
+        token = data.get('token')
+    if not isinstance(token, str):
+        return False
+    async with AsyncSessionLocal() as db:
+        try:
+            user = await AuthService(user_repository=AsyncUserRepository(model=User, session=db)).get_user_by_token(token)
+        except HTTPException:
+            return False
+    return user.id == user_id
 
 async def process_websocket_message(
     user_id: int,
@@ -12,52 +53,38 @@ async def process_websocket_message(
     message_text: str,
     order_id: int = None
 ):
-    db = SessionLocal()
-    
     try:
-        new_message = Message(
-            id_user_sender=user_id,
-            id_user_recipient=recipient_id,
-            id_order=order_id,
-            message=message_text,
-            created_at=datetime.now()
-        )
-        
-        db.add(new_message)
-        db.commit()
-        db.refresh(new_message)
-        sender = db.query(User).filter(User.id == user_id).first()
-        recipient = db.query(User).filter(User.id == recipient_id).first()
-
-        message_data = {
-            "id": new_message.id,
-            "type": "message",
-            "sender_id": user_id,
-            "recipient_id": recipient_id,
+        new_message = await message_writer.write({
+            "id_user_sender": user_id,
+            "id_user_recipient": recipient_id,
+            "id_order": order_id,
             "message": message_text,
-            "order_id": order_id,
-            "created_at": new_message.created_at.isoformat(),
-            "sender": {
-                "id": sender.id if sender else None,
-                "name": sender.name if sender else "Unknown",
-                "email": sender.email if sender else ""
-            },
-            "recipient": {
-                "id": recipient.id if recipient else None,
-                "name": recipient.name if recipient else "Unknown",
-                "email": recipient.email if recipient else ""
-            }
-        }
-        
+            "created_at": datetime.now()
+        })
+
         await manager.broadcast_to_chat(
-            message=message_data,
+            message=message_frame(new_message),
             recipient_id=recipient_id,
-            sender_id=user_id,
-            order_id=order_id
+            sender_id=user_id
         )
-        
+
     except Exception as e:
         print(f"Error processing WebSocket message: {e}")
         raise
-    finally:
-        db.close()
\ No newline at end of file
+
+async def resume_websocket(connection: Connection, user_id: int, last_message_id: int):
+    # Replays what the client missed since its last seen message, at most
+    # WS_RESUME_LIMIT at a time; 'complete' tells it whether to ask again.
+    async with AsyncSessionLocal() as db:
+        message_service = MessageService(message_repository=AsyncMessageRepository(model=Message, session=db))
+        messages = await message_service.get_messages_since_page(user_id, last_message_id, WS_RESUME_LIMIT + 1)
+
+    complete = len(messages) <= WS_RESUME_LIMIT
+    messages = messages[:WS_RESUME_LIMIT]
+    for message in messages:
+        await connection.send(Frame(message_frame(message)))
+    await connection.send(Frame({
+        "type": "resumed",
+        "last_message_id": messages[-1].id if messages else last_message_id,
+        "complete": complete,
+    }))
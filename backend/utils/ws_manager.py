@@ -1,33 +1,206 @@
+import asyncio
+import time
 from typing import Dict, List
-from fastapi import WebSocket
+import msgpack
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect
+from config.chat import WS_QUEUE_SIZE, WS_OVERFLOW_POLICY, WS_HEARTBEAT_INTERVAL, WS_HEARTBEAT_TIMEOUT
+from utils.broker import Broker, create_broker
+
+OVERFLOW_POLICIES = {'drop', 'disconnect'}
+
+# Wire encodings, negotiated through Sec-WebSocket-Protocol; JSON text frames
+# unless the client offers 'msgpack'.
+ENCODERS = {
+    'json': lambda message: orjson.dumps(message).decode(),
+    'msgpack': lambda message: msgpack.packb(message),
+}
+
+def negotiate_encoding(subprotocols: list) -> str | None:
+    for subprotocol in subprotocols:
+        if subprotocol in ENCODERS:
+            return subprotocol
+    return None
+
+def decode_frame(message: dict) -> dict:
+    if message['type'] == 'websocket.disconnect':
+        raise WebSocketDisconnect(message.get('code', 1000), message.get('reason'))
+    if message.get('bytes') is not None:
+        return msgpack.unpackb(message['bytes'])
+    return orjson.loads(message['text'])
+
+# A message is serialized at most once per encoding, however many sockets it
+# is delivered to.
+class Frame:
+    __slots__ = ('message', 'encoded')
+
+    def __init__(self, message: dict):
+        self.message = message
+        self.encoded = {}
+
+    def encode(self, encoding: str):
+        data = self.encoded.get(encoding)
+        if data is None:
+            data = self.encoded[encoding] = ENCODERS[encoding](self.message)
+        return data
+
+# One outbound queue and writer task per socket, so a slow client only ever
+# delays its own frames.
+class Connection:
+    def __init__(self, user_id: int, websocket: WebSocket, queue_size: int, encoding: str = 'json'):
+        self.user_id = user_id
+        self.websocket = websocket
+        self.encoding = encoding
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: asyncio.Task | None = None
+        self.last_seen = time.monotonic()
+        # Set once the client answers a ping; only such clients are reaped
+        # for silence, the rest rely on the server's protocol-level pings.
+        self.heartbeat = False
+        self.lagging = False
+        self.sent = 0
+        self.dropped = 0
+        self.send_time = 0.0
+        self.max_send_time = 0.0
+
+    def enqueue(self, frame: Frame) -> bool:
+        try:
+            self.queue.put_nowait((time.perf_counter(), frame))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self.lagging = True
+            return False
+        return True
+
+    async def send(self, frame: Frame):
+        # Waits for room instead of overflowing; for bursts the server
+        # initiates itself, like replaying missed messages.
+        await self.queue.put((time.perf_counter(), frame))
+
+    def touch(self, heartbeat: bool = False):
+        self.last_seen = time.monotonic()
+        self.heartbeat = self.heartbeat or heartbeat
+
+    async def run(self, manager: 'ConnectionManager'):
+        try:
+            while True:
+                enqueued_at, frame = await self.queue.get()
+                data = frame.encode(self.encoding)
+                if isinstance(data, bytes):
+                    await self.websocket.send_bytes(data)
+                else:
+                    await self.websocket.send_text(data)
+                latency = time.perf_counter() - enqueued_at
+                self.sent += 1
+                self.send_time += latency
+                self.max_send_time = max(self.max_send_time, latency)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            manager.disconnect(self.user_id, self.websocket)
+
+    def stats(self) -> dict:
+        return {
+            'user_id': self.user_id,
+            'encoding': self.encoding,
+            'queue_depth': self.queue.qsize(),
+            'lagging': self.lagging,
+            'heartbeat': self.heartbeat,
+            'idle': time.monotonic() - self.last_seen,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'avg_send_latency': self.send_time / self.sent if self.sent else 0.0,
+            'max_send_latency': self.max_send_time,
+        }
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[int, List[WebSocket]] = {}
+    def __init__(self, queue_size: int = WS_QUEUE_SIZE, overflow_policy: str = WS_OVERFLOW_POLICY,
+                 broker: Broker | None = None,
+                 heartbeat_interval: float = WS_HEARTBEAT_INTERVAL,
+                 heartbeat_timeout: float = WS_HEARTBEAT_TIMEOUT):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f'Unknown overflow policy: {overflow_policy}')
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.heartbeat_task: asyncio.Task | None = None
+        self.active_connections: Dict[int, List[Connection]] = {}
+        self.broker = broker or create_broker('memory')
+        self.broker.deliver = self.deliver
+
+    async def start(self):
+        await self.broker.start(self.deliver)
+        self.heartbeat_task = asyncio.create_task(self.heartbeat())
+
+    async def stop(self):
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+            self.heartbeat_task = None
+        await self.broker.stop()
 
-    async def connect(self, user_id: int, websocket: WebSocket):
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = []
-        self.active_connections[user_id].append(websocket)
+    async def heartbeat(self):
+        # One task pings every socket and closes the heartbeat clients that
+        # went silent, so half-open TCP connections do not pile up.
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            ping = Frame({'type': 'ping'})
+            for connections in list(self.active_connections.values()):
+                for connection in list(connections):
+                    if connection.heartbeat and now - connection.last_seen > self.heartbeat_timeout:
+                        self.disconnect(connection.user_id, connection.websocket)
+                        asyncio.create_task(self.close(connection.websocket, code=1001))
+                    elif not connection.enqueue(ping):
+                        self.overflow(connection)
+
+    async def connect(self, user_id: int, websocket: WebSocket, encoding: str = 'json'):
+        connection = Connection(user_id, websocket, self.queue_size, encoding)
+        connection.task = asyncio.create_task(connection.run(self))
+        self.active_connections.setdefault(user_id, []).append(connection)
+        self.broker.subscribe(user_id)
         print(f"User {user_id} connected. Connections: {len(self.active_connections[user_id])}")
+        return connection
 
     def disconnect(self, user_id: int, websocket: WebSocket = None):
         if user_id in self.active_connections:
-            if websocket and websocket in self.active_connections[user_id]:
-                self.active_connections[user_id].remove(websocket)
-            if not websocket:
-                self.active_connections[user_id] = []
-            if not self.active_connections[user_id]:
+            connections = self.active_connections[user_id]
+            closed = [c for c in connections if websocket is None or c.websocket is websocket]
+            for connection in closed:
+                connections.remove(connection)
+                if connection.task and connection.task is not asyncio.current_task():
+                    connection.task.cancel()
+            if not connections:
                 del self.active_connections[user_id]
+                self.broker.unsubscribe(user_id)
             print(f"User {user_id} disconnected")
 
+    def overflow(self, connection: Connection):
+        if self.overflow_policy == 'disconnect':
+            self.disconnect(connection.user_id, connection.websocket)
+            asyncio.create_task(self.close(connection.websocket))
+
+    async def close(self, websocket: WebSocket, code: int = 1013):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    def deliver(self, user_ids: list, message: dict):
+        frame = Frame(message)
+        for user_id in user_ids:
+            for connection in list(self.active_connections.get(user_id, [])):
+                if not connection.enqueue(frame):
+                    self.overflow(connection)
+
     async def send_personal_message(self, message: dict, user_id: int):
-        for connection in self.active_connections.get(user_id, []):
-            await connection.send_json(message)
+        await self.broker.publish([user_id], message)
 
     async def broadcast_to_chat(self, message: dict, recipient_id: int, sender_id: int):
-        await self.send_personal_message(message, recipient_id)
-        await self.send_personal_message(message, sender_id)
+        await self.broker.publish(list(dict.fromkeys([recipient_id, sender_id])), message)
+
+    def stats(self) -> list:
+        return [connection.stats() for connections in self.active_connections.values() for connection in connections]
 
 
-manager = ConnectionManager()
+manager = ConnectionManager(broker=create_broker())
@@ -51,9 +51,14 @@ interface ChatContextType {
 
 const ChatContext = createContext<ChatContextType | undefined>(undefined)
 
+const RECONNECT_BASE_DELAY = 1000
+const RECONNECT_MAX_DELAY = 30000
+
 export function ChatProvider({ children }: { children: ReactNode }) {
   const { accessToken, user } = useAuth()
   const socketRef = useRef<WebSocket | null>(null)
+  const lastMessageIdRef = useRef(0)
+  const messageIdsRef = useRef<Set<number>>(new Set())
   const { showToast } = useToast()
   const [messages, setMessages] = useState<Message[]>([])
   const [chats, setChats] = useState<Chat[]>([])
@@ -192,17 +197,54 @@ export function ChatProvider({ children }: { children: ReactNode }) {
   )
 
   useEffect(() => {
-    if (!user?.id) return
+    if (!user?.id || !accessToken) return
+
+    let ws: WebSocket
+    let stopped = false
+    let retries = 0
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined
 
-    const ws = new WebSocket(`${process.env.NEXT_PUBLIC_API_WS}${user.id}`)
-    socketRef.current = ws
+    const send = (data: object) => {
+      if (ws.readyState === WebSocket.OPEN) ws.send(JSON.stringify(data))
+    }
 
-    const handleOpen = () => setIsConnected(true)
-    const handleClose = () => setIsConnected(false)
+    // После переподключения сервер досылает пропущенные сообщения
+    const resume = () => {
+      if (lastMessageIdRef.current > 0) {
+        send({ type: 'resume', last_message_id: lastMessageIdRef.current })
+      }
+    }
+
+    const handleOpen = () => {
+      retries = 0
+      send({ type: 'auth', token: accessToken })
+      resume()
+      setIsConnected(true)
+    }
+
+    const handleClose = (event: CloseEvent) => {
+      setIsConnected(false)
+      // 1008 — токен не принят, переподключаться бесполезно
+      if (stopped || event.code === 1008) return
+      const delay = Math.min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * 2 ** retries)
+      retries += 1
+      reconnectTimer = setTimeout(connect, delay)
+    }
 
     const handleMessage = async (event: MessageEvent) => {
       const data = JSON.parse(event.data)
+      if (data.type === 'ping') {
+        send({ type: 'pong' })
+        return
+      }
+      if (data.type === 'resumed') {
+        if (!data.complete) resume()
+        return
+      }
       if (data.type !== 'message') return
+      if (messageIdsRef.current.has(data.id)) return
+      messageIdsRef.current.add(data.id)
+      lastMessageIdRef.current = Math.max(lastMessageIdRef.current, data.id)
 
       const newMessage: Message = {
         id: data.id,
@@ -265,17 +307,25 @@ export function ChatProvider({ children }: { children: ReactNode }) {
       })
     }
 
-    ws.addEventListener('open', handleOpen)
-    ws.addEventListener('close', handleClose)
-    ws.addEventListener('message', handleMessage)
+    const connect = () => {
+      ws = new WebSocket(`${process.env.NEXT_PUBLIC_API_WS}${user.id}`)
+      socketRef.current = ws
+      ws.addEventListener('open', handleOpen)
+      ws.addEventListener('close', handleClose)
+      ws.addEventListener('message', handleMessage)
+    }
+
+    connect()
 
     return () => {
+      stopped = true
+      clearTimeout(reconnectTimer)
       ws.removeEventListener('open', handleOpen)
       ws.removeEventListener('close', handleClose)
       ws.removeEventListener('message', handleMessage)
       ws.close()
     }
-  }, [user?.id, loadUser]) // Только эти зависимости
+  }, [user?.id, accessToken, loadUser]) // Только эти зависимости
 
   const filteredMessages = useMemo(() => {
     if (!currentChatUserId || !user?.id) return []